@@ -7,7 +7,9 @@ from api.models import (CandidateList, CandidateRanking, ProfileAnswer,
                         LearningPlan, LearningPlanCompetency, LearningPlanGoal,
                         LearningPlanGoalCourse, LearningPlanGoalKsa,
                         Application, ApplicationCourse,
-                        ApplicationComment, ApplicationExperience)
+                        ApplicationStatusSummary,
+                        ApplicationComment, ApplicationExperience,
+                        DocumentUpload, PendingApplicationReviewer)
 
 
 # Register your models here.
@@ -318,3 +320,22 @@ class ApplicationExperienceAdmin(GuardedModelAdmin):
 class ApplicationCommentAdmin(GuardedModelAdmin):
     list_display = ('application', 'reviewer')
     list_filter = ('application__applicant',)
+
+
+@admin.register(PendingApplicationReviewer)
+class PendingApplicationReviewerAdmin(admin.ModelAdmin):
+    list_display = ('email', 'application', 'created')
+    search_fields = ('email',)
+
+
+@admin.register(DocumentUpload)
+class DocumentUploadAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'owner', 'size', 'completed')
+    search_fields = ('filename', 'owner__email',)
+
+
+@admin.register(ApplicationStatusSummary)
+class ApplicationStatusSummaryAdmin(admin.ModelAdmin):
+    list_display = ('day', 'organization', 'status', 'position',
+                    'application_type', 'count')
+    list_filter = ('status', 'position', 'application_type')
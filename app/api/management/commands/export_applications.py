@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.export_utils import (EXPORT_CHUNK_SIZE, EXPORT_FORMATS,
+                                    export_lines, export_queryset)
+
+
+class Command(BaseCommand):
+    """
+    Stream every application with its experiences, courses and total hours
+    as CSV or JSON lines
+    """
+    help = 'Export all applications as CSV or JSON lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=list(EXPORT_FORMATS), default='csv',
+            dest='export_format', help='Output format (defaults to csv)')
+        parser.add_argument(
+            '--output', help='File to write to (defaults to stdout)')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Number of applications to read from the database at once')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        lines = export_lines(export_queryset(), options['export_format'],
+                             options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='',
+                      encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.models import prune_tombstones
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Delete the deletion tombstones older than the retention period
+    """
+    help = 'Delete deletion tombstones older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TOMBSTONE_RETENTION_DAYS,
+            help='Number of days of tombstones to keep')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Number of tombstones to delete per statement')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        before = timezone.now() - timedelta(days=options['days'])
+        pruned = prune_tombstones(before, batch_size=options['batch_size'])
+        self.stdout.write(f'Pruned {pruned} tombstones')
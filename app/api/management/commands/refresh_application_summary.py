@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.models import refresh_application_summary
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the application status summary from every application
+    """
+    help = 'Rebuild the application status summary behind the analytics'
+
+    def handle(self, *args, **options):
+        rows = refresh_application_summary()
+        self.stdout.write(f'Refreshed {rows} application summary rows')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Application, refresh_application_totals
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """
+    Recompute the stored experience and course totals of every application
+    """
+    help = 'Repair the experience and course totals of all applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Number of applications to recompute per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        pks = list(Application.objects.order_by('pk')
+                   .values_list('pk', flat=True))
+        refreshed = 0
+        for start in range(0, len(pks), batch_size):
+            refreshed += refresh_application_totals(
+                pks[start:start + batch_size])
+
+        self.stdout.write(f'Refreshed the totals of {refreshed} applications')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import refresh_learner_ksa_scores
+from users.models import User
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """
+    Recompute the KSA scores candidates are recommended from for every user
+    """
+    help = 'Rebuild the learner KSA scores behind candidate recommendations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Number of users to recompute per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        pks = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        scores = 0
+        for start in range(0, len(pks), batch_size):
+            scores += refresh_learner_ksa_scores(
+                pks[start:start + batch_size])
+
+        self.stdout.write(f'Refreshed {scores} learner KSA scores')
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0015_application_code_of_ethics_acknowledged_stamp_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Label of the deleted object model, e.g. api.learningplan', max_length=100)),
+                ('object_id', models.CharField(help_text='Primary key of the deleted object', max_length=64)),
+                ('deleted', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['deleted'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['modified'], name='api_applica_modifie_8d181b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationcomment',
+            index=models.Index(fields=['modified'], name='api_applica_modifie_e6029e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationcourse',
+            index=models.Index(fields=['modified'], name='api_applica_modifie_51fd7c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationexperience',
+            index=models.Index(fields=['modified'], name='api_applica_modifie_bbe083_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidatelist',
+            index=models.Index(fields=['modified'], name='api_candida_modifie_fded9c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidateranking',
+            index=models.Index(fields=['modified'], name='api_candida_modifie_39d7f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningplan',
+            index=models.Index(fields=['modified'], name='api_learnin_modifie_c883c9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningplancompetency',
+            index=models.Index(fields=['modified'], name='api_learnin_modifie_09ca0e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningplangoal',
+            index=models.Index(fields=['modified'], name='api_learnin_modifie_68c15e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningplangoalcourse',
+            index=models.Index(fields=['modified'], name='api_learnin_modifie_c9bae5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningplangoalksa',
+            index=models.Index(fields=['modified'], name='api_learnin_modifie_2f0888_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='owner',
+            field=models.ForeignKey(blank=True, help_text='The user that owned the deleted object', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['owner', 'deleted'], name='api_tombsto_owner_i_f57194_idx'),
+        ),
+    ]
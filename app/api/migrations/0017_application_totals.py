@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def compute_application_totals(apps, schema_editor):
+    Application = apps.get_model('api', 'Application')
+    ApplicationExperience = apps.get_model('api', 'ApplicationExperience')
+    ApplicationCourse = apps.get_model('api', 'ApplicationCourse')
+
+    experiences = ApplicationExperience.objects.filter(
+        application=OuterRef('pk')).order_by().values('application')
+    marked = experiences.filter(marked_for_evaluation=True)
+    courses = ApplicationCourse.objects.filter(
+        application=OuterRef('pk')).order_by().values('application')
+
+    def total(queryset, aggregate, output_field):
+        return Coalesce(
+            Subquery(queryset.annotate(total=aggregate).values('total')),
+            Value(0), output_field=output_field)
+
+    Application.objects.update(
+        total_advocacy_hours=total(
+            experiences, Sum('advocacy_hours'), models.DecimalField()),
+        total_marked_for_evaluation_hours=total(
+            marked, Sum('advocacy_hours'), models.DecimalField()),
+        total_marked_for_evaluation_count=total(
+            marked, Count('pk'), models.IntegerField()),
+        total_course_clocked_hours=total(
+            courses, Sum('clocked_hours'), models.DecimalField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_modified_indexes_and_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='total_advocacy_hours',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Advocacy hours of all experiences', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='total_course_clocked_hours',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Clocked hours of all courses', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='total_marked_for_evaluation_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of experiences marked for evaluation'),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='total_marked_for_evaluation_hours',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Advocacy hours of the experiences marked for evaluation', max_digits=12),
+        ),
+        migrations.RunPython(compute_application_totals,
+                             migrations.RunPython.noop),
+    ]
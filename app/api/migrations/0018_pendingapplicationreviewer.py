@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_application_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingApplicationReviewer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('email', models.EmailField(db_index=True, help_text='Email the reviewer will register with', max_length=254)),
+                ('application', models.ForeignKey(help_text='The application to share with the reviewer', on_delete=django.db.models.deletion.CASCADE, related_name='pending_reviewers', to='api.application')),
+            ],
+            options={
+                'verbose_name': 'Pending Application Reviewer',
+                'verbose_name_plural': 'Pending Application Reviewers',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pendingapplicationreviewer',
+            constraint=models.UniqueConstraint(fields=('application', 'email'), name='unique_pending_reviewer'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_pendingapplicationreviewer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['status', 'final_submission_stamp', 'id'], name='api_applica_status_190b2a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationexperience',
+            index=models.Index(condition=models.Q(('marked_for_evaluation', True)), fields=['supervisor_email', 'application'], name='api_appexp_marked_super_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:37
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0019_application_review_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(help_text='Name of the uploaded file', max_length=255, validators=[django.core.validators.RegexValidator(message='Invalid character used', regex='^([\\x09\\x0A\\x0D\\x20-\\x7E]|[\\xC2-\\xDF]|[\\xE0\\xA0-\\xBF]|[\\xE1-\\xEC\\xEE\\xEF]{2}|[\\xED\\x80-\\x9F]|[\\xF0\\x90-\\xBF]{2}|[\\xF1-\\xF3]{3}|[\\xF4\\x80-\\x8F]{2})*$')])),
+                ('content_type', models.CharField(blank=True, help_text='Media type of the document', max_length=100)),
+                ('size', models.PositiveBigIntegerField(help_text='Total size of the document in bytes')),
+                ('offset', models.PositiveBigIntegerField(default=0, help_text='Number of bytes received so far')),
+                ('sha256', models.CharField(blank=True, help_text='SHA-256 hex digest of the complete document', max_length=64)),
+                ('completed', models.DateTimeField(blank=True, help_text='Timestamp when the last chunk was received', null=True)),
+                ('owner', models.ForeignKey(help_text='The user uploading the document', on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Document Upload',
+                'verbose_name_plural': 'Document Uploads',
+            },
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='certification_file',
+            field=models.ForeignKey(blank=True, help_text='Uploaded certification document', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='certified_applications', to='api.documentupload'),
+        ),
+        migrations.AddField(
+            model_name='applicationexperience',
+            name='proof_file',
+            field=models.ForeignKey(blank=True, help_text='Uploaded proof of the experience', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='proven_experiences', to='api.documentupload'),
+        ),
+    ]
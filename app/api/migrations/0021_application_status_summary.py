@@ -0,0 +1,79 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:46
+
+import datetime
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, F, ExpressionWrapper, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+import django.utils.timezone
+
+
+def build_application_summary(apps, schema_editor):
+    Application = apps.get_model('api', 'Application')
+    ApplicationStatusSummary = apps.get_model('api',
+                                              'ApplicationStatusSummary')
+
+    reviewed = Q(reviewed_stamp__isnull=False,
+                 final_submission_stamp__isnull=False)
+    review_time = ExpressionWrapper(
+        F('reviewed_stamp') - F('final_submission_stamp'),
+        output_field=models.DurationField())
+    groups = Application.objects.annotate(
+        day=TruncDate('created'), organization=F('affiliation'),
+    ).order_by().values('day', 'organization', 'status', 'position',
+                        'application_type').annotate(
+        count=Count('pk'),
+        total_advocacy_hours=Sum('total_advocacy_hours'),
+        total_course_clocked_hours=Sum('total_course_clocked_hours'),
+        reviewed_count=Count('pk', filter=reviewed),
+        total_review_time=Coalesce(Sum(review_time, filter=reviewed),
+                                   Value(timedelta())))
+    ApplicationStatusSummary.objects.bulk_create(
+        ApplicationStatusSummary(**group) for group in groups)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_document_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Day the applications were created')),
+                ('organization', models.CharField(blank=True, help_text='Affiliation of the applicants', max_length=255)),
+                ('status', models.CharField(blank=True, choices=[('draft', 'Draft'), ('submitted', 'Submitted'), ('under_review', 'Under Review'), ('additional_info_needed', 'Additional Information Needed'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=50)),
+                ('position', models.CharField(blank=True, choices=[('SAPR_Program_Administrator', 'SAPR Program Administrator'), ('SAPR_VA', 'SAPR VA'), ('Principal_SARC', 'Principal SARC'), ('Supervisory_SARC', 'Supervisory SARC'), ('Collateral_Duty_SARC', 'Collateral Duty SARC'), ('Special_Assignment_SARC', 'Special Assignment SARC'), ('Collateral_Duty_SAPR_VA', 'Collateral Duty SAPR VA'), ('Special_Assignment_SAPR_VA', 'Special Assignment SAPR VA')], max_length=40)),
+                ('application_type', models.CharField(blank=True, choices=[('new', 'New Application'), ('renewal', 'Renewal Application')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0, help_text='Number of applications')),
+                ('total_advocacy_hours', models.DecimalField(decimal_places=2, default=0, help_text='Advocacy hours of the applications', max_digits=14)),
+                ('total_course_clocked_hours', models.DecimalField(decimal_places=2, default=0, help_text='Course clocked hours of the applications', max_digits=14)),
+                ('reviewed_count', models.PositiveIntegerField(default=0, help_text='Number of approved or rejected applications')),
+                ('total_review_time', models.DurationField(default=datetime.timedelta, help_text='Time from final submission to decision, summed over the reviewed applications')),
+                ('refreshed', models.DateTimeField(default=django.utils.timezone.now, help_text='Timestamp of the last refresh')),
+            ],
+            options={
+                'verbose_name': 'Application Status Summary',
+                'verbose_name_plural': 'Application Status Summaries',
+            },
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='reviewed_stamp',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Timestamp of the approval or rejection', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['created'], name='api_applica_created_a5171d_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='applicationstatussummary',
+            constraint=models.UniqueConstraint(fields=('day', 'organization', 'status', 'position', 'application_type'), name='unique_application_status_summary'),
+        ),
+        migrations.RunPython(build_application_summary,
+                             migrations.RunPython.noop),
+    ]
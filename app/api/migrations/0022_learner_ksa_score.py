@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('external', '0008_job_ksa'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0021_application_status_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerKsaScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ksa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='learner_scores', to='external.ksa')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ksa_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['modified'], name='api_learner_modifie_7b1648_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='learnerksascore',
+            constraint=models.UniqueConstraint(fields=('user', 'ksa'), name='unique_learner_ksa_score'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def add_owner_viewers(apps, schema_editor):
+    """Let the owners of the existing tombstones keep listing them"""
+    Tombstone = apps.get_model('api', 'Tombstone')
+    Viewer = Tombstone.viewers.through
+    Viewer.objects.bulk_create(
+        [Viewer(tombstone_id=pk, user_id=owner_id)
+         for pk, owner_id in Tombstone.objects.filter(
+             owner__isnull=False).values_list('pk', 'owner_id').iterator()],
+        batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0023_direct_object_permissions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='viewers',
+            field=models.ManyToManyField(blank=True, help_text='The users that could view the deleted object', related_name='visible_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(add_owner_viewers,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Lower
+
+
+def lower_emails(apps, schema_editor):
+    """Lower case the pending reviewer emails, dropping the rows that only
+    differ from another row of the application by case"""
+    PendingApplicationReviewer = apps.get_model(
+        'api', 'PendingApplicationReviewer')
+    mixed = PendingApplicationReviewer.objects.annotate(
+        email_lower=Lower('email')).exclude(email=F('email_lower'))
+    seen = set(PendingApplicationReviewer.objects.annotate(
+        email_lower=Lower('email')).filter(email=F('email_lower'))
+        .filter(application__in=mixed.values('application'))
+        .values_list('application', 'email'))
+    for reviewer in mixed.order_by('pk'):
+        key = (reviewer.application_id, reviewer.email_lower)
+        if key in seen:
+            reviewer.delete()
+        else:
+            seen.add(key)
+            reviewer.email = reviewer.email_lower
+            reviewer.save(update_fields=['email'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_tombstone_viewers'),
+    ]
+
+    operations = [
+        migrations.RunPython(lower_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:23
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_lower_pending_reviewer_emails'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='applicationexperience',
+            name='api_appexp_marked_super_idx',
+        ),
+        migrations.AddIndex(
+            model_name='applicationexperience',
+            index=models.Index(django.db.models.functions.text.Lower('supervisor_email'), models.F('application'), condition=models.Q(('marked_for_evaluation', True)), name='api_appexp_marked_lsuper_idx'),
+        ),
+    ]
@@ -1,12 +1,23 @@
+import threading
 import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
 
 from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MinValueValidator, RegexValidator
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import (Count, ExpressionWrapper, F, OuterRef, Q,
+                              Subquery, Sum, Value)
+from django.db.models.functions import Coalesce, Lower, Now, TruncDate
 from django.urls import reverse
+from django.utils import timezone
+from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
 from model_utils import Choices
 from model_utils.models import TimeStampedModel
 
+from api.utils.batch_utils import flush_on_commit
+from api.utils.touch_utils import touch_parent
 from external.models import Competency, Course, Job, Ksa
 from portal.regex import REGEX_CHECK, REGEX_ERROR_MESSAGE
 from users.models import User
@@ -69,6 +80,8 @@ class ProfileResponse(TimeStampedModel):
                 name='unique_question_response')
         ]
 
+    owner_field = 'submitted_by'
+
     def get_absolute_url(self):
         return reverse("api:profile-responses-detail", kwargs={"pk": self.pk})
 
@@ -87,12 +100,16 @@ class CandidateList(TimeStampedModel):
         null=True, blank=True)
 
     class Meta:
+        indexes = [models.Index(fields=['modified'])]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(role__isnull=True) ^ models.Q(
                     competency__isnull=True), name="role_or_competency")
         ]
 
+    owner_field = 'ranker'
+    tombstone_owner_field = owner_field
+
     def __str__(self):
         return f'{self.name} - {self.role if self.competency is None
                                 else self.competency} ({self.ranker})'
@@ -109,6 +126,7 @@ class CandidateRanking(TimeStampedModel):
     rank = models.PositiveSmallIntegerField()
 
     class Meta:
+        indexes = [models.Index(fields=['modified'])]
         constraints = [
             models.UniqueConstraint(
                 fields=['candidate_list', 'rank',],
@@ -119,9 +137,13 @@ class CandidateRanking(TimeStampedModel):
         ]
         ordering = ['rank',]
 
+    touch_parent_field = 'candidate_list'
+    owner_field = 'candidate_list__ranker'
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.candidate_list.save(update_fields=['modified',])
+        touch_parent(self)
 
     def __str__(self):
         return f'{self.rank}. {self.candidate} in {self.candidate_list}'
@@ -139,6 +161,8 @@ class TrainingPlan(TimeStampedModel):
         Job, on_delete=models.CASCADE, related_name='training_plans',
         null=True, blank=True)
 
+    owner_field = 'planner'
+
     def get_absolute_url(self):
         return reverse("api:training-plans-detail", kwargs={"pk": self.pk})
 
@@ -154,6 +178,12 @@ class LearningPlan(TimeStampedModel):
     ])
     timeframe = models.CharField(max_length=50, choices=TIMEFRAME_CHOICES)
 
+    class Meta:
+        indexes = [models.Index(fields=['modified'])]
+
+    owner_field = 'learner'
+    tombstone_owner_field = owner_field
+
     def __str__(self):
         return f'{self.name} - {self.learner} ({self.timeframe})'
 
@@ -171,9 +201,16 @@ class LearningPlanCompetency(TimeStampedModel):
         related_name='learning_plans_competencies')
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES)
 
+    class Meta:
+        indexes = [models.Index(fields=['modified'])]
+
+    touch_parent_field = 'learning_plan'
+    owner_field = 'learning_plan__learner'
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.learning_plan.save(update_fields=['modified',])
+        touch_parent(self)
 
     # Return the name of the competency
     @property
@@ -243,9 +280,16 @@ class LearningPlanGoal(TimeStampedModel):
     elrr_goal_id = models.UUIDField(
         null=True, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['modified'])]
+
+    touch_parent_field = 'plan_competency'
+    owner_field = 'plan_competency__learning_plan__learner'
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.plan_competency.save(update_fields=['modified',])
+        touch_parent(self)
 
     def __str__(self):
         return f'{self.goal_name} - {self.plan_competency} ({self.timeline})'
@@ -275,9 +319,17 @@ class LearningPlanGoalKsa(TimeStampedModel):
     def ksa_name(self):
         return self.eccr_ksa.name
 
+    class Meta:
+        indexes = [models.Index(fields=['modified'])]
+
+    touch_parent_field = 'plan_goal'
+    owner_field = (
+        'plan_goal__plan_competency__learning_plan__learner')
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.plan_goal.save(update_fields=['modified',])
+        touch_parent(self)
 
     def __str__(self):
         return (f'{self.ksa_name} - {self.plan_goal}'
@@ -302,9 +354,23 @@ class LearningPlanGoalCourse(TimeStampedModel):
     def course_name(self):
         return self.xds_course.name
 
+    # Return the locally stored XDS metadata of the course
+    @property
+    def course_metadata(self):
+        xds_metadata = getattr(self.xds_course, 'xds_metadata', None)
+        return xds_metadata.metadata if xds_metadata else None
+
+    class Meta:
+        indexes = [models.Index(fields=['modified'])]
+
+    touch_parent_field = 'plan_goal'
+    owner_field = (
+        'plan_goal__plan_competency__learning_plan__learner')
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.plan_goal.save(update_fields=['modified',])
+        touch_parent(self)
 
     def __str__(self):
         return f'{self.course_name} - {self.plan_goal}'
@@ -315,6 +381,53 @@ class LearningPlanGoalCourse(TimeStampedModel):
 
 
 # SAPRO Application Models section
+class DocumentUpload(TimeStampedModel):
+    """
+    Document uploaded in chunks, like a certification or a proof of
+    experience. The bytes are stored under settings.UPLOAD_ROOT.
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='document_uploads',
+        help_text='The user uploading the document'
+    )
+    filename = models.CharField(
+        max_length=255, validators=[
+            RegexValidator(regex=REGEX_CHECK, message=REGEX_ERROR_MESSAGE),
+        ],
+        help_text='Name of the uploaded file'
+    )
+    content_type = models.CharField(
+        max_length=100, blank=True,
+        help_text='Media type of the document'
+    )
+    size = models.PositiveBigIntegerField(
+        help_text='Total size of the document in bytes'
+    )
+    offset = models.PositiveBigIntegerField(
+        default=0, help_text='Number of bytes received so far'
+    )
+    sha256 = models.CharField(
+        max_length=64, blank=True,
+        help_text='SHA-256 hex digest of the complete document'
+    )
+    completed = models.DateTimeField(
+        null=True, blank=True,
+        help_text='Timestamp when the last chunk was received'
+    )
+
+    class Meta:
+        verbose_name = 'Document Upload'
+        verbose_name_plural = 'Document Uploads'
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size} bytes)'
+
+
 class Application(TimeStampedModel):
     """
     Main application model for SAPR certification applications.
@@ -469,8 +582,11 @@ class Application(TimeStampedModel):
     )
 
     # Certification Information
-
-    # file class to be created later to hold certification_file
+    certification_file = models.ForeignKey(
+        DocumentUpload, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='certified_applications',
+        help_text='Uploaded certification document'
+    )
 
     certification_awarded_date = models.DateField(
         null=True, blank=True,
@@ -543,11 +659,68 @@ class Application(TimeStampedModel):
         blank=True, null=True,
         help_text='Timestamp of final submission'
     )
+    reviewed_stamp = models.DateTimeField(
+        blank=True, null=True, editable=False,
+        help_text='Timestamp of the approval or rejection'
+    )
+
+    # Totals of the experiences and courses, kept up to date on their writes
+    total_advocacy_hours = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False,
+        help_text='Advocacy hours of all experiences'
+    )
+    total_marked_for_evaluation_hours = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False,
+        help_text='Advocacy hours of the experiences marked for evaluation'
+    )
+    total_marked_for_evaluation_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text='Number of experiences marked for evaluation'
+    )
+    total_course_clocked_hours = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False,
+        help_text='Clocked hours of all courses'
+    )
 
     class Meta:
+        indexes = [
+            models.Index(fields=['created']),
+            models.Index(fields=['modified']),
+            models.Index(fields=['status', 'final_submission_stamp', 'id']),
+        ]
         verbose_name = 'Application'
         verbose_name_plural = 'Applications'
 
+    owner_field = 'applicant'
+    tombstone_owner_field = owner_field
+    # written only by refresh_application_totals
+    total_fields = ('total_advocacy_hours',
+                    'total_marked_for_evaluation_hours',
+                    'total_marked_for_evaluation_count',
+                    'total_course_clocked_hours')
+
+    def save(self, *args, **kwargs):
+        # keep the totals out of full saves so an instance loaded before a
+        # change to its experiences or courses does not overwrite them
+        if not args and kwargs.get('update_fields') is None and \
+                not kwargs.get('force_insert') and not self._state.adding:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.total_fields]
+        # stamp the review decision, or clear it when the application is
+        # sent back
+        decided = self.status in (self.StatusChoices.APPROVED,
+                                  self.StatusChoices.REJECTED)
+        if decided and self.reviewed_stamp is None:
+            self.reviewed_stamp = timezone.now()
+        elif not decided:
+            self.reviewed_stamp = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'reviewed_stamp'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f'{self.application_type} - {self.first_name}' \
                f' {self.last_name} ({self.status})'
@@ -582,12 +755,17 @@ class ApplicationComment(TimeStampedModel):
     )
 
     class Meta:
+        indexes = [models.Index(fields=['modified'])]
         verbose_name = 'Application Comment'
         verbose_name_plural = 'Application Comments'
 
+    touch_parent_field = 'application'
+    owner_field = 'application__applicant'
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.application.save(update_fields=['modified',])
+        touch_parent(self)
 
     def __str__(self):
         return f'Comment by {self.reviewer} on '\
@@ -653,16 +831,32 @@ class ApplicationExperience(TimeStampedModel):
     )
 
     # Proof/Documentation
-
-    # file class later to hold to be created proof_file
+    proof_file = models.ForeignKey(
+        DocumentUpload, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='proven_experiences',
+        help_text='Uploaded proof of the experience'
+    )
 
     class Meta:
+        indexes = [
+            models.Index(fields=['modified']),
+            # supervisors are matched case insensitively
+            models.Index(Lower('supervisor_email'), F('application'),
+                         condition=models.Q(marked_for_evaluation=True),
+                         name='api_appexp_marked_lsuper_idx'),
+        ]
         verbose_name = 'Application Experience'
         verbose_name_plural = 'Application Experiences'
 
+    touch_parent_field = 'application'
+    owner_field = 'application__applicant'
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.application.save(update_fields=['modified',])
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            refresh_application_totals([self.application_id])
+        touch_parent(self)
 
     def __str__(self):
         return f'{self.position_name} for Application {self.application.id}'
@@ -714,14 +908,550 @@ class ApplicationCourse(TimeStampedModel):
         return self.xds_course.name
 
     class Meta:
+        indexes = [models.Index(fields=['modified'])]
         ordering = ['-completion_date']
         verbose_name = 'Application Course'
         verbose_name_plural = 'Application Courses'
 
+    touch_parent_field = 'application'
+    owner_field = 'application__applicant'
+    tombstone_owner_field = owner_field
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.application.save(update_fields=['modified',])
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            refresh_application_totals([self.application_id])
+        touch_parent(self)
 
     def __str__(self):
         return f'Course {self.xds_course_id or self.category}' \
                f' for Application {self.application.id}'
+
+
+class PendingApplicationReviewer(TimeStampedModel):
+    """
+    Supervisor email of an experience marked for evaluation that has no
+    account yet, lower cased. The application is shared with the user who
+    registers it.
+    """
+    application = models.ForeignKey(
+        Application, on_delete=models.CASCADE,
+        related_name='pending_reviewers',
+        help_text='The application to share with the reviewer'
+    )
+    email = models.EmailField(
+        db_index=True, help_text='Email the reviewer will register with'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['application', 'email'],
+                                    name='unique_pending_reviewer'),
+        ]
+        verbose_name = 'Pending Application Reviewer'
+        verbose_name_plural = 'Pending Application Reviewers'
+
+    def __str__(self):
+        return f'{self.email} for Application {self.application_id}'
+
+
+def prune_pending_reviewers(application_ids):
+    """
+    Delete the pending reviewers of the applications that no longer
+    supervise one of their experiences marked for evaluation
+    """
+    supervisors = ApplicationExperience.objects.filter(
+        application=OuterRef('application'),
+        marked_for_evaluation=True).values(
+        supervisor=Lower('supervisor_email'))
+    return PendingApplicationReviewer.objects.filter(
+        application__in=application_ids).exclude(
+        email__in=supervisors).delete()[0]
+
+
+# applications whose totals refresh is deferred, see
+# deferred_application_totals()
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_application_totals():
+    """
+    Recompute the totals of the applications whose experiences and courses
+    are written inside the block once, when it exits, instead of after
+    every write
+    """
+    if getattr(_deferred, 'application_ids', None) is not None:
+        yield
+        return
+
+    _deferred.application_ids = set()
+    try:
+        yield
+        application_ids = _deferred.application_ids
+    finally:
+        _deferred.application_ids = None
+    if application_ids:
+        refresh_application_totals(application_ids)
+
+
+def refresh_application_totals(application_ids):
+    """
+    Recompute the experience and course totals of the given applications.
+    The rows are locked first so concurrent writes to their experiences and
+    courses are counted once they commit.
+    """
+    deferred_ids = getattr(_deferred, 'application_ids', None)
+    if deferred_ids is not None:
+        deferred_ids.update(application_ids)
+        return 0
+
+    with transaction.atomic():
+        locked = list(Application.objects.select_for_update().filter(
+            pk__in=application_ids).order_by('pk').values_list('created',
+                                                               flat=True))
+        if not locked:
+            return 0
+
+        experiences = ApplicationExperience.objects.filter(
+            application=OuterRef('pk')).order_by().values('application')
+        marked = experiences.filter(marked_for_evaluation=True)
+        courses = ApplicationCourse.objects.filter(
+            application=OuterRef('pk')).order_by().values('application')
+
+        def total(queryset, aggregate, output_field):
+            return Coalesce(
+                Subquery(queryset.annotate(total=aggregate).values('total')),
+                Value(0), output_field=output_field)
+
+        updated = Application.objects.filter(pk__in=application_ids).update(
+            total_advocacy_hours=total(
+                experiences, Sum('advocacy_hours'), models.DecimalField()),
+            total_marked_for_evaluation_hours=total(
+                marked, Sum('advocacy_hours'), models.DecimalField()),
+            total_marked_for_evaluation_count=total(
+                marked, Count('pk'), models.IntegerField()),
+            total_course_clocked_hours=total(
+                courses, Sum('clocked_hours'), models.DecimalField()))
+        application_summary_changed(
+            timezone.localdate(created) for created in locked)
+        return updated
+
+
+class ApplicationStatusSummary(models.Model):
+    """
+    Number of applications and their totals per creation day, organization,
+    status, position and type. The rows of a day are recomputed whenever
+    one of its applications changes, so analytics read this table instead
+    of the applications.
+    """
+    day = models.DateField(
+        help_text='Day the applications were created')
+    organization = models.CharField(
+        max_length=255, blank=True,
+        help_text='Affiliation of the applicants')
+    status = models.CharField(
+        max_length=50, blank=True,
+        choices=(Application.StatusChoices.choices))
+    position = models.CharField(
+        max_length=40, blank=True,
+        choices=(Application.PositionChoices.choices))
+    application_type = models.CharField(
+        max_length=20, blank=True,
+        choices=(Application.ApplicationChoices.choices))
+    count = models.PositiveIntegerField(
+        default=0, help_text='Number of applications')
+    total_advocacy_hours = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0,
+        help_text='Advocacy hours of the applications')
+    total_course_clocked_hours = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0,
+        help_text='Course clocked hours of the applications')
+    reviewed_count = models.PositiveIntegerField(
+        default=0, help_text='Number of approved or rejected applications')
+    total_review_time = models.DurationField(
+        default=timedelta,
+        help_text='Time from final submission to decision, summed over the'
+                  ' reviewed applications')
+    refreshed = models.DateTimeField(
+        default=timezone.now, help_text='Timestamp of the last refresh')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'organization', 'status', 'position',
+                        'application_type'],
+                name='unique_application_status_summary'),
+        ]
+        verbose_name = 'Application Status Summary'
+        verbose_name_plural = 'Application Status Summaries'
+
+    def __str__(self):
+        return f'{self.day} {self.organization} {self.status}: {self.count}'
+
+
+SUMMARY_DIMENSIONS = ['day', 'organization', 'status', 'position',
+                      'application_type']
+SUMMARY_MEASURES = ['count', 'total_advocacy_hours',
+                    'total_course_clocked_hours', 'reviewed_count',
+                    'total_review_time']
+# first key of the advisory locks serializing summary refreshes, the
+# second is the day ordinal, or 0 for the lock a full refresh takes
+SUMMARY_LOCK_NAMESPACE = 0x5355
+
+
+def application_summary_changed(days):
+    """
+    Refresh the summary rows of the given days. Inside a transaction the
+    days are collected and refreshed once it commits.
+    """
+    flush_on_commit(refresh_application_summary, days)
+
+
+def refresh_application_summary(days=None):
+    """
+    Recompute the summary rows of the applications created on the given
+    days, or of every application. Rows are upserted and the ones left
+    over from groups that no longer exist are deleted. Returns the number
+    of rows written.
+    """
+    applications = Application.objects.all()
+    rows = ApplicationStatusSummary.objects.all()
+    if days is not None:
+        days = set(days)
+        if not days:
+            return 0
+        created = Q()
+        for day in days:
+            start = timezone.make_aware(datetime.combine(day, time.min))
+            created |= Q(created__gte=start,
+                         created__lt=start + timedelta(days=1))
+        applications = applications.filter(created)
+        rows = rows.filter(day__in=days)
+
+    reviewed = Q(reviewed_stamp__isnull=False,
+                 final_submission_stamp__isnull=False)
+    review_time = ExpressionWrapper(
+        F('reviewed_stamp') - F('final_submission_stamp'),
+        output_field=models.DurationField())
+    groups = applications.annotate(
+        day=TruncDate('created'), organization=F('affiliation'),
+    ).order_by().values(*SUMMARY_DIMENSIONS).annotate(
+        count=Count('pk'),
+        total_advocacy_hours=Sum('total_advocacy_hours'),
+        total_course_clocked_hours=Sum('total_course_clocked_hours'),
+        reviewed_count=Count('pk', filter=reviewed),
+        total_review_time=Coalesce(Sum(review_time, filter=reviewed),
+                                   Value(timedelta())))
+
+    with transaction.atomic():
+        # read the groups only once concurrent refreshes of the same days
+        # committed, so an older read never overwrites a newer one
+        lock_summary_days(days)
+        refreshed = timezone.now()
+        summaries = [ApplicationStatusSummary(refreshed=refreshed, **group)
+                     for group in groups]
+        ApplicationStatusSummary.objects.bulk_create(
+            summaries, update_conflicts=True,
+            unique_fields=SUMMARY_DIMENSIONS,
+            update_fields=[*SUMMARY_MEASURES, 'refreshed'])
+        rows.filter(refreshed__lt=refreshed).delete()
+    return len(summaries)
+
+
+def lock_summary_days(days=None):
+    """
+    Take the transaction level advisory locks of the summary days, or of
+    the whole summary. Refreshes of the same day wait for each other and
+    a full refresh waits for, and blocks, every other refresh.
+    """
+    with connection.cursor() as cursor:
+        if days is None:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, 0)',
+                           [SUMMARY_LOCK_NAMESPACE])
+            return
+        cursor.execute('SELECT pg_advisory_xact_lock_shared(%s, 0)',
+                       [SUMMARY_LOCK_NAMESPACE])
+        # always in the same order so two refreshes cannot deadlock
+        for day in sorted(days):
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)',
+                           [SUMMARY_LOCK_NAMESPACE, day.toordinal()])
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted object, letting clients sync changes incrementally.
+    Objects deleted along with an ancestor only get the ancestor's tombstone.
+    The viewers are the users that could view the object or one of its
+    ancestors when it was deleted, including its owner.
+    """
+    model = models.CharField(
+        max_length=100,
+        help_text='Label of the deleted object model, e.g. api.learningplan')
+    object_id = models.CharField(
+        max_length=64, help_text='Primary key of the deleted object')
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='tombstones',
+        help_text='The user that owned the deleted object')
+    viewers = models.ManyToManyField(
+        User, blank=True, related_name='visible_tombstones',
+        help_text='The users that could view the deleted object')
+    deleted = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['owner', 'deleted'])]
+        ordering = ['deleted',]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id} deleted {self.deleted}'
+
+
+def prune_tombstones(before, batch_size=1000):
+    """
+    Delete the tombstones of objects deleted before the given datetime,
+    batch_size at a time. Clients that last synced earlier have to reload
+    their listings in full
+
+    Returns:
+        int: the number of tombstones deleted
+    """
+    pruned = 0
+    while True:
+        pks = list(Tombstone.objects.filter(deleted__lt=before)
+                   .values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return pruned
+        _, deleted = Tombstone.objects.filter(pk__in=pks).delete()
+        pruned += deleted.get(Tombstone._meta.label, 0)
+
+
+class LearnerKsaScore(models.Model):
+    """
+    Proficiency of a user in a KSA between 0 and 1, one cell of the
+    user by KSA matrix candidates are recommended from. Cells are zeroed
+    rather than deleted so readers can sync the matrix from the rows
+    modified since their last read.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='ksa_scores')
+    ksa = models.ForeignKey(
+        Ksa, on_delete=models.CASCADE, related_name='learner_scores')
+    score = models.FloatField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['modified'])]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'ksa'],
+                                    name='unique_learner_ksa_score')
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.ksa}: {self.score:.2f}'
+
+
+# proficiency levels of the free text LearningPlanGoalKsa proficiencies
+PROFICIENCY_LEVELS = {
+    'none': 0,
+    'basic': 1, 'beginner': 1, 'novice': 1, 'low': 1,
+    'intermediate': 2, 'medium': 2,
+    'advanced': 3, 'high': 3,
+    'expert': 4,
+}
+MAX_PROFICIENCY_LEVEL = 4
+# level given to a proficiency that is not recognized
+DEFAULT_PROFICIENCY_LEVEL = 1
+# level shown by completing a course planned for a KSA
+COURSE_PROFICIENCY_LEVEL = 1
+
+
+def proficiency_level(proficiency):
+    """Level from 0 to MAX_PROFICIENCY_LEVEL of a proficiency name or
+    number"""
+    proficiency = (proficiency or '').strip().lower()
+    if proficiency.isdigit():
+        return min(int(proficiency), MAX_PROFICIENCY_LEVEL)
+    return PROFICIENCY_LEVELS.get(proficiency, DEFAULT_PROFICIENCY_LEVEL)
+
+
+def learner_ksa_scores_changed(user_ids):
+    """
+    Refresh the KSA scores of the given users. Inside a transaction the
+    users are collected and refreshed once it commits.
+    """
+    flush_on_commit(refresh_learner_ksa_scores, user_ids)
+
+
+def refresh_learner_ksa_scores(user_ids):
+    """
+    Recompute the KSA scores of the given users from the current
+    proficiencies of the KSAs in their learning plans and the courses they
+    completed, which count for the KSAs of the goals the course is planned
+    for. Scores the users no longer have are zeroed. Returns the number of
+    scores written.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return 0
+
+    learner = 'plan_goal__plan_competency__learning_plan__learner'
+    levels = defaultdict(int)
+    for user_id, ksa_id, proficiency in LearningPlanGoalKsa.objects.filter(
+            **{f'{learner}__in': user_ids}).values_list(
+            learner, 'eccr_ksa', 'current_proficiency'):
+        levels[user_id, ksa_id] = max(levels[user_id, ksa_id],
+                                      proficiency_level(proficiency))
+
+    course_users = defaultdict(set)
+    for user_id, course_id in ApplicationCourse.objects.filter(
+            application__applicant__in=user_ids).values_list(
+            'application__applicant', 'xds_course').distinct():
+        course_users[course_id].add(user_id)
+    if course_users:
+        for course_id, ksa_id in LearningPlanGoalKsa.objects.filter(
+                plan_goal__courses__xds_course__in=course_users).values_list(
+                'plan_goal__courses__xds_course', 'eccr_ksa').distinct():
+            for user_id in course_users[course_id]:
+                levels[user_id, ksa_id] = max(levels[user_id, ksa_id],
+                                              COURSE_PROFICIENCY_LEVEL)
+
+    # stamped by the database clock, which readers sync against
+    scores = [LearnerKsaScore(user_id=user_id, ksa_id=ksa_id,
+                              score=level / MAX_PROFICIENCY_LEVEL,
+                              modified=Now())
+              for (user_id, ksa_id), level in levels.items()]
+    with transaction.atomic():
+        # zero every score of the users, then write the ones they still
+        # have, readers only see the result once it commits
+        LearnerKsaScore.objects.filter(user__in=user_ids).exclude(
+            score=0).update(score=0, modified=Now())
+        LearnerKsaScore.objects.bulk_create(
+            scores, update_conflicts=True, unique_fields=['user', 'ksa'],
+            update_fields=['score', 'modified'])
+    return len(scores)
+
+
+# Object permissions of the api models, kept in tables with a foreign key to
+# the object rather than in guardian's generic tables, which match a text
+# object_pk and a content type. Guardian uses them on its own once defined.
+class ProfileResponseUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ProfileResponse, on_delete=models.CASCADE)
+
+
+class ProfileResponseGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ProfileResponse, on_delete=models.CASCADE)
+
+
+class CandidateListUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(CandidateList, on_delete=models.CASCADE)
+
+
+class CandidateListGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(CandidateList, on_delete=models.CASCADE)
+
+
+class CandidateRankingUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        CandidateRanking, on_delete=models.CASCADE)
+
+
+class CandidateRankingGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        CandidateRanking, on_delete=models.CASCADE)
+
+
+class TrainingPlanUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(TrainingPlan, on_delete=models.CASCADE)
+
+
+class TrainingPlanGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(TrainingPlan, on_delete=models.CASCADE)
+
+
+class LearningPlanUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(LearningPlan, on_delete=models.CASCADE)
+
+
+class LearningPlanGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(LearningPlan, on_delete=models.CASCADE)
+
+
+class LearningPlanCompetencyUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanCompetency, on_delete=models.CASCADE)
+
+
+class LearningPlanCompetencyGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanCompetency, on_delete=models.CASCADE)
+
+
+class LearningPlanGoalUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanGoal, on_delete=models.CASCADE)
+
+
+class LearningPlanGoalGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanGoal, on_delete=models.CASCADE)
+
+
+class LearningPlanGoalKsaUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanGoalKsa, on_delete=models.CASCADE)
+
+
+class LearningPlanGoalKsaGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanGoalKsa, on_delete=models.CASCADE)
+
+
+class LearningPlanGoalCourseUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanGoalCourse, on_delete=models.CASCADE)
+
+
+class LearningPlanGoalCourseGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        LearningPlanGoalCourse, on_delete=models.CASCADE)
+
+
+class ApplicationUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(Application, on_delete=models.CASCADE)
+
+
+class ApplicationGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(Application, on_delete=models.CASCADE)
+
+
+class ApplicationCommentUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ApplicationComment, on_delete=models.CASCADE)
+
+
+class ApplicationCommentGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ApplicationComment, on_delete=models.CASCADE)
+
+
+class ApplicationExperienceUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ApplicationExperience, on_delete=models.CASCADE)
+
+
+class ApplicationExperienceGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ApplicationExperience, on_delete=models.CASCADE)
+
+
+class ApplicationCourseUserObjectPermission(UserObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ApplicationCourse, on_delete=models.CASCADE)
+
+
+class ApplicationCourseGroupObjectPermission(GroupObjectPermissionBase):
+    content_object = models.ForeignKey(
+        ApplicationCourse, on_delete=models.CASCADE)
@@ -1,6 +1,11 @@
 import logging
+import os
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from rest_framework_guardian.serializers import \
@@ -8,10 +13,17 @@ from rest_framework_guardian.serializers import \
 
 from api.models import (Application, ApplicationComment, ApplicationCourse,
                         ApplicationExperience, CandidateList, CandidateRanking,
-                        ProfileAnswer, ProfileQuestion, ProfileResponse,
-                        TrainingPlan, LearningPlan, LearningPlanCompetency,
-                        LearningPlanGoal, LearningPlanGoalCourse,
-                        LearningPlanGoalKsa)
+                        DocumentUpload, ProfileAnswer, ProfileQuestion,
+                        ProfileResponse, TrainingPlan, LearningPlan,
+                        LearningPlanCompetency, LearningPlanGoal,
+                        LearningPlanGoalCourse, LearningPlanGoalKsa,
+                        PendingApplicationReviewer, Tombstone,
+                        deferred_application_totals,
+                        learner_ksa_scores_changed, prune_pending_reviewers,
+                        refresh_application_totals)
+from api.utils.permission_utils import (assign_permissions_map,
+                                        bulk_assign_object_perms)
+from api.utils.touch_utils import touch_parent
 from configuration.utils.portal_utils import confusable_homoglyphs_check
 from external.models import Competency, Course, Job, Ksa
 from external.utils.eccr_utils import validate_eccr_item
@@ -19,9 +31,13 @@ from external.utils.elrr_utils import (create_elrr_goal,
                                        get_or_create_elrr_person_by_email,
                                        build_goal_data_for_elrr,
                                        store_ksa_to_elrr_goal,
+                                       remove_goal_from_elrr,
                                        store_course_to_elrr_goal,
+                                       store_goal_tree_to_elrr,
                                        sync_goal_updates_to_elrr)
 from external.utils.xds_utils import validate_xds_course
+from portal.mixins import SparseFieldsetSerializerMixin
+from portal.permissions import has_object_perm
 from users.models import User
 from vacancies.models import Vacancy
 
@@ -38,6 +54,10 @@ EDITABLE_STATUSES = [
     Application.StatusChoices.DRAFT,
     Application.StatusChoices.ADDITIONAL_INFO_NEEDED
 ]
+REVIEW_STATUSES = [
+    Application.StatusChoices.SUBMITTED,
+    Application.StatusChoices.UNDER_REVIEW
+]
 
 
 class ProfileAnswerSerializer(serializers.ModelSerializer):
@@ -120,7 +140,8 @@ class MiniCandidateRankingSerializer(serializers.ModelSerializer):
         return super().validate(attrs)
 
 
-class CandidateListSerializer(serializers.ModelSerializer,
+class CandidateListSerializer(SparseFieldsetSerializerMixin,
+                              serializers.ModelSerializer,
                               ObjectPermissionsAssignmentMixin):
     ranker = serializers.SlugRelatedField(
         slug_field='email', queryset=User.objects.all(),
@@ -131,6 +152,8 @@ class CandidateListSerializer(serializers.ModelSerializer,
         queryset=Job.objects.all(), required=False)
     rankings = MiniCandidateRankingSerializer(many=True, read_only=True)
 
+    expandable_fields = ['rankings',]
+
     class Meta:
         model = CandidateList
         fields = ['id', 'ranker', 'name', 'role',
@@ -188,6 +211,90 @@ class CandidateRankingSerializer(serializers.ModelSerializer,
         return super().validate(attrs)
 
 
+class CandidateRerankSerializer(serializers.Serializer):
+    """
+    Reorder the rankings of a candidate list, the instance, with the
+    emails of all of its candidates in their new order. Save it in the
+    transaction that locked the rankings.
+    """
+    candidates = serializers.ListField(child=serializers.CharField())
+
+    def validate_candidates(self, value):
+        if len(value) != len(set(value)):
+            raise serializers.ValidationError('Duplicate candidates')
+        if set(value) != {ranking.candidate.email
+                          for ranking in self.instance}:
+            raise serializers.ValidationError(
+                'The list must contain every candidate of the list once')
+        return value
+
+    def update(self, instance, validated_data):
+        rankings = {ranking.candidate.email: ranking for ranking in instance}
+        # past every current rank and every new one
+        offset = max([len(instance), *(ranking.rank for ranking in instance)]
+                     ) + 1
+        now = timezone.now()
+
+        moved = []
+        for rank, email in enumerate(validated_data['candidates'], start=1):
+            ranking = rankings[email]
+            if ranking.rank != rank:
+                ranking.rank = rank
+                ranking.modified = now
+                moved.append(ranking)
+
+        if moved:
+            # move the reordered rankings out of the way first, so no final
+            # rank collides with a current one in the unique
+            # (candidate_list, rank) constraint
+            CandidateRanking.objects.filter(
+                pk__in=[ranking.pk for ranking in moved]).update(
+                rank=F('rank') + offset)
+            CandidateRanking.objects.bulk_update(moved, ['rank', 'modified'])
+            touch_parent(moved[0])
+
+        return sorted(instance, key=lambda ranking: ranking.rank)
+
+
+class CandidateRecommendationFilterSerializer(serializers.Serializer):
+    job = serializers.PrimaryKeyRelatedField(
+        queryset=Job.objects.all(), required=False)
+    vacancy = serializers.PrimaryKeyRelatedField(
+        queryset=Vacancy.objects.select_related('job'), required=False)
+    candidate_list = serializers.PrimaryKeyRelatedField(
+        queryset=CandidateList.objects.all(), required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=25)
+
+    def validate_candidate_list(self, value):
+        """
+        Validate that the user can view the candidate list
+        """
+        if not has_object_perm(self.context['request'],
+                               'api.view_candidatelist', value):
+            raise serializers.ValidationError(
+                'You do not have permission to view this candidate list')
+        return value
+
+    def validate(self, attrs):
+        if ('job' in attrs) == ('vacancy' in attrs):
+            raise serializers.ValidationError(
+                'Either a job or a vacancy is required')
+        if 'vacancy' in attrs:
+            attrs['job'] = attrs.pop('vacancy').job
+            if attrs['job'] is None:
+                raise serializers.ValidationError(
+                    'The vacancy is not linked to a job')
+
+        return super().validate(attrs)
+
+
+class CandidateRecommendationSerializer(serializers.Serializer):
+    candidate = serializers.EmailField(source='user.email')
+    first_name = serializers.CharField(source='user.first_name')
+    last_name = serializers.CharField(source='user.last_name')
+    score = serializers.FloatField()
+
+
 class TrainingPlanSerializer(serializers.ModelSerializer,
                              ObjectPermissionsAssignmentMixin):
     planner = serializers.SlugRelatedField(
@@ -234,10 +341,11 @@ class LearningPlanGoalCourseSerializer(serializers.ModelSerializer,
         read_only=True
     )
     course_name = serializers.ReadOnlyField()
+    course_metadata = serializers.ReadOnlyField()
 
     class Meta:
         model = LearningPlanGoalCourse
-        fields = ['id', 'plan_goal', 'course_name',
+        fields = ['id', 'plan_goal', 'course_name', 'course_metadata',
                   'course_external_reference',
                   'xds_course', 'modified', 'created',]
         extra_kwargs = {'modified': {'read_only': True},
@@ -371,7 +479,7 @@ class LearningPlanGoalCourseReadSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = LearningPlanGoalCourse
-        fields = ['id', 'course_name', 'xds_course']
+        fields = ['id', 'course_name', 'course_metadata', 'xds_course']
 
 
 class LearningPlanGoalKsaSerializer(serializers.ModelSerializer,
@@ -751,7 +859,8 @@ class LearningPlanCompetencyReadSerializer(serializers.ModelSerializer):
                   'eccr_competency', 'priority', 'goals',]
 
 
-class LearningPlanSerializer(serializers.ModelSerializer,
+class LearningPlanSerializer(SparseFieldsetSerializerMixin,
+                             serializers.ModelSerializer,
                              ObjectPermissionsAssignmentMixin):
     learner = serializers.SlugRelatedField(
         slug_field='email',
@@ -760,6 +869,8 @@ class LearningPlanSerializer(serializers.ModelSerializer,
     competencies = LearningPlanCompetencyReadSerializer(
         many=True, read_only=True)
 
+    expandable_fields = ['competencies',]
+
     class Meta:
         model = LearningPlan
         fields = ['id', 'learner', 'name', 'timeframe',
@@ -788,10 +899,311 @@ class LearningPlanSerializer(serializers.ModelSerializer,
         return super().validate(attrs)
 
 
+def remove_goals_from_elrr(elrr_goal_ids):
+    """Remove goals from ELRR, logging the goals that could not be
+    removed"""
+    for elrr_goal_id in elrr_goal_ids:
+        try:
+            remove_goal_from_elrr(str(elrr_goal_id))
+        except (ConnectionError, ValueError) as e:
+            logger.error(f'Error removing goal from ELRR: {e}')
+
+
+def resolve_external_references(model, references, validate, failed_error,
+                                exception_msg):
+    """
+    Return the external model instances of the references, validating and
+    creating the ones missing from the local catalog in bulk
+    """
+    instances = model.objects.in_bulk(set(references))
+    missing = []
+    for reference in set(references) - instances.keys():
+        try:
+            missing.append(model(reference=reference,
+                                 name=validate(reference)))
+        except Exception as e:
+            logger.error(f"{failed_error} {e}")
+            raise serializers.ValidationError(exception_msg)
+    model.objects.bulk_create(missing, ignore_conflicts=True)
+    instances.update((instance.reference, instance) for instance in missing)
+    return instances
+
+
+class LearningPlanGoalKsaTreeSerializer(serializers.ModelSerializer):
+    """Nested serializer for KSAs of a whole learning plan document"""
+    ksa_external_reference = serializers.CharField()
+
+    class Meta:
+        model = LearningPlanGoalKsa
+        fields = ['ksa_external_reference', 'current_proficiency',
+                  'target_proficiency']
+
+
+class LearningPlanGoalCourseTreeSerializer(serializers.ModelSerializer):
+    """Nested serializer for Courses of a whole learning plan document"""
+    course_external_reference = serializers.CharField()
+
+    class Meta:
+        model = LearningPlanGoalCourse
+        fields = ['course_external_reference']
+
+
+class LearningPlanGoalTreeSerializer(serializers.ModelSerializer):
+    """Nested serializer for Goals of a whole learning plan document"""
+    ksas = LearningPlanGoalKsaTreeSerializer(many=True, required=False)
+    courses = LearningPlanGoalCourseTreeSerializer(many=True, required=False)
+
+    class Meta:
+        model = LearningPlanGoal
+        fields = ['goal_name', 'timeline', 'resources_support', 'obstacles',
+                  'resources_support_other', 'obstacles_other', 'ksas',
+                  'courses']
+
+
+class LearningPlanCompetencyTreeSerializer(serializers.ModelSerializer):
+    """Nested serializer for Competencies of a whole learning plan document"""
+    competency_external_reference = serializers.CharField()
+    goals = LearningPlanGoalTreeSerializer(many=True, required=False)
+
+    class Meta:
+        model = LearningPlanCompetency
+        fields = ['competency_external_reference', 'priority', 'goals']
+
+
+class LearningPlanTreeSerializer(serializers.ModelSerializer):
+    """
+    Create or replace a Learning Plan with all of its Competencies, Goals,
+    KSAs and Courses from one nested document
+    """
+    learner = serializers.SlugRelatedField(slug_field='email',
+                                           read_only=True)
+    competencies = LearningPlanCompetencyTreeSerializer(many=True,
+                                                        required=False)
+
+    class Meta:
+        model = LearningPlan
+        fields = ['id', 'learner', 'name', 'timeframe', 'competencies',
+                  'modified', 'created']
+        extra_kwargs = {'modified': {'read_only': True},
+                        'created': {'read_only': True}}
+
+    def validate(self, attrs):
+        nodes = [attrs]
+        for competency in attrs.get('competencies', []):
+            nodes.append(competency)
+            for goal in competency.get('goals', []):
+                nodes.append(goal)
+                nodes.extend(goal.get('ksas', []))
+                nodes.extend(goal.get('courses', []))
+        if not all([confusable_homoglyphs_check(node) for node in nodes]):
+            raise serializers.ValidationError(HOMOGLYPH_ERROR)
+        return super().validate(attrs)
+
+    def create(self, validated_data):
+        competencies = validated_data.pop('competencies', [])
+        learner = self.context['request'].user
+        references = self._resolve_references(competencies)
+        elrr_goal_ids = []
+
+        try:
+            with transaction.atomic():
+                learning_plan = LearningPlan.objects.create(
+                    learner=learner, **validated_data)
+                created = self._create_tree(learning_plan, competencies,
+                                            references, elrr_goal_ids)
+                bulk_assign_object_perms(learner, [learning_plan, *created])
+        except Exception:
+            remove_goals_from_elrr(elrr_goal_ids)
+            raise
+
+        return learning_plan
+
+    def update(self, instance, validated_data):
+        """Replace the whole tree of the learning plan"""
+        competencies = validated_data.pop('competencies', [])
+        references = self._resolve_references(competencies)
+        old_elrr_goal_ids = list(LearningPlanGoal.objects.filter(
+            plan_competency__learning_plan=instance,
+            elrr_goal_id__isnull=False).values_list('elrr_goal_id',
+                                                    flat=True))
+        elrr_goal_ids = []
+
+        try:
+            with transaction.atomic():
+                for attr, value in validated_data.items():
+                    setattr(instance, attr, value)
+                instance.save()
+
+                instance.competencies.all().delete()
+                created = self._create_tree(instance, competencies,
+                                            references, elrr_goal_ids)
+                bulk_assign_object_perms(instance.learner, created)
+        except Exception:
+            remove_goals_from_elrr(elrr_goal_ids)
+            raise
+
+        # the replaced goals no longer exist in the portal, failing to
+        # remove them from ELRR only leaves stale goals behind
+        remove_goals_from_elrr(old_elrr_goal_ids)
+
+        return instance
+
+    def _resolve_references(self, competencies):
+        """
+        Validate the external references of the document against ECCR and
+        XDS before any transaction is opened
+
+        Returns:
+            tuple: the Competency, Ksa and Course instances keyed by
+                reference
+        """
+        goals_data = [goal for competency in competencies
+                      for goal in competency.get('goals', [])]
+        eccr_competencies = resolve_external_references(
+            Competency,
+            [competency['competency_external_reference']
+             for competency in competencies],
+            validate_eccr_item, ECCR_FAILED_ERROR, ECCR_EXCEPTION_MSG)
+        eccr_ksas = resolve_external_references(
+            Ksa,
+            [ksa['ksa_external_reference']
+             for goal in goals_data for ksa in goal.get('ksas', [])],
+            validate_eccr_item, ECCR_FAILED_ERROR, ECCR_EXCEPTION_MSG)
+        xds_courses = resolve_external_references(
+            Course,
+            [course['course_external_reference']
+             for goal in goals_data for course in goal.get('courses', [])],
+            validate_xds_course, XDS_FAILED_ERROR, XDS_EXCEPTION_MSG)
+        return eccr_competencies, eccr_ksas, xds_courses
+
+    def _create_tree(self, learning_plan, competencies, references,
+                     elrr_goal_ids):
+        """
+        Bulk create the competencies, goals, KSAs and courses of the
+        learning plan and store the goals to ELRR in one pass
+
+        Args:
+            references (tuple): the result of _resolve_references
+            elrr_goal_ids (list): receives the ids of the goals created in
+                ELRR, to remove them if the transaction rolls back
+
+        Returns:
+            list: every created object
+        """
+        eccr_competencies, eccr_ksas, xds_courses = references
+        plan_competencies = LearningPlanCompetency.objects.bulk_create([
+            LearningPlanCompetency(
+                learning_plan=learning_plan,
+                eccr_competency=eccr_competencies[
+                    competency['competency_external_reference']],
+                priority=competency['priority'])
+            for competency in competencies])
+
+        goal_tree = []
+        for plan_competency, competency in zip(plan_competencies,
+                                               competencies):
+            for goal_data in competency.get('goals', []):
+                ksas_data = goal_data.pop('ksas', [])
+                courses_data = goal_data.pop('courses', [])
+                goal = LearningPlanGoal(plan_competency=plan_competency,
+                                        **goal_data)
+                ksas = [LearningPlanGoalKsa(
+                    plan_goal=goal,
+                    eccr_ksa=eccr_ksas[ksa['ksa_external_reference']],
+                    current_proficiency=ksa['current_proficiency'],
+                    target_proficiency=ksa['target_proficiency'])
+                    for ksa in ksas_data]
+                courses = [LearningPlanGoalCourse(
+                    plan_goal=goal,
+                    xds_course=xds_courses[
+                        course['course_external_reference']])
+                    for course in courses_data]
+                goal_tree.append((goal, ksas, courses))
+
+        goals = LearningPlanGoal.objects.bulk_create(
+            [goal for goal, _, _ in goal_tree])
+
+        # ELRR goals need the portal ids, the KSA and course ids are known
+        # before they are inserted
+        try:
+            store_goal_tree_to_elrr(learning_plan.learner, goal_tree)
+        except (ConnectionError, ValueError) as e:
+            logger.error(f'Failed to store learning plan to ELRR: {e}')
+            raise serializers.ValidationError(ELRR_SYNC_ERROR)
+        finally:
+            # including the goals stored before a failure
+            elrr_goal_ids.extend(goal.elrr_goal_id for goal in goals
+                                 if goal.elrr_goal_id)
+        LearningPlanGoal.objects.bulk_update(goals, ['elrr_goal_id'])
+
+        ksas = LearningPlanGoalKsa.objects.bulk_create(
+            [ksa for _, goal_ksas, _ in goal_tree for ksa in goal_ksas])
+        courses = LearningPlanGoalCourse.objects.bulk_create(
+            [course for _, _, goal_courses in goal_tree
+             for course in goal_courses])
+        learner_ksa_scores_changed([learning_plan.learner_id])
+
+        return [*plan_competencies, *goals, *ksas, *courses]
+
+
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    owner = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    size = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = DocumentUpload
+        fields = ['id', 'owner', 'filename', 'content_type', 'size',
+                  'offset', 'sha256', 'completed', 'modified', 'created',]
+        read_only_fields = ['offset', 'sha256', 'completed', 'modified',
+                            'created',]
+
+    def validate_filename(self, value):
+        """
+        Validate that the document is of an accepted type
+        """
+        extension = os.path.splitext(value)[1].lower()
+        if extension not in settings.UPLOAD_ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError(
+                'File type must be one of ' +
+                ', '.join(settings.UPLOAD_ALLOWED_EXTENSIONS)
+            )
+        return os.path.basename(value)
+
+    def validate_size(self, value):
+        """
+        Validate that the document fits in the upload limit
+        """
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'File size cannot exceed {settings.UPLOAD_MAX_SIZE} bytes'
+            )
+        return value
+
+    def validate(self, attrs):
+        if not confusable_homoglyphs_check(attrs):
+            raise serializers.ValidationError(HOMOGLYPH_ERROR)
+
+        return super().validate(attrs)
+
+
+class DocumentUploadField(serializers.PrimaryKeyRelatedField):
+    """
+    Completed document upload of the requesting user
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return DocumentUpload.objects.none()
+        return DocumentUpload.objects.filter(owner=request.user,
+                                             completed__isnull=False)
+
+
 class ApplicationExperienceSerializer(serializers.ModelSerializer,
                                       ObjectPermissionsAssignmentMixin):
     application = serializers.PrimaryKeyRelatedField(
         queryset=Application.objects.all())
+    proof_file = DocumentUploadField(required=False, allow_null=True)
 
     class Meta:
         model = ApplicationExperience
@@ -799,7 +1211,8 @@ class ApplicationExperienceSerializer(serializers.ModelSerializer,
                   'start_date', 'end_date', 'advocacy_hours',
                   'marked_for_evaluation', 'supervisor_last_name',
                   'supervisor_first_name', 'supervisor_email',
-                  'supervisor_not_available', 'modified', 'created',]
+                  'supervisor_not_available', 'proof_file', 'modified',
+                  'created',]
         extra_kwargs = {'modified': {'read_only': True},
                         'created': {'read_only': True}}
 
@@ -878,7 +1291,7 @@ class ApplicationExperienceReadSerializer(serializers.ModelSerializer):
                   'end_date', 'advocacy_hours', 'marked_for_evaluation',
                   'supervisor_last_name', 'supervisor_first_name',
                   'supervisor_email', 'supervisor_not_available',
-                  'created', 'modified',]
+                  'proof_file', 'created', 'modified',]
 
 
 class ApplicationCourseSerializer(serializers.ModelSerializer,
@@ -998,6 +1411,101 @@ class ApplicationCourseReadSerializer(serializers.ModelSerializer):
                   'created', 'modified',]
 
 
+class ApplicationChildListSerializer(serializers.ListSerializer):
+    """
+    Replace all experiences or courses of the application in the context
+    with a complete list. Items with the id of an existing row update it,
+    items without one are created and the rows left out are deleted, in
+    bulk and in one transaction.
+    """
+
+    def run_child_validation(self, data):
+        # validate each item against the row it updates, if any
+        rows = {str(row.pk): row for row in self.instance}
+        self.child.instance = rows.get(str(data.get('id'))) \
+            if isinstance(data, dict) else None
+        return super().run_child_validation(data)
+
+    def validate(self, attrs):
+        ids = [item['id'] for item in attrs if 'id' in item]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Duplicate ids in the list')
+        if set(ids).difference(row.pk for row in self.instance):
+            raise serializers.ValidationError(
+                'Ids must belong to rows of the application')
+        return attrs
+
+    def update(self, instance, validated_data):
+        application = self.context['application']
+        model = self.child.Meta.model
+        existing = {row.pk: row for row in instance}
+        validated_data = self.child.resolve_items(validated_data)
+        fields = {name for item in validated_data for name in item} - {'id'}
+        now = timezone.now()
+
+        created, updated = [], []
+        for item in validated_data:
+            row = existing.pop(item.pop('id', None), None)
+            if row is None:
+                created.append(model(application=application, **item))
+                continue
+            for attr, value in item.items():
+                setattr(row, attr, value)
+            row.modified = now
+            updated.append(row)
+
+        with transaction.atomic(), deferred_application_totals():
+            if existing:
+                model.objects.filter(pk__in=existing).delete()
+            model.objects.bulk_create(created)
+            if updated:
+                model.objects.bulk_update(updated, [*fields, 'modified'])
+            bulk_assign_object_perms(application.applicant, created)
+            refresh_application_totals([application.pk])
+            if model is ApplicationCourse:
+                learner_ksa_scores_changed([application.applicant_id])
+            else:
+                # bulk writes skip the experience post_save signal
+                prune_pending_reviewers([application.pk])
+            touch_parent(model(application=application))
+
+        return sorted(created + updated, key=lambda row: row.display_order)
+
+
+class ApplicationExperienceBulkSerializer(ApplicationExperienceSerializer):
+    id = serializers.UUIDField(required=False)
+
+    class Meta(ApplicationExperienceSerializer.Meta):
+        fields = [field
+                  for field in ApplicationExperienceSerializer.Meta.fields
+                  if field != 'application']
+        list_serializer_class = ApplicationChildListSerializer
+
+    def resolve_items(self, validated_data):
+        return validated_data
+
+
+class ApplicationCourseBulkSerializer(ApplicationCourseSerializer):
+    id = serializers.UUIDField(required=False)
+
+    class Meta(ApplicationCourseSerializer.Meta):
+        fields = [field for field in ApplicationCourseSerializer.Meta.fields
+                  if field != 'application']
+        list_serializer_class = ApplicationChildListSerializer
+
+    def resolve_items(self, validated_data):
+        """Link the XDS courses of every item, validating the missing ones
+        against XDS"""
+        xds_courses = resolve_external_references(
+            Course,
+            [item['course_external_reference'] for item in validated_data],
+            validate_xds_course, XDS_FAILED_ERROR, XDS_EXCEPTION_MSG)
+        for item in validated_data:
+            item['xds_course'] = xds_courses[
+                item.pop('course_external_reference')]
+        return validated_data
+
+
 class ApplicationCommentSerializer(serializers.ModelSerializer,
                                    ObjectPermissionsAssignmentMixin):
     application = serializers.PrimaryKeyRelatedField(
@@ -1043,7 +1551,8 @@ class ApplicationCommentReadSerializer(serializers.ModelSerializer):
                   'modified',]
 
 
-class ApplicationSerializer(serializers.ModelSerializer,
+class ApplicationSerializer(SparseFieldsetSerializerMixin,
+                            serializers.ModelSerializer,
                             ObjectPermissionsAssignmentMixin):
     applicant = serializers.SlugRelatedField(
         slug_field='email',
@@ -1055,6 +1564,7 @@ class ApplicationSerializer(serializers.ModelSerializer,
         many=True, read_only=True)
     comments = ApplicationCommentReadSerializer(
         many=True, read_only=True)
+    certification_file = DocumentUploadField(required=False, allow_null=True)
 
     status = serializers.CharField(read_only=True)
     final_submission = serializers.BooleanField(read_only=True)
@@ -1065,18 +1575,7 @@ class ApplicationSerializer(serializers.ModelSerializer,
     code_of_ethics_acknowledged_stamp = \
         serializers.DateTimeField(read_only=True)
 
-    total_advocacy_hours = serializers.DecimalField(
-        max_digits=10, decimal_places=2, read_only=True
-    )
-    total_marked_for_evaluation_hours = serializers.DecimalField(
-        max_digits=10, decimal_places=2, read_only=True
-    )
-    total_course_clocked_hours = serializers.DecimalField(
-        max_digits=7, decimal_places=2, read_only=True
-    )
-    total_marked_for_evaluation_count = serializers.IntegerField(
-        read_only=True
-    )
+    expandable_fields = ['experiences', 'courses', 'comments',]
 
     class Meta:
         model = Application
@@ -1088,7 +1587,8 @@ class ApplicationSerializer(serializers.ModelSerializer,
                   'has_mil_gov_work_email', 'other_sarc_email',
                   'dsn_code', 'work_phone', 'work_phone_ext',
                   'certification_awarded_date',
-                  'certification_expiration_date', 'no_experience_needed',
+                  'certification_expiration_date', 'certification_file',
+                  'no_experience_needed',
                   'supervisor_last_name', 'supervisor_first_name',
                   'supervisor_email', 'sarc_last_name', 'sarc_first_name',
                   'sarc_email', 'commanding_officer_last_name',
@@ -1163,27 +1663,31 @@ class ApplicationSerializer(serializers.ModelSerializer,
         if self.instance.status != Application.StatusChoices.DRAFT:
             # Get experiences marked for evaluation and
             # the related reviewer/supervisor emails
-            marked_experiences = self.instance.experiences.filter(
-                marked_for_evaluation=True
-            )
-            reviewers = set()
-            for experience in marked_experiences:
-                if experience.supervisor_email:
-                    try:
-                        reviewer = User.objects.get(
-                            email=experience.supervisor_email
-                        )
-                        reviewers.add(reviewer)
-                    except User.DoesNotExist:
-                        # Will need a way to set perms to this non user later
-                        logger.warning(
-                            f'Supervisor email {experience.supervisor_email} '
-                            'not found in db'
-                        )
+            # emails are matched case insensitively
+            emails = {email.lower() for email in self.instance.experiences
+                      .filter(marked_for_evaluation=True)
+                      .exclude(supervisor_email='')
+                      .values_list('supervisor_email', flat=True)}
+            reviewers = list(User.objects.annotate(
+                email_lower=Lower('email')).filter(email_lower__in=emails))
+
+            # share the application with the rest once they register, and
+            # forget those no longer supervising a marked experience
+            unmatched = emails.difference(
+                reviewer.email_lower for reviewer in reviewers)
+            PendingApplicationReviewer.objects.filter(
+                application=self.instance).exclude(
+                email__in=unmatched).delete()
+            if unmatched:
+                PendingApplicationReviewer.objects.bulk_create(
+                    [PendingApplicationReviewer(application=self.instance,
+                                                email=email)
+                     for email in sorted(unmatched)],
+                    ignore_conflicts=True)
 
             if reviewers:
                 perms = {
-                    'view_application': [submitted_by,] + list(reviewers),
+                    'view_application': [submitted_by,] + reviewers,
                     'change_application': [submitted_by,]
                 }
                 # Looks like can use from guardian.shortcuts import remove_perm
@@ -1193,6 +1697,9 @@ class ApplicationSerializer(serializers.ModelSerializer,
 
         return perms
 
+    def assign_permissions(self, permissions_map):
+        assign_permissions_map(permissions_map, self.instance)
+
     def validate_work_email(self, value):
         """
         Validate that work email ends with ".mil" or ".gov"
@@ -1252,3 +1759,85 @@ class ApplicationSerializer(serializers.ModelSerializer,
                 self._validate_renewal_application(attrs)
 
         return super().validate(attrs)
+
+
+class ApplicationSummarySerializer(serializers.ModelSerializer):
+    applicant = serializers.SlugRelatedField(
+        slug_field='email', read_only=True)
+
+    class Meta:
+        model = Application
+        fields = ['id', 'applicant', 'application_type', 'position',
+                  'status', 'first_name', 'last_name',
+                  'final_submission_stamp', 'total_advocacy_hours',
+                  'total_marked_for_evaluation_hours',
+                  'total_marked_for_evaluation_count',
+                  'total_course_clocked_hours', 'modified',]
+        read_only_fields = fields
+
+
+class ApplicationExportSerializer(serializers.ModelSerializer):
+    applicant = serializers.SlugRelatedField(
+        slug_field='email', read_only=True)
+    experiences = ApplicationExperienceReadSerializer(
+        many=True, read_only=True)
+    courses = ApplicationCourseReadSerializer(
+        many=True, read_only=True)
+
+    class Meta:
+        model = Application
+        fields = ['id', 'applicant', 'application_type', 'position',
+                  'status', 'policy', 'application_version', 'first_name',
+                  'last_name', 'middle_initial', 'affiliation', 'mili_status',
+                  'rank', 'grade', 'command_unit', 'installation',
+                  'work_email', 'certification_awarded_date',
+                  'certification_expiration_date', 'supervisor_email',
+                  'sarc_email', 'commanding_officer_email',
+                  'code_of_ethics_acknowledged_stamp', 'final_submission',
+                  'final_submission_stamp', 'total_advocacy_hours',
+                  'total_marked_for_evaluation_hours',
+                  'total_marked_for_evaluation_count',
+                  'total_course_clocked_hours', 'experiences', 'courses',
+                  'modified', 'created',]
+        read_only_fields = fields
+
+
+class ApplicationAnalyticsFilterSerializer(serializers.Serializer):
+    organization = serializers.CharField(required=False, allow_blank=True)
+    position = serializers.ChoiceField(
+        choices=Application.PositionChoices.choices, required=False)
+    application_type = serializers.ChoiceField(
+        choices=Application.ApplicationChoices.choices, required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date = attrs.get('start_date')
+        end_date = attrs.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError(
+                "Start date must be before end date"
+            )
+
+        return super().validate(attrs)
+
+
+class ApplicationAnalyticsSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    by_position = serializers.DictField(child=serializers.IntegerField())
+    by_application_type = serializers.DictField(
+        child=serializers.IntegerField())
+    average_advocacy_hours = serializers.DecimalField(
+        max_digits=14, decimal_places=2, allow_null=True)
+    average_course_clocked_hours = serializers.DecimalField(
+        max_digits=14, decimal_places=2, allow_null=True)
+    average_time_to_review = serializers.DurationField(allow_null=True)
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Tombstone
+        fields = ['model', 'object_id', 'deleted',]
+        read_only_fields = fields
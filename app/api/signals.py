@@ -0,0 +1,219 @@
+import weakref
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from guardian.shortcuts import get_users_with_perms
+
+from api.models import (Application, ApplicationComment, ApplicationCourse,
+                        ApplicationExperience, CandidateList,
+                        CandidateRanking, DocumentUpload, LearningPlan,
+                        LearningPlanCompetency, LearningPlanGoal,
+                        LearningPlanGoalCourse, LearningPlanGoalKsa,
+                        PendingApplicationReviewer, Tombstone,
+                        application_summary_changed,
+                        learner_ksa_scores_changed, prune_pending_reviewers,
+                        refresh_application_totals)
+from api.utils.permission_utils import (bulk_assign_object_perms,
+                                        get_viewers_by_object)
+from api.utils.touch_utils import touch_parent
+from api.utils.upload_utils import discard_upload
+from users.models import User
+
+# experience fields deciding who reviews the application
+REVIEWER_FIELDS = {'marked_for_evaluation', 'supervisor_email'}
+# application fields read by the status summary
+SUMMARY_FIELDS = {'affiliation', 'status', 'position', 'application_type',
+                  'final_submission_stamp', 'reviewed_stamp'}
+TOMBSTONE_MODELS = (CandidateList, CandidateRanking, LearningPlan,
+                    LearningPlanCompetency, LearningPlanGoal,
+                    LearningPlanGoalKsa, LearningPlanGoalCourse, Application,
+                    ApplicationComment, ApplicationExperience,
+                    ApplicationCourse,)
+
+# the pks recorded for each deleted queryset, see record_tombstone
+_recorded_deletes = weakref.WeakKeyDictionary()
+
+
+@receiver(post_delete, sender=CandidateRanking)
+@receiver(post_delete, sender=LearningPlanCompetency)
+@receiver(post_delete, sender=LearningPlanGoal)
+@receiver(post_delete, sender=LearningPlanGoalKsa)
+@receiver(post_delete, sender=LearningPlanGoalCourse)
+@receiver(post_delete, sender=ApplicationComment)
+@receiver(post_delete, sender=ApplicationExperience)
+@receiver(post_delete, sender=ApplicationCourse)
+def child_deleted(sender, instance, **kwargs):
+    """Touch the parent of a deleted child so its modified stamp changes"""
+    touch_parent(instance)
+
+
+@receiver(post_delete, sender=DocumentUpload)
+def document_upload_deleted(sender, instance, **kwargs):
+    """Remove the stored bytes of a deleted upload once it is committed"""
+    transaction.on_commit(lambda: discard_upload(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def grant_pending_reviews(sender, instance, update_fields=None, **kwargs):
+    """Share the applications waiting on the email of a saved user"""
+    if not instance.email or (
+            update_fields is not None and 'email' not in update_fields):
+        return
+
+    pending = list(PendingApplicationReviewer.objects.filter(
+        email=instance.email.lower()).select_related('application'))
+    if pending:
+        bulk_assign_object_perms(
+            instance, [reviewer.application for reviewer in pending],
+            actions=('view',))
+        PendingApplicationReviewer.objects.filter(
+            pk__in=[reviewer.pk for reviewer in pending]).delete()
+
+
+def deleted_directly(sender, instance, origin):
+    """Return whether the instance is deleted by itself or with a queryset
+    of its model, rather than by the cascade of another object"""
+    return origin is instance or (
+        isinstance(origin, QuerySet) and origin.model is sender)
+
+
+@receiver(post_delete, sender=ApplicationExperience)
+@receiver(post_delete, sender=ApplicationCourse)
+def application_child_deleted(sender, instance, origin=None, **kwargs):
+    """Recompute the totals of the application of a deleted child"""
+    # totals of an application being deleted do not matter
+    if deleted_directly(sender, instance, origin):
+        refresh_application_totals([instance.application_id])
+
+
+@receiver(post_save, sender=ApplicationExperience)
+def application_experience_saved(sender, instance, update_fields=None,
+                                 **kwargs):
+    """Forget the pending reviewers the saved experience no longer names"""
+    if update_fields is None or REVIEWER_FIELDS.intersection(update_fields):
+        prune_pending_reviewers([instance.application_id])
+
+
+@receiver(post_delete, sender=ApplicationExperience)
+def application_experience_deleted(sender, instance, origin=None, **kwargs):
+    """Forget the pending reviewers the deleted experience named"""
+    # pending reviewers of an application being deleted go with it
+    if deleted_directly(sender, instance, origin):
+        prune_pending_reviewers([instance.application_id])
+
+
+@receiver(post_save, sender=Application)
+def application_saved(sender, instance, update_fields=None, **kwargs):
+    """Refresh the status summary of the day the application was created"""
+    if update_fields is None or SUMMARY_FIELDS.intersection(update_fields):
+        application_summary_changed([timezone.localdate(instance.created)])
+
+
+@receiver(post_delete, sender=Application)
+def application_deleted(sender, instance, **kwargs):
+    """Drop a deleted application from the status summary"""
+    application_summary_changed([timezone.localdate(instance.created)])
+
+
+@receiver(post_save, sender=LearningPlanGoalKsa)
+@receiver(post_delete, sender=LearningPlanGoalKsa)
+def learning_plan_ksa_changed(sender, instance, **kwargs):
+    """Refresh the KSA scores of the learner of a saved or deleted KSA"""
+    # the goal is still there when its KSAs are deleted along with it
+    learner_ksa_scores_changed(LearningPlan.objects.filter(
+        competencies__goals=instance.plan_goal_id).values_list(
+        'learner', flat=True))
+
+
+@receiver(post_save, sender=ApplicationCourse)
+@receiver(post_delete, sender=ApplicationCourse)
+def application_course_changed(sender, instance, **kwargs):
+    """Refresh the KSA scores of the applicant of a completed course"""
+    learner_ksa_scores_changed(Application.objects.filter(
+        pk=instance.application_id).values_list('applicant', flat=True))
+
+
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    """
+    Record a tombstone for an object deleted directly. The tombstones of
+    every object of a deleted queryset are written with the first one.
+    """
+    # objects removed by a cascade are covered by their ancestor's tombstone
+    if not deleted_directly(sender, instance, origin):
+        return
+
+    if origin is instance:
+        record_tombstones(sender, sender.objects.filter(pk=instance.pk))
+        return
+    # pre_delete is sent for every object before any row is removed
+    recorded = _recorded_deletes.get(origin)
+    if recorded is None or instance.pk not in recorded:
+        _recorded_deletes[origin] = record_tombstones(sender, origin)
+
+
+def record_tombstones(model, queryset):
+    """
+    Record a tombstone for every object of the queryset, looking up the
+    viewers of the objects at once and those of their ancestors once per
+    parent
+
+    Returns:
+        set: the pks of the objects recorded
+    """
+    fields = ['pk', model.tombstone_owner_field]
+    parent_field = getattr(model, 'touch_parent_field', None)
+    parent_viewers = {}
+    if parent_field:
+        fields.append(model._meta.get_field(parent_field).attname)
+    rows = list(queryset.order_by().values_list(*fields))
+    if parent_field:
+        parent_model = model._meta.get_field(parent_field).related_model
+        parent_viewers = {
+            parent_pk: tombstone_viewers(parent)
+            for parent_pk, parent in parent_model.objects.in_bulk(
+                {row[2] for row in rows}).items()}
+
+    viewers_by_object = get_viewers_by_object(
+        model, [row[0] for row in rows])
+    tombstones = []
+    tombstone_viewer_ids = []
+    for pk, owner_id, *parent_pk in rows:
+        viewers = viewers_by_object[str(pk)].union(
+            *(parent_viewers.get(parent, ()) for parent in parent_pk))
+        if owner_id is not None:
+            viewers.add(owner_id)
+        tombstones.append(Tombstone(model=model._meta.label_lower,
+                                    object_id=str(pk), owner_id=owner_id))
+        tombstone_viewer_ids.append(viewers)
+
+    Tombstone.objects.bulk_create(tombstones)
+    Tombstone.viewers.through.objects.bulk_create([
+        Tombstone.viewers.through(tombstone_id=tombstone.pk, user_id=viewer)
+        for tombstone, viewers in zip(tombstones, tombstone_viewer_ids)
+        for viewer in viewers])
+    return {row[0] for row in rows}
+
+
+def tombstone_viewers(instance):
+    """
+    Return the pks of the users that can view instance or one of its
+    ancestors, following the touch_parent_field of each model, directly
+    or through their groups
+    """
+    viewers = set()
+    obj = instance
+    while obj is not None:
+        viewers.update(get_users_with_perms(
+            obj, only_with_perms_in=[f'view_{obj._meta.model_name}'])
+            .values_list('pk', flat=True))
+        parent_field = getattr(obj, 'touch_parent_field', None)
+        obj = getattr(obj, parent_field) if parent_field else None
+    return viewers
+
+
+for model in TOMBSTONE_MODELS:
+    pre_delete.connect(record_tombstone, sender=model,
+                       dispatch_uid=f'tombstone_{model._meta.label_lower}')
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import tag
+from django.utils import timezone
+
+from api.models import Application, ApplicationStatusSummary, Tombstone
+
+from .test_setup import TestSetUp
+
+
+@tag('unit')
+class CommandTests(TestSetUp):
+
+    def test_refresh_application_totals(self):
+        """Test that the command recomputes drifted application totals"""
+        self.application.save()
+        self.application_experience.save()
+        Application.objects.update(total_advocacy_hours=0,
+                                   total_marked_for_evaluation_count=5)
+
+        out = StringIO()
+        call_command('refresh_application_totals', '--batch-size', '1',
+                     stdout=out)
+
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.total_advocacy_hours,
+                         Decimal('100.25'))
+        self.assertEqual(self.application.total_marked_for_evaluation_count,
+                         1)
+        self.assertIn('Refreshed the totals of 1 applications',
+                      out.getvalue())
+
+    def test_refresh_application_totals_bad_batch_size(self):
+        """Test that the command rejects a non positive batch size"""
+        self.assertRaises(CommandError, call_command,
+                          'refresh_application_totals', '--batch-size', '0')
+
+    def test_refresh_application_summary(self):
+        """Test that the command rebuilds the application status summary"""
+        self.application.save()
+        self.application_experience.save()
+        ApplicationStatusSummary.objects.all().delete()
+
+        out = StringIO()
+        call_command('refresh_application_summary', stdout=out)
+
+        summary = ApplicationStatusSummary.objects.get()
+        self.assertEqual(summary.count, 1)
+        self.assertEqual(summary.total_advocacy_hours, Decimal('100.25'))
+        self.assertIn('Refreshed 1 application summary rows', out.getvalue())
+
+    def test_prune_tombstones(self):
+        """Test that the command deletes the tombstones older than the
+        retention period"""
+        old = Tombstone.objects.create(
+            model='api.application', object_id='1',
+            deleted=timezone.now() - timedelta(days=10))
+        old.viewers.add(self.auth_user)
+        Tombstone.objects.create(model='api.application', object_id='2')
+
+        out = StringIO()
+        call_command('prune_tombstones', '--days', '7', '--batch-size', '1',
+                     stdout=out)
+
+        self.assertEqual(list(Tombstone.objects.values_list(
+            'object_id', flat=True)), ['2'])
+        self.assertIn('Pruned 1 tombstones', out.getvalue())
+
+    def test_export_applications(self):
+        """Test that the command writes the applications as JSON lines to
+        stdout or as CSV to a file"""
+        self.application.save()
+        self.application_experience.save()
+
+        out = StringIO()
+        call_command('export_applications', '--format', 'jsonl',
+                     '--chunk-size', '1', stdout=out)
+        record, = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEqual(record['id'], str(self.application.pk))
+        self.assertEqual(record['total_advocacy_hours'], '100.25')
+        self.assertEqual(len(record['experiences']), 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'applications.csv')
+            call_command('export_applications', '--output', path)
+            with open(path, encoding='utf-8') as output:
+                header, row = output.read().splitlines()
+
+        self.assertTrue(header.startswith('id,applicant,'))
+        self.assertTrue(row.startswith(str(self.application.pk)))
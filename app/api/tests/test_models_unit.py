@@ -1,14 +1,26 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
 from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection, connections, transaction
 from django.test import tag
+from django.utils import timezone
+from guardian.models import UserObjectPermission
+from guardian.shortcuts import assign_perm, get_objects_for_user
 
 from api.models import (CandidateList, CandidateRanking, LearningPlan,
                         LearningPlanCompetency, LearningPlanGoal,
                         LearningPlanGoalCourse, LearningPlanGoalKsa,
                         ProfileAnswer, ProfileQuestion,
                         ProfileResponse, Application, ApplicationComment,
-                        ApplicationCourse, ApplicationExperience)
+                        ApplicationCourse, ApplicationExperience,
+                        ApplicationStatusSummary,
+                        ApplicationUserObjectPermission,
+                        SUMMARY_LOCK_NAMESPACE, refresh_application_summary,
+                        refresh_application_totals)
+from api.utils.permission_utils import bulk_assign_object_perms
+from external.models import CourseMetadata
+from users.models import User
 
 from .test_setup import TestSetUp
 
@@ -519,6 +531,27 @@ class ModelTests(TestSetUp):
         self.assertEqual(self.learning_plan_goal.courses.count(), 1)
         self.assertEqual(self.course.xds_courses.count(), 1)
         self.assertIn(str(lpgc.pk), lpgc.get_absolute_url())
+        self.assertIsNone(lpgc.course_metadata)
+
+    def test_learning_plan_goal_course_metadata(self):
+        """Test that Learning Plan Goal Courses expose local XDS metadata"""
+
+        self.learning_plan.save()
+        self.competency.save()
+        self.learning_plan_competency.save()
+        self.learning_plan_goal.save()
+        self.course.save()
+        metadata = {"p2881-core": {"Title": self.course.name}}
+        CourseMetadata.objects.create(course=self.course, metadata=metadata,
+                                      metadata_hash="abc")
+
+        lpgc = LearningPlanGoalCourse.objects.create(
+            plan_goal=self.learning_plan_goal, xds_course=self.course)
+        lpgc = LearningPlanGoalCourse.objects.select_related(
+            'xds_course__xds_metadata').get(pk=lpgc.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(lpgc.course_metadata, metadata)
 
     def test_application(self):
         """Test that creating an Application is successful"""
@@ -584,6 +617,8 @@ class ModelTests(TestSetUp):
     def test_application_experience(self):
         """Test that creating an ApplicationExperience is successful"""
 
+        self.application.save()
+
         app_exp = ApplicationExperience.objects.create(
             application=self.application,
             display_order=1,
@@ -619,6 +654,7 @@ class ModelTests(TestSetUp):
     def test_application_course(self):
         """Test that creating an ApplicationCourse is successful"""
 
+        self.application.save()
         self.course.save()
 
         app_course = ApplicationCourse.objects.create(
@@ -649,6 +685,8 @@ class ModelTests(TestSetUp):
 
         comment_text = "This is a test comment."
 
+        self.application.save()
+
         app_comment = ApplicationComment.objects.create(
             application=self.application,
             reviewer=self.auth_user,
@@ -666,3 +704,134 @@ class ModelTests(TestSetUp):
             f'Comment by {self.auth_user.username} on '
             f'Application ' + f'{self.application.id}'
         )
+
+    def test_application_status_summary(self):
+        """Test that the status summary follows the status transitions and
+        hours of the applications once their transactions commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.application.save()
+            self.application_experience.save()
+        summary = ApplicationStatusSummary.objects.get()
+        self.assertEqual(summary.day,
+                         timezone.localdate(self.application.created))
+        self.assertEqual(summary.organization, 'army')
+        self.assertEqual(summary.status, Application.StatusChoices.DRAFT)
+        self.assertEqual(summary.count, 1)
+        self.assertEqual(summary.total_advocacy_hours, Decimal('100.25'))
+
+        submitted = timezone.now() - timedelta(days=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.application.final_submission_stamp = submitted
+            self.application.status = Application.StatusChoices.APPROVED
+            self.application.save(update_fields=['final_submission_stamp',
+                                                 'status'])
+        self.application.refresh_from_db()
+        self.assertIsNotNone(self.application.reviewed_stamp)
+        summary = ApplicationStatusSummary.objects.get()
+        self.assertEqual(summary.status, Application.StatusChoices.APPROVED)
+        self.assertEqual(summary.reviewed_count, 1)
+        self.assertEqual(summary.total_review_time,
+                         self.application.reviewed_stamp - submitted)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.application.delete()
+        self.assertFalse(ApplicationStatusSummary.objects.exists())
+
+        ApplicationStatusSummary.objects.create(day=date(2020, 1, 1),
+                                                count=3)
+        self.assertEqual(refresh_application_summary(), 0)
+        self.assertFalse(ApplicationStatusSummary.objects.exists())
+
+    def test_application_status_summary_locks_days(self):
+        """Test that a summary refresh waits for the refreshes of the same
+        days, but not of other days"""
+        day = date(2020, 1, 1)
+        other = connections.create_connection('default')
+        self.addCleanup(other.close)
+        with other.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s, %s)',
+                           [SUMMARY_LOCK_NAMESPACE, day.toordinal()])
+
+        refresh_application_summary([day + timedelta(days=1)])
+        with self.assertRaises(OperationalError), transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = '100ms'")
+            refresh_application_summary([day])
+
+    def test_application_totals(self):
+        """Test that the totals of an application follow the writes to its
+        experiences and courses"""
+        self.application.save()
+        self.course.save()
+        self.application_experience.save()
+        ApplicationExperience.objects.create(
+            application=self.application, position_name='Unmarked',
+            start_date=date(2020, 1, 1), advocacy_hours=10)
+        self.application_course.save()
+
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.total_advocacy_hours,
+                         Decimal('110.25'))
+        self.assertEqual(self.application.total_marked_for_evaluation_hours,
+                         Decimal('100.25'))
+        self.assertEqual(self.application.total_marked_for_evaluation_count,
+                         1)
+        self.assertEqual(self.application.total_course_clocked_hours,
+                         Decimal('100.75'))
+
+        self.application_experience.marked_for_evaluation = False
+        self.application_experience.save()
+        self.application_course.delete()
+
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.total_advocacy_hours,
+                         Decimal('110.25'))
+        self.assertEqual(self.application.total_marked_for_evaluation_hours,
+                         0)
+        self.assertEqual(self.application.total_marked_for_evaluation_count,
+                         0)
+        self.assertEqual(self.application.total_course_clocked_hours, 0)
+
+        # a full save of a stale instance keeps the stored totals
+        stale = Application.objects.get(pk=self.application.pk)
+        self.application_course.save()
+        stale.first_name = 'Stale'
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.first_name, 'Stale')
+        self.assertEqual(stale.total_course_clocked_hours,
+                         Decimal('100.75'))
+
+        Application.objects.filter(pk=self.application.pk).update(
+            total_advocacy_hours=0)
+        self.assertEqual(
+            refresh_application_totals([self.application.pk]), 1)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.total_advocacy_hours,
+                         Decimal('110.25'))
+
+    def test_application_object_permissions(self):
+        """Test that application permissions are kept in their own table,
+        filter the applications of a user and go away with them"""
+        self.application.save()
+        other = Application.objects.create(applicant=self.basic_user)
+        reviewer = User.objects.create_user('reviewer@test.mil',
+                                            email='reviewer@test.mil')
+
+        bulk_assign_object_perms(reviewer, [self.application])
+        assign_perm('api.view_application', reviewer, other)
+
+        self.assertEqual(ApplicationUserObjectPermission.objects.filter(
+            user=reviewer).count(), 4)
+        self.assertFalse(UserObjectPermission.objects.exists())
+        self.assertTrue(reviewer.has_perm('api.change_application',
+                                          self.application))
+        self.assertFalse(reviewer.has_perm('api.change_application', other))
+        self.assertEqual(
+            list(get_objects_for_user(reviewer, 'api.change_application',
+                                      Application.objects.all())),
+            [self.application])
+
+        other.delete()
+        self.assertEqual(ApplicationUserObjectPermission.objects.filter(
+            user=reviewer).count(), 3)
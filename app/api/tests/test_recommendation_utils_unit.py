@@ -0,0 +1,125 @@
+import numpy as np
+from django.test import tag
+from django.utils import timezone
+
+from api.models import (LearnerKsaScore, LearningPlanGoalKsa,
+                        refresh_learner_ksa_scores)
+from api.utils.recommendation_utils import (clear_learner_ksa_matrix,
+                                            get_learner_ksa_matrix,
+                                            recommend_candidates,
+                                            score_candidates, top_candidates)
+from external.models import Ksa
+from users.models import User
+
+from .test_setup import TestSetUp
+
+
+@tag('unit')
+class RecommendationUtilsTests(TestSetUp):
+
+    def setUp(self):
+        super().setUp()
+        clear_learner_ksa_matrix()
+        self.addCleanup(clear_learner_ksa_matrix)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.learning_plan.save()
+            self.competency.save()
+            self.learning_plan_competency.save()
+            self.learning_plan_goal.save()
+            self.ksa.save()
+            self.other_ksa = Ksa.objects.create(name='Other KSA',
+                                                reference='ksa/other')
+
+    def test_score_candidates(self):
+        """Test that candidates are scored by the weighted share of the
+        required levels they reach, capped per KSA"""
+        scores = np.array([[1.0, 0.0], [0.25, 0.5], [0.0, 0.0]],
+                          dtype=np.float32)
+        ksa_index = {'a': 0, 'b': 1}
+
+        totals = score_candidates(scores, ksa_index, [
+            ('a', 2, 1), ('b', 2, 3), ('missing', 1, 1)])
+
+        np.testing.assert_allclose(totals, [0.2, 0.7, 0.0], rtol=1e-6)
+        self.assertEqual(list(top_candidates(totals, 1)), [1])
+        self.assertEqual(list(top_candidates(totals, 5)), [1, 0])
+
+    def test_refresh_learner_ksa_scores(self):
+        """Test that learning plan proficiencies become scores and that
+        removed proficiencies are zeroed"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.learning_plan_goal_ksa.current_proficiency = 'Advanced'
+            self.learning_plan_goal_ksa.save()
+
+        score = LearnerKsaScore.objects.get(user=self.auth_user,
+                                            ksa=self.ksa)
+        self.assertEqual(score.score, 0.75)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.learning_plan_goal_ksa.delete()
+
+        score.refresh_from_db()
+        self.assertEqual(score.score, 0)
+        self.assertEqual(refresh_learner_ksa_scores([self.auth_user.pk]), 0)
+
+    def test_get_learner_ksa_matrix(self):
+        """Test that the matrix grows and changes with the scores modified
+        since it was last synced"""
+        LearnerKsaScore.objects.create(user=self.auth_user, ksa=self.ksa,
+                                       score=0.5)
+        scores, users, ksa_index = get_learner_ksa_matrix()
+        self.assertEqual(users, [self.auth_user.pk])
+        self.assertEqual(scores[0, ksa_index[self.ksa.pk]], 0.5)
+
+        LearnerKsaScore.objects.create(user=self.basic_user,
+                                       ksa=self.other_ksa, score=1)
+        LearnerKsaScore.objects.filter(ksa=self.ksa).update(
+            score=0.25, modified=timezone.now())
+        grown, users, ksa_index = get_learner_ksa_matrix()
+
+        self.assertEqual(grown.shape, (2, 2))
+        self.assertEqual(scores.shape, (1, 1))
+        self.assertEqual(grown[users.index(self.auth_user.pk),
+                               ksa_index[self.ksa.pk]], 0.25)
+        self.assertEqual(grown[users.index(self.basic_user.pk),
+                               ksa_index[self.other_ksa.pk]], 1)
+
+    def test_recommend_candidates(self):
+        """Test that the best candidates come first and excluded users are
+        left out"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.learning_plan_goal_ksa.current_proficiency = 'Expert'
+            self.learning_plan_goal_ksa.save()
+            LearningPlanGoalKsa.objects.create(
+                plan_goal=self.learning_plan_goal, eccr_ksa=self.other_ksa,
+                current_proficiency='Basic', target_proficiency='Expert')
+        LearnerKsaScore.objects.create(user=self.basic_user, ksa=self.ksa,
+                                       score=0.25)
+        requirements = [(self.ksa.pk, 2, 1), (self.other_ksa.pk, 2, 1)]
+
+        self.assertEqual(
+            recommend_candidates(requirements, 10),
+            [(self.auth_user, 0.75), (self.basic_user, 0.25)])
+        self.assertEqual(
+            recommend_candidates(requirements, 10,
+                                 exclude=[self.auth_user.pk]),
+            [(self.basic_user, 0.25)])
+
+    def test_recommend_candidates_deleted_user(self):
+        """Test that users deleted after the matrix was loaded are
+        forgotten and their places filled"""
+        other = User.objects.create_user('other@test.mil',
+                                         email='other@test.mil')
+        for user, score in [(self.auth_user, 1), (self.basic_user, 0.5),
+                            (other, 0.25)]:
+            LearnerKsaScore.objects.create(user=user, ksa=self.ksa,
+                                           score=score)
+        requirements = [(self.ksa.pk, 4, 1)]
+        recommend_candidates(requirements, 2)
+
+        self.auth_user.delete()
+
+        self.assertEqual(recommend_candidates(requirements, 2),
+                         [(self.basic_user, 0.5), (other, 0.25)])
+        with self.assertNumQueries(2):
+            recommend_candidates(requirements, 2)
@@ -9,6 +9,7 @@ from api.models import (Application, ApplicationComment, ApplicationCourse,
                         ProfileAnswer, ProfileQuestion,
                         ProfileResponse, TrainingPlan)
 from configuration.models import Configuration
+from configuration.utils.cache_utils import clear_configuration_cache
 from external.models import Competency, Course, Job, Ksa
 from users.models import User
 
@@ -23,6 +24,10 @@ class TestSetUp(APITestCase):
         settings_manager.enable()
         self.addCleanup(settings_manager.disable)
 
+        # start every test without a cached Configuration
+        clear_configuration_cache()
+        self.addCleanup(clear_configuration_cache)
+
         # Auth stuff
         self.auth_email = "test_auth@test.com"
         self.auth_password = "test_auth1234"
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import tag
+from django.utils import timezone
+
+from api.models import (LearningPlan, LearningPlanCompetency,
+                        LearningPlanGoal, LearningPlanGoalKsa)
+from api.utils.batch_utils import CommitBatch, get_pending_batch
+from api.utils.touch_utils import flush_touched, flush_touches
+from external.models import Ksa
+
+from .test_setup import TestSetUp
+
+
+@tag('unit')
+class TouchUtilsTests(TestSetUp):
+
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.learning_plan.save()
+            self.competency.save()
+            self.learning_plan_competency.save()
+            self.learning_plan_goal.save()
+
+        # age the plan tree so the touches are visible
+        self.past = timezone.now() - timedelta(days=1)
+        for model in [LearningPlan, LearningPlanCompetency, LearningPlanGoal]:
+            model.objects.update(modified=self.past)
+
+    def create_ksas(self, count):
+        """Create count KSAs on the learning plan goal"""
+        for i in range(count):
+            LearningPlanGoalKsa.objects.create(
+                plan_goal=self.learning_plan_goal,
+                eccr_ksa=Ksa.objects.create(name=f"KSA {i}",
+                                            reference=f"ksa/{i}"),
+                current_proficiency="low", target_proficiency="high")
+
+    def test_touches_deferred_until_commit(self):
+        """Test that the ancestors are only touched once the transaction
+        commits, with one UPDATE per table"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_ksas(5)
+
+            self.assertEqual(LearningPlan.objects.get().modified, self.past)
+
+        # a single touch batch, next to the learner KSA score batch
+        touches = [callback for callback in callbacks
+                   if isinstance(callback, CommitBatch)
+                   and callback.flush is flush_touched]
+        self.assertEqual(len(touches), 1)
+        # SAVEPOINT, one UPDATE per ancestor table, RELEASE SAVEPOINT
+        with self.assertNumQueries(5):
+            touches[0]()
+
+        for model in [LearningPlan, LearningPlanCompetency, LearningPlanGoal]:
+            self.assertGreater(model.objects.get().modified, self.past)
+
+    def test_touches_after_rollback(self):
+        """Test that touches made after a rolled back savepoint are still
+        written on commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.create_ksas(1)
+                    raise ValueError()
+            except ValueError:
+                pass
+
+            LearningPlanCompetency.objects.get().save()
+
+        self.assertGreater(LearningPlan.objects.get().modified, self.past)
+        self.assertEqual(LearningPlanGoal.objects.get().modified, self.past)
+
+    def test_batch_dropped_on_rollback(self):
+        """Test that a batch registered in a rolled back savepoint is no
+        longer pending"""
+        with self.captureOnCommitCallbacks():
+            try:
+                with transaction.atomic():
+                    self.create_ksas(1)
+                    self.assertIsNotNone(get_pending_batch(flush_touched))
+                    raise ValueError()
+            except ValueError:
+                pass
+
+            self.assertIsNone(get_pending_batch(flush_touched))
+
+    def test_flush_touches(self):
+        """Test that flushing touches updates the rows and ancestors"""
+        flush_touches({LearningPlanGoal: {self.learning_plan_goal.pk},
+                       LearningPlanCompetency: set()})
+
+        for model in [LearningPlan, LearningPlanCompetency, LearningPlanGoal]:
+            self.assertGreater(model.objects.get().modified, self.past)
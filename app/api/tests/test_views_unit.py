@@ -1,10 +1,40 @@
+import csv
+import hashlib
 import json
+import os
+import tempfile
 import uuid
+from datetime import timedelta
 from unittest.mock import patch
 
-from django.test import tag
+from django.contrib.auth.models import Group, Permission
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, override_settings, tag
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from guardian.shortcuts import assign_perm
+from guardian.utils import get_user_obj_perms_model
 from rest_framework import status
+from rest_framework.request import Request
+
+from api.models import (Application, ApplicationCourse,
+                        ApplicationExperience,
+                        ApplicationExperienceUserObjectPermission,
+                        ApplicationUserObjectPermission, CandidateRanking,
+                        DocumentUpload, LearningPlan,
+                        LearningPlanCompetency, LearningPlanGoal,
+                        LearningPlanGoalCourse, LearningPlanGoalKsa,
+                        LearnerKsaScore, PendingApplicationReviewer,
+                        Tombstone, refresh_application_summary)
+from api.utils.permission_utils import bulk_assign_object_perms
+from api.utils.recommendation_utils import clear_learner_ksa_matrix
+from external.models import Competency, Course, JobKsa, Ksa
+from users.models import User
+from vacancies.models import Vacancy
+
+from portal.permissions import (get_permission_checker, has_object_perm,
+                                prefetch_object_perms)
 
 from .test_setup import TestSetUp
 
@@ -181,6 +211,32 @@ class ViewTests(TestSetUp):
         self.assertEqual(self.cl.ranker.email,
                          responseDict['ranker'])
 
+    def test_candidate_list_requests_sparse_fieldset(self):
+        """Test that candidate lists render and prefetch only the fields
+        asked for with fields and expand"""
+        self.job.save()
+        self.cl.save()
+        self.cr.save()
+        url = reverse('api:candidate-lists-list')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        self.client.get(url)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'fields': 'id,name'})
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(responseDict, [{'id': self.cl.pk,
+                                         'name': self.cl.name}])
+
+        response = self.client.get(url, {'fields': 'id',
+                                         'expand': 'rankings'})
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(set(responseDict[0]), {'id', 'rankings'})
+        self.assertEqual(len(responseDict[0]['rankings']), 1)
+
     def test_candidate_list_requests_post(self):
         """Test that making a post request to the candidate list api with
         valid data creates a candidate list"""
@@ -202,6 +258,84 @@ class ViewTests(TestSetUp):
         self.assertEqual(self.auth_user.email,
                          responseDict['ranker'])
 
+    def test_candidate_list_requests_rerank(self):
+        """Test that reordering a candidate list ranks every candidate in
+        one request with a fixed number of queries"""
+        self.job.save()
+        self.cl.save()
+        candidates = [User.objects.create_user(f'candidate{rank}@test.mil',
+                                               f'candidate{rank}@test.mil',
+                                               'password')
+                      for rank in range(1, 51)]
+        CandidateRanking.objects.bulk_create(
+            CandidateRanking(candidate_list=self.cl, candidate=candidate,
+                             rank=rank)
+            for rank, candidate in enumerate(candidates, start=1))
+        order = [candidates[-1], *candidates[:-1]]
+        url = reverse(API_CANDIDATE_LISTS_DETAIL,
+                      kwargs={'pk': self.cl.pk}) + 'rerank/'
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        with self.assertNumQueries(11), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                url, {'candidates': [user.email for user in order]},
+                format='json')
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([ranking['candidate'] for ranking in responseDict],
+                         [user.email for user in order])
+        self.assertEqual(
+            list(CandidateRanking.objects.filter(candidate_list=self.cl)
+                 .values_list('candidate', flat=True)),
+            [user.pk for user in order])
+        modified = self.cl.modified
+        self.cl.refresh_from_db()
+        self.assertGreater(self.cl.modified, modified)
+
+        response = self.client.post(
+            url, {'candidates': [user.email for user in order[1:]]},
+            format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_candidate_recommendation_requests(self):
+        """Test that the learners best matching the KSAs of a job or of the
+        job of a vacancy are recommended"""
+        clear_learner_ksa_matrix()
+        self.addCleanup(clear_learner_ksa_matrix)
+        self.job.save()
+        self.ksa.save()
+        self.cl.save()
+        JobKsa.objects.create(job=self.job, ksa=self.ksa, required_level=2)
+        vacancy = Vacancy.objects.create(vacancy_key='vacancy', job=self.job)
+        LearnerKsaScore.objects.create(user=self.auth_user, ksa=self.ksa,
+                                       score=0.25)
+        LearnerKsaScore.objects.create(user=self.basic_user, ksa=self.ksa,
+                                       score=1)
+        url = reverse('api:candidate_recommendations')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        response = self.client.get(f'{url}?job={self.job.pk}')
+        responseDict = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(candidate['candidate'], candidate['score'])
+                          for candidate in responseDict],
+                         [(self.basic_email, 1.0), (self.auth_email, 0.5)])
+
+        self.cr.candidate = self.basic_user
+        self.cr.save()
+        response = self.client.get(
+            f'{url}?vacancy={vacancy.pk}&candidate_list={self.cl.pk}')
+        responseDict = json.loads(response.content)
+        self.assertEqual([candidate['candidate']
+                          for candidate in responseDict], [self.auth_email])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_candidate_ranking_requests_no_auth(self):
         """Test that making a get request to the candidate ranking api with no
         auth returns an error"""
@@ -811,6 +945,440 @@ class ViewTests(TestSetUp):
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    def create_learning_plan_tree(self, size):
+        """Save the learning plan with size competencies, each with size
+        goals of size KSAs and size courses"""
+        self.learning_plan.save()
+        for i in range(size):
+            competency = Competency.objects.create(
+                name=f"Competency {i}", reference=f"competency/{i}")
+            plan_competency = LearningPlanCompetency.objects.create(
+                learning_plan=self.learning_plan, eccr_competency=competency,
+                priority="High")
+            for j in range(size):
+                goal = LearningPlanGoal.objects.create(
+                    plan_competency=plan_competency, goal_name=f"Goal {j}",
+                    timeline=3)
+                for k in range(size):
+                    ksa = Ksa.objects.create(
+                        name=f"KSA {i}{j}{k}", reference=f"ksa/{i}{j}{k}")
+                    course = Course.objects.create(
+                        name=f"Course {i}{j}{k}", reference=f"{i}{j}{k}")
+                    LearningPlanGoalKsa.objects.create(
+                        plan_goal=goal, eccr_ksa=ksa,
+                        current_proficiency="low",
+                        target_proficiency="high")
+                    LearningPlanGoalCourse.objects.create(
+                        plan_goal=goal, xds_course=course)
+
+    def test_learning_plan_requests_query_budget(self):
+        """Test that rendering learning plans costs a fixed number of
+        queries regardless of the size of the plan"""
+        self.create_learning_plan_tree(3)
+        goal = LearningPlanGoal.objects.first()
+        competency = goal.plan_competency
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        requests = [
+            # learning plans are served from their cached snapshots
+            (reverse('api:learning-plans-list'), 4),
+            (reverse(API_LEARNING_PLANS_DETAIL,
+                     kwargs={"pk": self.learning_plan.pk}), 4),
+            (reverse('api:learning-plan-competencies-list'), 6),
+            (reverse(API_LEARNING_PLAN_COMPETENCIES_DETAIL,
+                     kwargs={"pk": competency.pk}), 6),
+            (reverse('api:learning-plan-goals-list'), 5),
+            (reverse(API_LEARNING_PLAN_GOALS_DETAIL,
+                     kwargs={"pk": goal.pk}), 5),
+            (reverse('api:learning-plan-goal-ksas-list'), 3),
+            (reverse('api:learning-plan-goal-courses-list'), 3),
+        ]
+        for url, queries in requests:
+            # the first request also loads the content types and snapshots
+            self.client.get(url)
+            with self.subTest(url=url), self.assertNumQueries(queries):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse(
+            API_LEARNING_PLANS_DETAIL, kwargs={"pk": self.learning_plan.pk}))
+        competencies = json.loads(response.content)['competencies']
+        self.assertEqual(len(competencies), 3)
+        self.assertEqual(len(competencies[0]['goals'][0]['ksas']), 3)
+        course_names = {course['course_name']
+                        for competency in competencies
+                        for goal in competency['goals']
+                        for course in goal['courses']}
+        self.assertEqual(len(course_names), 27)
+
+    def test_learning_plan_requests_sparse_fieldset(self):
+        """Test that learning plans asked for without their competencies
+        are served without loading the tree"""
+        self.create_learning_plan_tree(2)
+        url = reverse('api:learning-plans-list')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        self.client.get(url)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'expand': ''})
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(responseDict[0]['name'], self.learning_plan.name)
+        self.assertNotIn('competencies', responseDict[0])
+
+        response = self.client.get(
+            reverse(API_LEARNING_PLANS_DETAIL,
+                    kwargs={"pk": self.learning_plan.pk}),
+            {'fields': 'id', 'expand': 'competencies'})
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(set(responseDict), {'id', 'competencies'})
+        self.assertEqual(len(responseDict['competencies']), 2)
+
+    def test_learning_plan_requests_snapshot(self):
+        """Test that learning plans are served from a snapshot until
+        something in their tree changes"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_learning_plan_tree(1)
+        url = reverse(API_LEARNING_PLANS_DETAIL,
+                      kwargs={"pk": self.learning_plan.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        first = self.client.get(url)
+
+        with patch('api.views.LearningPlanSerializer') as serializer:
+            cached = self.client.get(url)
+            serializer.assert_not_called()
+        self.assertEqual(cached.content, first.content)
+
+        goal = LearningPlanGoal.objects.get()
+        goal.goal_name = "Renamed Goal"
+        with self.captureOnCommitCallbacks(execute=True):
+            goal.save()
+        response = self.client.get(url)
+        goal_data = json.loads(response.content)['competencies'][0][
+            'goals'][0]
+
+        self.assertEqual(goal_data['goal_name'], "Renamed Goal")
+        self.assertEqual(len(goal_data['ksas']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LearningPlanGoalKsa.objects.get().delete()
+        response = self.client.get(reverse('api:learning-plans-list'))
+        goal_data = json.loads(response.content)[0]['competencies'][0][
+            'goals'][0]
+
+        self.assertEqual(goal_data['ksas'], [])
+
+    def learning_plan_document(self, size):
+        """A learning plan document with size competencies, each with size
+        goals of size KSAs and size courses"""
+        return {
+            'name': "Tree Plan",
+            'timeframe': "Short-term (1-2 years)",
+            'competencies': [{
+                'competency_external_reference': f"competency/{i}",
+                'priority': "High",
+                'goals': [{
+                    'goal_name': f"Goal {i}{j}",
+                    'timeline': 3,
+                    'ksas': [{'ksa_external_reference': f"ksa/{k}",
+                              'current_proficiency': "low",
+                              'target_proficiency': "high"}
+                             for k in range(size)],
+                    'courses': [{'course_external_reference': f"course/{k}"}
+                                for k in range(size)],
+                } for j in range(size)],
+            } for i in range(size)],
+        }
+
+    def store_goal_tree(self, learner, goal_tree):
+        """Stand in for ELRR, giving every goal, KSA and course an id"""
+        for goal, ksas, courses in goal_tree:
+            goal.elrr_goal_id = uuid.uuid4()
+            for ksa in ksas:
+                ksa.elrr_ksa_id = uuid.uuid4()
+            for course in courses:
+                course.elrr_course_id = uuid.uuid4()
+
+    @patch('api.serializers.store_goal_tree_to_elrr')
+    @patch('api.serializers.validate_xds_course')
+    @patch('api.serializers.validate_eccr_item')
+    def test_learning_plan_tree_requests_post(self, mock_eccr, mock_xds,
+                                              mock_elrr):
+        """Test that posting a whole learning plan document creates the
+        tree with a fixed number of queries"""
+        mock_eccr.return_value = "ECCR Item"
+        mock_xds.return_value = "XDS Course"
+        mock_elrr.side_effect = self.store_goal_tree
+        Competency.objects.create(name="Existing", reference="competency/0")
+
+        url = reverse('api:learning-plans-create-tree')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        # 3 competencies, 9 goals, 27 KSAs and 27 courses
+        document = self.learning_plan_document(3)
+        response = self.client.post(url, document, format='json')
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(responseDict['learner'], self.auth_email)
+        self.assertEqual(len(responseDict['competencies']), 3)
+        self.assertEqual(
+            len(responseDict['competencies'][0]['goals'][0]['ksas']), 3)
+        self.assertEqual(LearningPlanGoalCourse.objects.count(), 27)
+        self.assertFalse(LearningPlanGoal.objects.filter(
+            elrr_goal_id__isnull=True).exists())
+        # only the missing references are validated
+        self.assertEqual(mock_eccr.call_count, 2 + 3)
+        self.assertEqual(mock_xds.call_count, 3)
+        mock_elrr.assert_called_once()
+        # view, change and delete on the plan and all 66 children
+        self.assertEqual(sum(
+            get_user_obj_perms_model(model).objects.filter(
+                user=self.auth_user).count()
+            for model in [LearningPlan, LearningPlanCompetency,
+                          LearningPlanGoal, LearningPlanGoalKsa,
+                          LearningPlanGoalCourse]), 3 * 67)
+
+        # 16 queries to write the tree whatever its size, one permission
+        # insert per table, the rest are authentication, the transaction and
+        # reading the tree back
+        with self.assertNumQueries(24):
+            self.client.post(url, document, format='json')
+
+    @patch('api.serializers.remove_goal_from_elrr')
+    @patch('api.serializers.store_goal_tree_to_elrr')
+    @patch('api.serializers.validate_xds_course')
+    @patch('api.serializers.validate_eccr_item')
+    def test_learning_plan_tree_requests_put(self, mock_eccr, mock_xds,
+                                             mock_elrr, mock_remove):
+        """Test that putting a whole learning plan document replaces the
+        tree and removes the old goals from ELRR"""
+        mock_eccr.return_value = "ECCR Item"
+        mock_xds.return_value = "XDS Course"
+        mock_elrr.side_effect = self.store_goal_tree
+        self.learning_plan.save()
+        self.competency.save()
+        self.learning_plan_competency.save()
+        self.learning_plan_goal.elrr_goal_id = uuid.uuid4()
+        self.learning_plan_goal.save()
+
+        url = reverse('api:learning-plans-replace-tree',
+                      kwargs={"pk": self.learning_plan.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.put(url, self.learning_plan_document(2),
+                                   format='json')
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(responseDict['name'], "Tree Plan")
+        self.assertEqual(len(responseDict['competencies']), 2)
+        self.assertFalse(LearningPlanGoal.objects.filter(
+            pk=self.learning_plan_goal.pk).exists())
+        mock_remove.assert_called_once_with(
+            str(self.learning_plan_goal.elrr_goal_id))
+
+    @patch('api.serializers.store_goal_tree_to_elrr')
+    @patch('api.serializers.validate_xds_course')
+    @patch('api.serializers.validate_eccr_item')
+    def test_learning_plan_tree_requests_elrr_error(self, mock_eccr,
+                                                    mock_xds, mock_elrr):
+        """Test that an ELRR failure creates nothing"""
+        mock_eccr.return_value = "ECCR Item"
+        mock_xds.return_value = "XDS Course"
+        mock_elrr.side_effect = ConnectionError("down")
+
+        url = reverse('api:learning-plans-create-tree')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.post(url, self.learning_plan_document(1),
+                                    format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(LearningPlan.objects.exists())
+
+    @patch('api.serializers.bulk_assign_object_perms')
+    @patch('api.serializers.remove_goal_from_elrr')
+    @patch('api.serializers.store_goal_tree_to_elrr')
+    @patch('api.serializers.validate_xds_course')
+    @patch('api.serializers.validate_eccr_item')
+    def test_learning_plan_tree_requests_rollback(self, mock_eccr, mock_xds,
+                                                  mock_elrr, mock_remove,
+                                                  mock_perms):
+        """Test that the ELRR goals of a rolled back tree are removed"""
+        mock_eccr.return_value = "ECCR Item"
+        mock_xds.return_value = "XDS Course"
+        mock_elrr.side_effect = self.store_goal_tree
+        mock_perms.side_effect = DatabaseError("rolled back")
+
+        url = reverse('api:learning-plans-create-tree')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        with self.assertRaises(DatabaseError):
+            self.client.post(url, self.learning_plan_document(2),
+                             format='json')
+
+        self.assertFalse(LearningPlan.objects.exists())
+        # the references were stored before the transaction
+        self.assertEqual(Ksa.objects.count(), 2)
+        goal_tree = mock_elrr.call_args[0][1]
+        self.assertEqual(
+            sorted(call[0][0] for call in mock_remove.call_args_list),
+            sorted(str(goal.elrr_goal_id) for goal, _, _ in goal_tree))
+        self.assertEqual(mock_remove.call_count, 4)
+
+    def test_learning_plan_tree_requests_homoglyph(self):
+        """Test that homoglyphs anywhere in the document are rejected"""
+        document = self.learning_plan_document(1)
+        document['competencies'][0]['goals'][0]['goal_name'] = "аpple"
+
+        url = reverse('api:learning-plans-create-tree')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.post(url, document, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(LearningPlan.objects.exists())
+
+    def test_learning_plan_requests_modified_since(self):
+        """Test that learning plan listings can be limited to the plans
+        changed after modified_since"""
+        self.learning_plan.save()
+        old_plan = LearningPlan.objects.create(
+            learner=self.auth_user, name="Old Plan",
+            timeframe=self.learning_plan.timeframe)
+        since = timezone.now() - timedelta(days=1)
+        LearningPlan.objects.filter(pk=old_plan.pk).update(
+            modified=since - timedelta(days=1))
+
+        url = reverse('api:learning-plans-list')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.get(url, {'modified_since': since.isoformat()})
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([plan['id'] for plan in responseDict],
+                         [self.learning_plan.pk])
+
+        response = self.client.get(url, {'modified_since': 'yesterday'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tombstone_requests(self):
+        """Test that deleting a learning plan records a single tombstone that
+        only its learner can list"""
+        self.learning_plan.save()
+        self.competency.save()
+        self.learning_plan_competency.save()
+        plan_pk = self.learning_plan.pk
+        since = timezone.now()
+
+        self.learning_plan.delete()
+
+        # the cascaded competency is covered by the plan's tombstone
+        tombstone = Tombstone.objects.get()
+        self.assertEqual(tombstone.model, 'api.learningplan')
+        self.assertEqual(tombstone.object_id, str(plan_pk))
+        self.assertEqual(tombstone.owner, self.auth_user)
+
+        url = reverse('api:tombstones-list')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.get(url, {'modified_since': since.isoformat(),
+                                         'model': 'api.learningplan'})
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(responseDict[0]['object_id'], str(plan_pk))
+
+        response = self.client.get(url, {'modified_since': timezone.now()})
+
+        self.assertEqual(json.loads(response.content), [])
+
+        self.client.logout()
+        self.client.login(username=self.basic_email,
+                          password=self.basic_password)
+        response = self.client.get(url)
+
+        self.assertEqual(json.loads(response.content), [])
+
+    def test_tombstone_requests_shared(self):
+        """Test that the users an object is shared with, directly, through
+        a group or through its parent, list its tombstone"""
+        reviewer, member = [
+            User.objects.create_user(email, email=email,
+                                     password=self.basic_password)
+            for email in ('reviewer@test.mil', 'member@test.mil')]
+        group = Group.objects.create(name='reviewers')
+        member.groups.add(group)
+        self.application.save()
+        self.application_experience.save()
+        assign_perm('api.view_application', reviewer, self.application)
+        assign_perm('api.view_application', group, self.application)
+
+        self.application_experience.delete()
+        self.application.delete()
+
+        url = reverse('api:tombstones-list')
+        for email in ('reviewer@test.mil', 'member@test.mil'):
+            self.client.login(username=email, password=self.basic_password)
+            response = self.client.get(url)
+
+            self.assertEqual(
+                [tombstone['model']
+                 for tombstone in json.loads(response.content)],
+                ['api.applicationexperience', 'api.application'])
+
+    def test_tombstone_queryset_delete(self):
+        """Test that deleting a queryset records the tombstones of all its
+        objects with a number of tombstone and permission queries
+        independent of its size"""
+        reviewer, member = [
+            User.objects.create_user(email, email=email,
+                                     password=self.basic_password)
+            for email in ('reviewer@test.mil', 'member@test.mil')]
+        group = Group.objects.create(name='reviewers')
+        member.groups.add(group)
+        self.application.save()
+        assign_perm('api.view_application', reviewer, self.application)
+
+        queries = []
+        for count in (2, 5):
+            experiences = ApplicationExperience.objects.bulk_create([
+                ApplicationExperience(
+                    application=self.application, position_name='SAPR VA',
+                    start_date='2020-09-18', display_order=order)
+                for order in range(count)])
+            assign_perm('api.view_applicationexperience', group,
+                        experiences[0])
+            with CaptureQueriesContext(connection) as context:
+                ApplicationExperience.objects.filter(
+                    application=self.application).delete()
+            # the other delete signals run per object
+            queries.append(len([
+                query for query in context.captured_queries
+                if 'tombstone' in query['sql']
+                or 'permission' in query['sql']]))
+
+            tombstones = Tombstone.objects.filter(
+                object_id__in=[str(experience.pk)
+                               for experience in experiences])
+            self.assertEqual(tombstones.count(), count)
+            self.assertEqual(
+                {tombstone.object_id: set(tombstone.viewers.values_list(
+                    'pk', flat=True)) for tombstone in tombstones},
+                {str(experience.pk): {self.auth_user.pk, reviewer.pk,
+                                      *([member.pk] if order == 0 else [])}
+                 for order, experience in enumerate(experiences)})
+
+        self.assertEqual(queries[0], queries[1])
+
 
 @tag('unit')
 class ApplicationViewTests(TestSetUp):
@@ -860,6 +1428,84 @@ class ApplicationViewTests(TestSetUp):
         self.assertEqual(self.application.status,
                          responseDict['status'])
 
+    def test_application_requests_owner_permissions(self):
+        """Test that a user lists the applications they own or that are
+        shared with them or their groups, and no others"""
+        view = Permission.objects.get(codename='view_application')
+        owner, reviewer = [
+            User.objects.create_user(email, email=email,
+                                     password=self.basic_password)
+            for email in ('owner@test.mil', 'reviewer@test.mil')]
+        group = Group.objects.create(name='reviewers')
+        reviewer.groups.add(group)
+        for user in (owner, reviewer):
+            user.user_permissions.add(view)
+        owned = Application.objects.create(applicant=owner)
+        shared = Application.objects.create(applicant=self.auth_user)
+        group_shared = Application.objects.create(applicant=self.basic_user)
+        Application.objects.create(applicant=self.basic_user)
+        bulk_assign_object_perms(owner, [owned])
+        assign_perm('api.view_application', reviewer, shared)
+        assign_perm('api.view_application', group, group_shared)
+        url = reverse('api:applications-list')
+
+        self.client.login(username='owner@test.mil',
+                          password=self.basic_password)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([application['id'] for application
+                          in json.loads(response.content)],
+                         [str(owned.pk)])
+
+        self.client.login(username='reviewer@test.mil',
+                          password=self.basic_password)
+        response = self.client.get(url)
+        self.assertEqual({application['id'] for application
+                          in json.loads(response.content)},
+                         {str(shared.pk), str(group_shared.pk)})
+
+        # past the inline limit the shared pks are read by a subquery
+        with patch('portal.filters.OwnerPermissionsFilter.max_shared_pks',
+                   1):
+            response = self.client.get(url)
+        self.assertEqual({application['id'] for application
+                          in json.loads(response.content)},
+                         {str(shared.pk), str(group_shared.pk)})
+
+    def test_application_requests_permission_checker(self):
+        """Test that the object permissions of a request are loaded once and
+        that reviewers get a 403 rather than a 404 on changes"""
+        reviewer = User.objects.create_user('reviewer@test.mil',
+                                            email='reviewer@test.mil',
+                                            password=self.basic_password)
+        reviewer.user_permissions.add(
+            *Permission.objects.filter(codename__in=['view_application',
+                                                     'change_application']))
+        shared = Application.objects.create(applicant=self.auth_user)
+        hidden = Application.objects.create(applicant=self.basic_user)
+        assign_perm('api.view_application', reviewer, shared)
+        request = Request(RequestFactory().get('/'))
+        request.user = reviewer
+
+        # the user and the group permission tables
+        with self.assertNumQueries(2):
+            prefetch_object_perms(request, [shared, hidden])
+        with self.assertNumQueries(0):
+            self.assertTrue(has_object_perm(request, 'api.view_application',
+                                            shared))
+            self.assertFalse(has_object_perm(
+                request, 'api.change_application', shared))
+            self.assertFalse(has_object_perm(request, 'api.view_application',
+                                             hidden))
+        self.assertIs(get_permission_checker(request._request),
+                      get_permission_checker(request))
+
+        self.client.login(username='reviewer@test.mil',
+                          password=self.basic_password)
+        url = reverse(API_APPLICATIONS_DETAIL, kwargs={'pk': shared.pk})
+        response = self.client.patch(url, {'rank': 'E8'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_application_requests_post_draft(self):
         """Test that making a post request to the application api with
         valid data creates a draft application"""
@@ -921,6 +1567,370 @@ class ApplicationViewTests(TestSetUp):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(responseDict['detail'], 'Application final submitted')
 
+    def test_application_requests_patch_reviewers(self):
+        """Test that saving a submitted application shares it with the
+        supervisors marked for evaluation, once they have an account"""
+        self.application.status = \
+            Application.StatusChoices.ADDITIONAL_INFO_NEEDED
+        self.application.save()
+        self.application_experience.supervisor_email = self.basic_email
+        self.application_experience.save()
+        ApplicationExperience.objects.create(
+            application=self.application, position_name='SAPR VA',
+            start_date='2019-09-18', marked_for_evaluation=True,
+            supervisor_email='new.reviewer@army.mil')
+
+        url = reverse(API_APPLICATIONS_DETAIL,
+                      kwargs={'pk': self.application.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.patch(url, {'rank': 'E8'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(ApplicationUserObjectPermission.objects.filter(
+                user=self.basic_user, content_object=self.application)
+                .values_list('permission__codename', flat=True)),
+            ['view_application'])
+        pending = PendingApplicationReviewer.objects.get()
+        self.assertEqual(pending.email, 'new.reviewer@army.mil')
+
+        reviewer = User.objects.create_user(
+            username='new.reviewer', email='new.reviewer@army.mil')
+
+        self.assertTrue(reviewer.has_perm('api.view_application',
+                                          self.application))
+        self.assertFalse(PendingApplicationReviewer.objects.exists())
+
+    def test_application_requests_pending_reviewers_case(self):
+        """Test that supervisor emails match accounts case insensitively"""
+        self.application.status = \
+            Application.StatusChoices.ADDITIONAL_INFO_NEEDED
+        self.application.save()
+        self.application_experience.supervisor_email = 'New.Reviewer@army.mil'
+        self.application_experience.save()
+
+        url = reverse(API_APPLICATIONS_DETAIL,
+                      kwargs={'pk': self.application.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        self.client.patch(url, {'rank': 'E8'})
+
+        self.assertEqual(PendingApplicationReviewer.objects.get().email,
+                         'new.reviewer@army.mil')
+
+        reviewer = User.objects.create_user(
+            username='new.reviewer', email='NEW.reviewer@army.mil')
+
+        self.assertTrue(reviewer.has_perm('api.view_application',
+                                          self.application))
+        self.assertFalse(PendingApplicationReviewer.objects.exists())
+
+    def test_application_requests_stale_pending_reviewers(self):
+        """Test that pending reviewers are forgotten once no experience
+        marked for evaluation names them"""
+        self.application.status = \
+            Application.StatusChoices.ADDITIONAL_INFO_NEEDED
+        self.application.save()
+        self.application_experience.supervisor_email = 'old@army.mil'
+        self.application_experience.save()
+        other = ApplicationExperience.objects.create(
+            application=self.application, position_name='SAPR VA',
+            start_date='2019-09-18', marked_for_evaluation=True,
+            supervisor_email='other@army.mil')
+
+        url = reverse(API_APPLICATIONS_DETAIL,
+                      kwargs={'pk': self.application.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        self.client.patch(url, {'rank': 'E8'})
+
+        self.assertEqual(
+            set(PendingApplicationReviewer.objects.values_list(
+                'email', flat=True)), {'old@army.mil', 'other@army.mil'})
+
+        self.application_experience.supervisor_email = 'new@army.mil'
+        self.application_experience.save()
+        other.marked_for_evaluation = False
+        other.save(update_fields=['marked_for_evaluation'])
+
+        self.assertFalse(PendingApplicationReviewer.objects.exists())
+
+        self.client.patch(url, {'rank': 'E9'})
+
+        self.assertEqual(
+            list(PendingApplicationReviewer.objects.values_list(
+                'email', flat=True)), ['new@army.mil'])
+
+    def test_application_review_queue_requests(self):
+        """Test that the review queue pages through the submitted
+        applications the current user supervises, oldest first"""
+        stamp = timezone.now() - timedelta(days=10)
+        applications = []
+        for day in range(5):
+            application = Application.objects.create(
+                applicant=self.auth_user, first_name='First',
+                last_name='Last', status=Application.StatusChoices.SUBMITTED,
+                final_submission=True,
+                final_submission_stamp=stamp + timedelta(days=day % 3))
+            ApplicationExperience.objects.create(
+                application=application, position_name='SAPR VA',
+                start_date='2020-09-18', marked_for_evaluation=True,
+                # supervisor emails match in any case
+                supervisor_email=(self.basic_email.upper() if day % 2
+                                  else self.basic_email))
+            applications.append(application)
+        # drafts, unmarked experiences and other supervisors are left out
+        applications[4].status = Application.StatusChoices.DRAFT
+        applications[4].save()
+        other = Application.objects.create(
+            applicant=self.auth_user,
+            status=Application.StatusChoices.UNDER_REVIEW,
+            final_submission_stamp=stamp)
+        ApplicationExperience.objects.create(
+            application=other, position_name='SAPR VA',
+            start_date='2020-09-18', supervisor_email=self.basic_email)
+        ApplicationExperience.objects.create(
+            application=other, position_name='SAPR VA',
+            start_date='2020-09-18', marked_for_evaluation=True,
+            supervisor_email=self.auth_email)
+
+        expected = [str(application.pk) for application in sorted(
+            applications[:4],
+            key=lambda app: (app.final_submission_stamp, app.pk))]
+
+        url = reverse('api:applications-review-queue') + '?page_size=3'
+        self.client.login(username=self.basic_email,
+                          password=self.basic_password)
+        received = []
+        while url:
+            response = self.client.get(url)
+            responseDict = json.loads(response.content)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            received += [app['id'] for app in responseDict['results']]
+            url = responseDict['next']
+
+        self.assertEqual(received, expected)
+        self.assertEqual(responseDict['results'][0]['applicant'],
+                         self.auth_email)
+        self.assertNotIn('experiences', responseDict['results'][0])
+
+        response = self.client.get(reverse('api:applications-review-queue'),
+                                   {'cursor': 'bad'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_application_requests_sparse_fieldset(self):
+        """Test that applications render and prefetch only the nested
+        collections asked for with expand"""
+        self.application.save()
+        self.course.save()
+        self.application_experience.save()
+        self.application_course.save()
+        url = reverse('api:applications-list')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        self.client.get(url)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'expand': 'courses'})
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('experiences', responseDict[0])
+        self.assertNotIn('comments', responseDict[0])
+        self.assertEqual(responseDict[0]['courses'][0]['course_name'],
+                         self.course.name)
+        self.assertEqual(responseDict[0]['first_name'],
+                         self.application.first_name)
+
+    def test_application_export_requests(self):
+        """Test that applications stream as CSV or JSON lines with their
+        experiences, courses and totals"""
+        self.application.save()
+        self.course.save()
+        self.application_experience.save()
+        self.application_course.save()
+        url = reverse('api:applications-export')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        response = self.client.get(url)
+        rows = list(csv.DictReader(
+            line.decode() for line in response.streaming_content))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(self.application.pk))
+        self.assertEqual(rows[0]['total_course_clocked_hours'], '100.75')
+        self.assertEqual(json.loads(rows[0]['experiences'])[0]
+                         ['position_name'],
+                         self.application_experience.position_name)
+
+        response = self.client.get(url, {'export_format': 'jsonl'})
+        records = [json.loads(line)
+                   for line in b''.join(response.streaming_content)
+                   .decode().splitlines()]
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(records[0]['applicant'], self.auth_email)
+        self.assertEqual(records[0]['courses'][0]['course_name'],
+                         self.course.name)
+
+        response = self.client.get(url, {'export_format': 'xml'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_application_bulk_experiences_requests(self):
+        """Test that posting the complete list of experiences updates,
+        creates and deletes them in bulk"""
+        self.application.save()
+        self.application_experience.save()
+        removed = ApplicationExperience.objects.create(
+            application=self.application, position_name='Removed',
+            start_date='2019-09-18', advocacy_hours=5)
+        url = reverse(API_APPLICATIONS_DETAIL,
+                      kwargs={'pk': self.application.pk}) + \
+            'bulk-experiences/'
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        experience = {'position_name': 'SAPR VA', 'display_order': 0,
+                      'start_date': '2020-09-18', 'advocacy_hours': '40.00',
+                      'marked_for_evaluation': True,
+                      'supervisor_email': 'alan-keating@army.mil'}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, [
+                {**experience, 'id': str(self.application_experience.pk)},
+                {**experience, 'position_name': 'New', 'display_order': 1,
+                 'advocacy_hours': '2.50'},
+            ], format='json')
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['position_name'] for row in responseDict],
+                         ['SAPR VA', 'New'])
+        self.assertEqual(responseDict[0]['id'],
+                         str(self.application_experience.pk))
+        self.assertFalse(ApplicationExperience.objects.filter(
+            pk=removed.pk).exists())
+        self.application.refresh_from_db()
+        self.assertEqual(str(self.application.total_advocacy_hours),
+                         '42.50')
+        new = ApplicationExperience.objects.get(position_name='New')
+        self.assertTrue(
+            ApplicationExperienceUserObjectPermission.objects.filter(
+                user=self.auth_user, content_object=new).exists())
+
+        response = self.client.post(url, [{**experience,
+                                           'id': str(removed.pk)}],
+                                    format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.application.status = Application.StatusChoices.SUBMITTED
+        self.application.save()
+        response = self.client.post(url, [experience], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_application_bulk_experiences_prune_pending_reviewers(self):
+        """Test that changing a supervisor email in bulk forgets the
+        pending reviewer of the old email"""
+        self.application.save()
+        self.application_experience.supervisor_email = 'old@army.mil'
+        self.application_experience.save()
+        PendingApplicationReviewer.objects.create(
+            application=self.application, email='old@army.mil')
+        url = reverse(API_APPLICATIONS_DETAIL,
+                      kwargs={'pk': self.application.pk}) + \
+            'bulk-experiences/'
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        response = self.client.post(url, [{
+            'id': str(self.application_experience.pk),
+            'position_name': 'SAPR VA', 'display_order': 0,
+            'start_date': '2020-09-18', 'marked_for_evaluation': True,
+            'supervisor_email': 'new@army.mil'}], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(PendingApplicationReviewer.objects.filter(
+            email='old@army.mil').exists())
+
+    @patch('api.serializers.validate_xds_course')
+    def test_application_bulk_courses_requests(self, mock_xds):
+        """Test that posting the complete list of courses links each XDS
+        course once"""
+        mock_xds.return_value = 'New Course'
+        self.application.save()
+        self.course.save()
+        self.application_course.save()
+        url = reverse(API_APPLICATIONS_DETAIL,
+                      kwargs={'pk': self.application.pk}) + 'bulk-courses/'
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        response = self.client.post(url, [
+            {'course_external_reference': self.course.reference,
+             'completion_date': '2024-09-18', 'clocked_hours': '20.00'},
+            {'course_external_reference': 'new-course',
+             'completion_date': '2024-10-18', 'clocked_hours': '12.00'},
+            {'course_external_reference': 'new-course',
+             'completion_date': '2024-11-18', 'clocked_hours': '1.00'},
+        ], format='json')
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(responseDict), 3)
+        mock_xds.assert_called_once_with('new-course')
+        self.assertEqual(
+            sorted(course.course_name for course in
+                   ApplicationCourse.objects.filter(
+                       application=self.application)),
+            ['New Course', 'New Course', self.course.name])
+        self.application.refresh_from_db()
+        self.assertEqual(str(self.application.total_course_clocked_hours),
+                         '33.00')
+
+    def test_application_requests_query_budget(self):
+        """Test that listing applications costs a fixed number of queries
+        as the number of applications grows"""
+        self.course.save()
+        url = reverse('api:applications-list')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        for count in (1, 10):
+            while Application.objects.count() < count:
+                application = Application.objects.create(
+                    applicant=self.auth_user, first_name='First',
+                    last_name='Last')
+                ApplicationExperience.objects.create(
+                    application=application, position_name='Position',
+                    start_date=self.application_experience.start_date,
+                    advocacy_hours=12, marked_for_evaluation=True)
+                ApplicationCourse.objects.create(
+                    application=application, xds_course=self.course,
+                    completion_date=self.application_course.completion_date,
+                    clocked_hours=8)
+
+            # the first request also loads the content types
+            self.client.get(url)
+            with self.subTest(count=count), self.assertNumQueries(6):
+                response = self.client.get(url)
+            responseDict = json.loads(response.content)
+
+            self.assertEqual(len(responseDict), count)
+            self.assertEqual(responseDict[0]['total_advocacy_hours'],
+                             '12.00')
+            self.assertEqual(
+                responseDict[0]['total_marked_for_evaluation_count'], 1)
+            self.assertEqual(responseDict[0]['total_course_clocked_hours'],
+                             '8.00')
+
     def test_application_experience_requests_no_auth(self):
         """Test that making a get request to the application experience api
         with no auth returns an error"""
@@ -1074,6 +2084,170 @@ class ApplicationViewTests(TestSetUp):
         self.assertEqual(str(self.application_comment.pk),
                          responseDict['id'])
 
+    def test_document_upload_requests(self):
+        """Test that a document uploaded in chunks resumes from its offset,
+        rejects chunks at the wrong offset and is hashed once complete"""
+        content = b'%PDF-1.4 certification document'
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        with tempfile.TemporaryDirectory() as upload_root, \
+                override_settings(UPLOAD_ROOT=upload_root):
+            response = self.client.post(
+                reverse('api:document-uploads-list'),
+                {'filename': 'cert.pdf', 'size': len(content),
+                 'content_type': 'application/pdf'}, format='json')
+            responseDict = json.loads(response.content)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(responseDict['offset'], 0)
+            url = reverse('api:document-uploads-detail',
+                          kwargs={'pk': responseDict['id']})
+
+            response = self.client.patch(
+                url, content[:10],
+                content_type='application/offset+octet-stream',
+                headers={'Upload-Offset': '0'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.headers['Upload-Offset'], '10')
+
+            response = self.client.patch(
+                url, content[:10],
+                content_type='application/offset+octet-stream',
+                headers={'Upload-Offset': '0'})
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+            self.assertEqual(response.headers['Upload-Offset'], '10')
+
+            response = self.client.get(url)
+            self.assertEqual(json.loads(response.content)['offset'], 10)
+
+            response = self.client.patch(
+                url, content[10:] + b'extra',
+                content_type='application/offset+octet-stream',
+                headers={'Upload-Offset': '10'})
+            self.assertEqual(response.status_code,
+                             status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+            response = self.client.patch(
+                url, content[10:],
+                content_type='application/offset+octet-stream',
+                headers={'Upload-Offset': '10'})
+            responseDict = json.loads(response.content)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(responseDict['sha256'],
+                             hashlib.sha256(content).hexdigest())
+            self.assertIsNotNone(responseDict['completed'])
+            with open(os.path.join(upload_root, responseDict['id']),
+                      'rb') as stored:
+                self.assertEqual(stored.read(), content)
+
+    def test_document_upload_requests_bad_file_type(self):
+        """Test that declaring an upload of an unaccepted file type or size
+        returns an error"""
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        response = self.client.post(
+            reverse('api:document-uploads-list'),
+            {'filename': 'cert.exe', 'size': 0}, format='json')
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('filename', responseDict)
+        self.assertIn('size', responseDict)
+
+    def test_document_upload_requests_attach_and_download(self):
+        """Test that a completed upload can be attached to an application
+        and is downloaded through nginx or Django"""
+        self.application.save()
+        upload = DocumentUpload.objects.create(
+            owner=self.auth_user, filename='cert.pdf',
+            content_type='application/pdf', size=3)
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        url = reverse(API_APPLICATIONS_DETAIL,
+                      kwargs={'pk': self.application.pk})
+
+        response = self.client.patch(
+            url, {'certification_file': str(upload.pk)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with tempfile.TemporaryDirectory() as upload_root, \
+                override_settings(UPLOAD_ROOT=upload_root):
+            with open(os.path.join(upload_root, str(upload.pk)),
+                      'wb') as stored:
+                stored.write(b'pdf')
+            upload.offset = upload.size
+            upload.completed = timezone.now()
+            upload.save()
+
+            response = self.client.patch(
+                url, {'certification_file': str(upload.pk)}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.application.refresh_from_db()
+            self.assertEqual(self.application.certification_file, upload)
+
+            download_url = reverse('api:document-uploads-detail',
+                                   kwargs={'pk': upload.pk}) + 'download/'
+            response = self.client.get(download_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.headers['X-Accel-Redirect'],
+                             f'/media/uploads/{upload.pk}')
+            self.assertEqual(response.headers['Content-Type'],
+                             'application/pdf')
+            self.assertEqual(response.headers['Content-Disposition'],
+                             'attachment; filename="cert.pdf"')
+
+            # quotes in uploaded names are escaped
+            upload.filename = 'my "cert".pdf'
+            upload.save()
+            response = self.client.get(download_url)
+            self.assertEqual(response.headers['Content-Disposition'],
+                             r'attachment; filename="my \"cert\".pdf"')
+
+            with override_settings(UPLOAD_ACCEL_REDIRECT_LOCATION=''):
+                response = self.client.get(download_url)
+                self.assertEqual(b''.join(response.streaming_content),
+                                 b'pdf')
+
+    def test_application_analytics_requests(self):
+        """Test that the analytics count the applications by status,
+        position and type and filter by organization and date range"""
+        self.application.save()
+        self.application_experience.save()
+        Application.objects.create(
+            applicant=self.basic_user, affiliation='navy',
+            status=Application.StatusChoices.SUBMITTED,
+            position=Application.PositionChoices.PRINCIPAL_SARC)
+        refresh_application_summary()
+        url = reverse('api:application_analytics')
+        today = timezone.localdate()
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+
+        response = self.client.get(url)
+        responseDict = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(responseDict['count'], 2)
+        self.assertEqual(responseDict['by_status']['draft'], 1)
+        self.assertEqual(responseDict['by_status']['submitted'], 1)
+        self.assertEqual(responseDict['by_position']['Principal_SARC'], 1)
+        self.assertEqual(responseDict['by_application_type']['new'], 1)
+        self.assertEqual(responseDict['average_advocacy_hours'], '50.13')
+        self.assertIsNone(responseDict['average_time_to_review'])
+
+        response = self.client.get(
+            f'{url}?organization=army&start_date={today}&end_date={today}')
+        responseDict = json.loads(response.content)
+        self.assertEqual(responseDict['count'], 1)
+        self.assertEqual(responseDict['average_advocacy_hours'], '100.25')
+
+        response = self.client.get(
+            f'{url}?start_date={today + timedelta(days=1)}')
+        self.assertEqual(json.loads(response.content)['count'], 0)
+
+        response = self.client.get(f'{url}?position=unknown')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 @tag("unit")
 class GetCourseProgressViewTests(TestSetUp):
@@ -37,6 +37,10 @@ router.register(r'application-experiences', views.ApplicationExperienceViewSet,
                 basename='application-experiences')
 router.register(r'application-comments', views.ApplicationCommentViewSet,
                 basename='application-comments')
+router.register(r'tombstones', views.TombstoneViewSet,
+                basename='tombstones')
+router.register(r'document-uploads', views.DocumentUploadViewSet,
+                basename='document-uploads')
 
 
 # The API URLs are now determined automatically by the router.
@@ -44,4 +48,9 @@ urlpatterns = [
     path('', include(router.urls)),
     path('course-progress/', views.GetCourseProgressView.as_view(),
          name='course_progress'),
+    path('application-analytics/', views.ApplicationAnalyticsView.as_view(),
+         name='application_analytics'),
+    path('candidate-recommendations/',
+         views.CandidateRecommendationView.as_view(),
+         name='candidate_recommendations'),
 ]
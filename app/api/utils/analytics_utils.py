@@ -0,0 +1,65 @@
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Sum
+
+from api.models import Application
+
+HOURS_PRECISION = Decimal('0.01')
+
+
+def average(total, count, precision=None):
+    """Average of total over count, None without any counted items"""
+    if not count:
+        return None
+    value = total / count
+    return value.quantize(precision, ROUND_HALF_UP) if precision else value
+
+
+def summarize_applications(summaries):
+    """
+    Application counts by status, position and type with the average hours
+    and time to review, folded from the grouped rows of a queryset of
+    ApplicationStatusSummary. The rows are bounded by the number of
+    statuses, positions and types, not by the number of applications.
+    """
+    groups = summaries.order_by().values(
+        'status', 'position', 'application_type').annotate(
+        applications=Sum('count'),
+        advocacy_hours=Sum('total_advocacy_hours'),
+        course_clocked_hours=Sum('total_course_clocked_hours'),
+        reviewed=Sum('reviewed_count'),
+        review_time=Sum('total_review_time'))
+
+    result = {
+        'count': 0,
+        'by_status': dict.fromkeys(Application.StatusChoices.values, 0),
+        'by_position': dict.fromkeys(Application.PositionChoices.values, 0),
+        'by_application_type': dict.fromkeys(
+            Application.ApplicationChoices.values, 0),
+    }
+    advocacy_hours = course_clocked_hours = Decimal(0)
+    reviewed = 0
+    review_time = timedelta()
+    for group in groups:
+        count = group['applications']
+        result['count'] += count
+        for key, field in (('by_status', 'status'),
+                           ('by_position', 'position'),
+                           ('by_application_type', 'application_type')):
+            # applications without a position or type are only counted
+            # in the total
+            if group[field]:
+                result[key][group[field]] = \
+                    result[key].get(group[field], 0) + count
+        advocacy_hours += group['advocacy_hours']
+        course_clocked_hours += group['course_clocked_hours']
+        reviewed += group['reviewed']
+        review_time += group['review_time']
+
+    result['average_advocacy_hours'] = average(
+        advocacy_hours, result['count'], HOURS_PRECISION)
+    result['average_course_clocked_hours'] = average(
+        course_clocked_hours, result['count'], HOURS_PRECISION)
+    result['average_time_to_review'] = average(review_time, reviewed)
+    return result
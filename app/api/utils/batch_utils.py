@@ -0,0 +1,53 @@
+import threading
+import weakref
+
+from django.db import transaction
+
+_local = threading.local()
+
+
+class CommitBatch:
+    """
+    The items collected for one flush function during a transaction.
+
+    Only the on_commit hook holds the batch, the thread keeps a weak
+    reference, so the batch disappears as soon as Django drops the hook
+    after running it or rolling back the (savepoint) block registering it.
+    """
+
+    def __init__(self, flush):
+        self.flush = flush
+        self.items = set()
+
+    def __call__(self):
+        if get_pending_batch(self.flush) is self:
+            del _local.batches[self.flush]
+        self.flush(self.items)
+
+
+def get_pending_batch(flush):
+    """Return the batch of flush still waiting for the transaction to
+    commit"""
+    ref = getattr(_local, 'batches', {}).get(flush)
+    return ref() if ref is not None else None
+
+
+def flush_on_commit(flush, items):
+    """
+    Call flush with the set of items once the current transaction commits,
+    together with the items of every other call for the same flush
+    function in that transaction. Outside a transaction flush is called
+    immediately.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        flush(set(items))
+        return
+
+    batch = get_pending_batch(flush)
+    if batch is None:
+        batch = CommitBatch(flush)
+        if not hasattr(_local, 'batches'):
+            _local.batches = {}
+        _local.batches[flush] = weakref.ref(batch)
+        transaction.on_commit(batch)
+    batch.items.update(items)
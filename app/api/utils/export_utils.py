@@ -0,0 +1,63 @@
+import csv
+import json
+
+from django.db.models import Prefetch
+
+from api.models import Application, ApplicationCourse
+from api.serializers import ApplicationExportSerializer
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object returning what is written to it, so csv.writer
+    rows can be streamed"""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset=None):
+    """Applications ordered for export, with the relations they render"""
+    if queryset is None:
+        queryset = Application.objects.all()
+    return queryset.select_related('applicant').prefetch_related(
+        'experiences',
+        Prefetch('courses',
+                 ApplicationCourse.objects.select_related('xds_course')),
+    ).order_by('created', 'id')
+
+
+def export_records(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the serialized applications of queryset, reading them through a
+    server-side cursor chunk_size at a time with their relations
+    prefetched per chunk
+    """
+    for application in queryset.iterator(chunk_size=chunk_size):
+        yield ApplicationExportSerializer(application).data
+
+
+def export_lines(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the applications of queryset as CSV rows or JSON lines, each
+    string ending with a newline. Nested experiences and courses are JSON
+    encoded in their CSV cells.
+    """
+    records = export_records(queryset, chunk_size)
+    if export_format == 'jsonl':
+        for record in records:
+            yield json.dumps(record) + '\n'
+        return
+
+    fields = ApplicationExportSerializer.Meta.fields
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for record in records:
+        yield writer.writerow(
+            [json.dumps(value) if isinstance(value, list) else value
+             for value in (record[field] for field in fields)])
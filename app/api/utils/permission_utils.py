@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from guardian.utils import (get_group_obj_perms_model,
+                            get_user_obj_perms_model)
+
+OWNER_ACTIONS = ('view', 'change', 'delete')
+
+
+def bulk_assign_object_perms(user, objects, actions=OWNER_ACTIONS):
+    """
+    Give user the actions permissions on every object, looking up the
+    permissions with one query and inserting the rows with one query per
+    object permission table
+
+    Args:
+        user (User): the user to give the permissions to
+        objects (iterable): saved model instances, of any models
+        actions (iterable): the permission actions to give, e.g. 'view'
+    """
+    objects_by_model = defaultdict(list)
+    for obj in objects:
+        objects_by_model[type(obj)].append(obj)
+    if not objects_by_model:
+        return
+
+    content_types = ContentType.objects.get_for_models(*objects_by_model)
+    permissions = {
+        (permission.content_type_id, permission.codename): permission
+        for permission in Permission.objects.filter(
+            content_type__in=content_types.values(),
+            codename__in=[f'{action}_{model._meta.model_name}'
+                          for model in objects_by_model
+                          for action in actions])
+    }
+
+    rows_by_perms_model = defaultdict(list)
+    for model, instances in objects_by_model.items():
+        content_type = content_types[model]
+        perms_model = get_user_obj_perms_model(model)
+        generic = perms_model.objects.is_generic()
+        for action in actions:
+            permission = permissions[
+                (content_type.pk, f'{action}_{model._meta.model_name}')]
+            for instance in instances:
+                rows_by_perms_model[perms_model].append(object_perm_row(
+                    perms_model, generic, permission, content_type,
+                    instance, user=user))
+
+    for perms_model, rows in rows_by_perms_model.items():
+        perms_model.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def assign_permissions_map(permissions_map, obj):
+    """
+    Assign a get_permissions_map() result on obj, looking up the
+    permissions with one query and inserting the rows with one query per
+    object permission table
+
+    Args:
+        permissions_map (dict): permission codenames mapped to the users
+            and groups to give them to
+        obj (Model): the saved model instance the permissions are on
+    """
+    codenames = {perm: perm.rpartition('.')[2] for perm in permissions_map}
+    if not codenames:
+        return
+
+    content_type = ContentType.objects.get_for_model(obj)
+    permissions = {
+        permission.codename: permission
+        for permission in Permission.objects.filter(
+            content_type=content_type, codename__in=codenames.values())
+    }
+
+    rows_by_perms_model = defaultdict(list)
+    for perm, assignees in permissions_map.items():
+        permission = permissions[codenames[perm]]
+        for assignee in assignees:
+            if isinstance(assignee, Group):
+                perms_model = get_group_obj_perms_model(obj)
+                assignee_kwargs = {'group': assignee}
+            else:
+                perms_model = get_user_obj_perms_model(obj)
+                assignee_kwargs = {'user': assignee}
+            rows_by_perms_model[perms_model].append(object_perm_row(
+                perms_model, perms_model.objects.is_generic(), permission,
+                content_type, obj, **assignee_kwargs))
+
+    for perms_model, rows in rows_by_perms_model.items():
+        perms_model.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def get_viewers_by_object(model, pks):
+    """
+    Return the pks of the users with the view permission on each object,
+    directly or through their groups, with one query per object
+    permission table. Like get_users_with_perms, superusers are only
+    included when they hold the permission.
+
+    Args:
+        model (Model): the model of the objects
+        pks (iterable): the primary keys of the objects
+
+    Returns:
+        defaultdict: sets of user pks keyed by the str() of each object pk
+    """
+    viewers = defaultdict(set)
+    object_pks = [str(pk) for pk in pks]
+    if not object_pks:
+        return viewers
+
+    codename = f'view_{model._meta.model_name}'
+    for perms_model, user_field in (
+            (get_user_obj_perms_model(model), 'user'),
+            (get_group_obj_perms_model(model), 'group__user')):
+        if perms_model.objects.is_generic():
+            object_field = 'object_pk'
+            rows = perms_model.objects.filter(
+                content_type=ContentType.objects.get_for_model(model),
+                object_pk__in=object_pks)
+        else:
+            object_field = 'content_object'
+            rows = perms_model.objects.filter(content_object__in=object_pks)
+        for object_pk, user_pk in rows.filter(
+                permission__codename=codename,
+                **{f'{user_field}__isnull': False}).values_list(
+                object_field, user_field):
+            viewers[str(object_pk)].add(user_pk)
+    return viewers
+
+
+def object_perm_row(perms_model, generic, permission, content_type,
+                    instance, **assignee):
+    """Return an unsaved object permission row of the user or group"""
+    if generic:
+        return perms_model(permission=permission, content_type=content_type,
+                           object_pk=str(instance.pk), **assignee)
+    return perms_model(permission=permission, content_object=instance,
+                       **assignee)
@@ -0,0 +1,154 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+
+from api.models import MAX_PROFICIENCY_LEVEL, LearnerKsaScore
+from users.models import User
+
+# scores modified this long before the last sync are read again, covering
+# transactions that commit after a later one was read
+SYNC_OVERLAP = timedelta(seconds=5)
+
+_lock = threading.Lock()
+_matrix = {}
+
+
+def clear_learner_ksa_matrix():
+    """Drop this process's copy of the user by KSA score matrix"""
+    with _lock:
+        _matrix.update(scores=np.zeros((0, 0), dtype=np.float32), users=[],
+                       user_index={}, ksa_index={}, synced=None)
+
+
+clear_learner_ksa_matrix()
+
+
+def _apply_cells(cells):
+    """Write the (user, ksa, score) cells into a new copy of the matrix,
+    growing it for new users and KSAs"""
+    users = _matrix['users']
+    user_index = _matrix['user_index']
+    ksa_index = _matrix['ksa_index']
+    new_users = {user_id for user_id, _, _ in cells
+                 if user_id not in user_index}
+    new_ksas = {ksa_id for _, ksa_id, _ in cells if ksa_id not in ksa_index}
+    if new_users:
+        users = [*users, *sorted(new_users)]
+        user_index = {user_id: row for row, user_id in enumerate(users)}
+    if new_ksas:
+        ksa_index = {**ksa_index, **{
+            ksa_id: len(ksa_index) + column
+            for column, ksa_id in enumerate(sorted(new_ksas))}}
+
+    rows = np.fromiter((user_index[cell[0]] for cell in cells),
+                       dtype=np.intp, count=len(cells))
+    columns = np.fromiter((ksa_index[cell[1]] for cell in cells),
+                          dtype=np.intp, count=len(cells))
+    values = np.fromiter((cell[2] for cell in cells), dtype=np.float32,
+                         count=len(cells))
+
+    scores = _matrix['scores']
+    if not new_users and not new_ksas and \
+            np.array_equal(scores[rows, columns], values):
+        return
+    # readers may still hold the current matrix, it is never changed in place
+    grown = np.zeros((len(users), len(ksa_index)), dtype=np.float32)
+    grown[:scores.shape[0], :scores.shape[1]] = scores
+    grown[rows, columns] = values
+    _matrix.update(scores=grown, users=users, user_index=user_index,
+                   ksa_index=ksa_index)
+
+
+def forget_learners(user_ids):
+    """
+    Zero the rows of the users in this process's matrix. Scores deleted
+    along with their user are never read by a sync, so deleted users are
+    forgotten once a recommendation finds them missing.
+    """
+    with _lock:
+        rows = [_matrix['user_index'][user_id] for user_id in user_ids
+                if user_id in _matrix['user_index']]
+        if rows:
+            scores = _matrix['scores'].copy()
+            scores[rows] = 0
+            _matrix['scores'] = scores
+
+
+def get_learner_ksa_matrix():
+    """
+    Return the user by KSA score matrix of this process as (scores, users,
+    ksa_index): a float32 array with a row per user id of users and a
+    column per KSA reference of ksa_index. The copy is synced with the
+    scores modified since the previous call, so it is loaded in full only
+    once per process. The returned arrays must be treated as read only.
+    """
+    with _lock:
+        cells = LearnerKsaScore.objects.order_by()
+        if _matrix['synced'] is not None:
+            cells = cells.filter(
+                modified__gte=_matrix['synced'] - SYNC_OVERLAP)
+        cells = list(cells.values_list('user', 'ksa', 'score', 'modified'))
+        if cells:
+            _apply_cells([cell[:3] for cell in cells])
+            _matrix['synced'] = max(cell[3] for cell in cells)
+        return _matrix['scores'], _matrix['users'], _matrix['ksa_index']
+
+
+def score_candidates(scores, ksa_index, requirements):
+    """
+    Score every row of the matrix against the (ksa, required_level, weight)
+    requirements of a role. Each KSA counts the share of its required level
+    the user reaches, capped at 1, and the result is the weighted mean over
+    the KSAs, between 0 and 1.
+    """
+    columns = np.array([ksa_index.get(ksa, -1) for ksa, _, _ in requirements],
+                       dtype=np.intp)
+    required = np.array([level / MAX_PROFICIENCY_LEVEL
+                         for _, level, _ in requirements], dtype=np.float32)
+    weights = np.array([weight for _, _, weight in requirements],
+                       dtype=np.float32)
+
+    # KSAs no user has a score for are left at zero
+    known = columns >= 0
+    reached = np.zeros((scores.shape[0], len(requirements)),
+                       dtype=np.float32)
+    reached[:, known] = scores[:, columns[known]]
+    coverage = np.minimum(reached, required) / required
+    return coverage @ weights / weights.sum()
+
+
+def top_candidates(totals, limit):
+    """Indices of the limit highest positive totals, best first"""
+    candidates = np.flatnonzero(totals > 0)
+    if len(candidates) > limit:
+        candidates = candidates[
+            np.argpartition(-totals[candidates], limit - 1)[:limit]]
+    return candidates[np.argsort(-totals[candidates], kind='stable')]
+
+
+def recommend_candidates(requirements, limit, exclude=()):
+    """
+    Return up to limit (user, score) pairs of the users best matching the
+    (ksa, required_level, weight) requirements, best first, leaving out
+    the user ids in exclude
+    """
+    requirements = [requirement for requirement in requirements
+                    if requirement[1] > 0 and requirement[2] > 0]
+    exclude = set(exclude)
+    while True:
+        scores, users, ksa_index = get_learner_ksa_matrix()
+        if not requirements or not users:
+            return []
+
+        totals = score_candidates(scores, ksa_index, requirements)
+        if exclude:
+            totals[[row for row, user_id in enumerate(users)
+                    if user_id in exclude]] = 0
+        rows = top_candidates(totals, limit)
+        found = User.objects.in_bulk([users[row] for row in rows])
+        if len(found) == len(rows):
+            return [(found[users[row]], float(totals[row])) for row in rows]
+        # fill the places of the deleted users
+        forget_learners([users[row] for row in rows
+                         if users[row] not in found])
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from rest_framework.renderers import JSONRenderer
+
+# bounds how long changes outside the instance's subtree, like a renamed
+# external course, can be served stale
+SNAPSHOT_TIMEOUT = 60 * 60
+
+
+def snapshot_key(instance):
+    """
+    Cache key of the snapshot of instance, which changes with its modified
+    stamp
+    """
+    return (f'snapshot:{instance._meta.label_lower}:{instance.pk}:'
+            f'{instance.modified.timestamp()}')
+
+
+def get_snapshots(instances, serializer_class, prefetch=(), context=None):
+    """
+    Return the rendered JSON bytes of each instance.
+
+    Snapshots are served from the cache while the instance's modified stamp
+    is unchanged. Missing ones are rendered with serializer_class, after
+    prefetching the lookups in prefetch on the missing instances only, and
+    cached.
+    """
+    keys = [snapshot_key(instance) for instance in instances]
+    snapshots = cache.get_many(keys)
+
+    missing = [instance for instance, key in zip(instances, keys)
+               if key not in snapshots]
+    if missing:
+        prefetch_related_objects(missing, *prefetch)
+        renderer = JSONRenderer()
+        rendered = {
+            snapshot_key(instance): renderer.render(
+                serializer_class(instance, context=context).data)
+            for instance in missing
+        }
+        cache.set_many(rendered, SNAPSHOT_TIMEOUT)
+        snapshots.update(rendered)
+
+    return [snapshots[key] for key in keys]
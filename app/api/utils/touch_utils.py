@@ -0,0 +1,71 @@
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.utils.batch_utils import flush_on_commit
+
+logger = logging.getLogger(__name__)
+
+
+def ancestor_filters(model, pks):
+    """
+    Yield (model, filter) pairs selecting the rows of model with pks and
+    each of their ancestors, following the touch_parent_field of each model
+    """
+    condition = Q(pk__in=pks)
+    while model is not None:
+        yield model, condition
+        parent_field = getattr(model, 'touch_parent_field', None)
+        if parent_field is None:
+            return
+        field = model._meta.get_field(parent_field)
+        condition = Q(pk__in=model.objects.filter(condition)
+                      .values(field.attname))
+        model = field.related_model
+
+
+def flush_touches(pks_by_model):
+    """
+    Set modified to now on the given rows and their ancestors with a single
+    UPDATE per table
+    """
+    conditions = {}
+    for model, pks in pks_by_model.items():
+        if not pks:
+            continue
+        for target, condition in ancestor_filters(model, pks):
+            conditions[target] = conditions.get(target, Q()) | condition
+
+    now = timezone.now()
+    with transaction.atomic():
+        for model, condition in conditions.items():
+            model.objects.filter(condition).update(modified=now)
+
+
+def flush_touched(touched):
+    """Flush a set of (model, pk) pairs, see flush_touches"""
+    pks_by_model = defaultdict(set)
+    for model, pk in touched:
+        pks_by_model[model].add(pk)
+    flush_touches(pks_by_model)
+
+
+def touch_parent(instance):
+    """
+    Mark the parent of instance, named by its touch_parent_field, and the
+    parent's own ancestors as modified.
+
+    Inside a transaction the touches are collected and deduplicated, then
+    written once the transaction commits, so saving many children issues
+    one UPDATE per ancestor table instead of one per child and hop.
+    Outside a transaction they are written immediately.
+    """
+    field = instance._meta.get_field(instance.touch_parent_field)
+    parent_pk = getattr(instance, field.attname)
+    if parent_pk is None:
+        return
+
+    flush_on_commit(flush_touched, [(field.related_model, parent_pk)])
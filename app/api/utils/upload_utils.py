@@ -0,0 +1,89 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import DocumentUpload
+
+UPLOAD_BLOCK_SIZE = 64 * 1024
+UPLOAD_OFFSET_HEADER = 'Upload-Offset'
+
+
+class UploadOffsetMismatch(Exception):
+    """Raised when a chunk does not start where the upload left off"""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}')
+        self.offset = offset
+
+
+class UploadChunkTooLarge(Exception):
+    """Raised when a chunk goes past the declared size of the upload"""
+
+
+def partial_path(upload_id):
+    """Path of the file receiving the chunks of an unfinished upload"""
+    return os.path.join(settings.UPLOAD_ROOT, 'partial', f'{upload_id}.part')
+
+
+def upload_path(upload_id):
+    """Path of a completed upload"""
+    return os.path.join(settings.UPLOAD_ROOT, str(upload_id))
+
+
+def file_sha256(path):
+    """Hex SHA-256 digest of the file at path, read block by block"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(UPLOAD_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def append_chunk(upload_id, offset, stream):
+    """
+    Append the bytes read from stream to the upload, which must currently
+    be at offset. The row is locked while the chunk is written so
+    concurrent chunks of the same upload are serialized, and the upload is
+    completed once all of its bytes have arrived.
+    """
+    with transaction.atomic():
+        upload = DocumentUpload.objects.select_for_update().get(pk=upload_id)
+        if upload.completed is not None or offset != upload.offset:
+            raise UploadOffsetMismatch(upload.offset)
+
+        path = partial_path(upload.pk)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        remaining = upload.size - upload.offset
+        written = 0
+        with open(path, 'ab') as target:
+            # drop anything left by a chunk that failed mid-write
+            target.truncate(upload.offset)
+            for block in iter(lambda: stream.read(UPLOAD_BLOCK_SIZE), b''):
+                written += len(block)
+                if written > remaining:
+                    target.truncate(upload.offset)
+                    raise UploadChunkTooLarge(
+                        f'Upload is limited to {upload.size} bytes')
+                target.write(block)
+
+        upload.offset += written
+        update_fields = ['offset', 'modified']
+        if upload.offset == upload.size:
+            upload.sha256 = file_sha256(path)
+            os.replace(path, upload_path(upload.pk))
+            upload.completed = timezone.now()
+            update_fields += ['sha256', 'completed']
+        upload.save(update_fields=update_fields)
+    return upload
+
+
+def discard_upload(upload_id):
+    """Remove the stored bytes of an upload, finished or not"""
+    for path in (partial_path(upload_id), upload_path(upload_id)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,29 +1,43 @@
+import json
 import logging
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Count, OuterRef, Prefetch, Subquery, Sum
+from django.db.models import Exists, OuterRef, Prefetch
+from django.db.models.functions import Lower
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import content_disposition_header
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters as filter
-from rest_framework import status, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_guardian import filters
 
 from api.models import (Application, ApplicationComment, ApplicationCourse,
-                        ApplicationExperience, CandidateList, CandidateRanking,
+                        ApplicationExperience, ApplicationStatusSummary,
+                        CandidateList, CandidateRanking, DocumentUpload,
                         ProfileQuestion, ProfileResponse, TrainingPlan,
                         LearningPlan, LearningPlanCompetency, LearningPlanGoal,
-                        LearningPlanGoalCourse, LearningPlanGoalKsa)
-from api.serializers import (ApplicationCommentSerializer,
+                        LearningPlanGoalCourse, LearningPlanGoalKsa, Tombstone)
+from api.serializers import (EDITABLE_STATUSES, REVIEW_STATUSES,
+                             ApplicationAnalyticsFilterSerializer,
+                             ApplicationAnalyticsSerializer,
+                             ApplicationCommentSerializer,
+                             ApplicationCourseBulkSerializer,
                              ApplicationCourseSerializer,
+                             ApplicationExperienceBulkSerializer,
                              ApplicationExperienceSerializer,
                              ApplicationSerializer,
+                             ApplicationSummarySerializer,
                              CandidateListSerializer,
+                             CandidateRecommendationFilterSerializer,
+                             CandidateRecommendationSerializer,
                              CandidateRankingSerializer,
+                             CandidateRerankSerializer,
+                             DocumentUploadSerializer,
                              ProfileQuestionSerializer,
                              ProfileResponseSerializer,
                              TrainingPlanSerializer,
@@ -31,22 +45,60 @@ from api.serializers import (ApplicationCommentSerializer,
                              LearningPlanCompetencySerializer,
                              LearningPlanGoalSerializer,
                              LearningPlanGoalCourseSerializer,
-                             LearningPlanGoalKsaSerializer)
+                             LearningPlanGoalKsaSerializer,
+                             LearningPlanTreeSerializer,
+                             MiniCandidateRankingSerializer,
+                             TombstoneSerializer)
+from api.utils.analytics_utils import summarize_applications
+from api.utils.export_utils import (EXPORT_FORMATS, export_lines,
+                                    export_queryset)
+from api.utils.recommendation_utils import recommend_candidates
+from api.utils.snapshot_utils import get_snapshots
+from api.utils.upload_utils import (UPLOAD_OFFSET_HEADER, UploadChunkTooLarge,
+                                    UploadOffsetMismatch, append_chunk,
+                                    upload_path)
 from api.utils.xapi_utils import (COURSE_PROGRESS_VERBS,
                                   filter_courses_by_exclusion,
                                   get_lrs_statements,
                                   jwt_account_name,
                                   process_course_statements,
                                   remove_duplicates)
-from configuration.models import Configuration
+from configuration.utils.cache_utils import get_configuration
 from external.models import LearnerRecord
 from external.utils.elrr_utils import (remove_course_from_elrr_goal,
                                        remove_goal_from_elrr,
                                        remove_ksa_from_elrr_goal)
+from portal.filters import ModifiedSinceFilter, OwnerPermissionsFilter
+from portal.mixins import SparseFieldsetViewMixin
+from portal.pagination import KeysetPagination
+from portal.permissions import has_object_perm, prefetch_object_perms
 
 logger = logging.getLogger(__name__)
 
 
+def learning_plan_goal_queryset():
+    """Learning Plan Goals with their KSAs and Courses prefetched"""
+    return LearningPlanGoal.objects.prefetch_related(
+        Prefetch('ksas',
+                 LearningPlanGoalKsa.objects.select_related('eccr_ksa')),
+        Prefetch('courses',
+                 LearningPlanGoalCourse.objects.select_related(
+                     'xds_course__xds_metadata')))
+
+
+def learning_plan_competency_queryset():
+    """Learning Plan Competencies with the whole goal tree prefetched"""
+    return LearningPlanCompetency.objects.select_related(
+        'eccr_competency').prefetch_related(
+        Prefetch('goals', learning_plan_goal_queryset()))
+
+
+def learning_plan_queryset():
+    """Learning Plans with the whole competency tree prefetched"""
+    return LearningPlan.objects.select_related('learner').prefetch_related(
+        Prefetch('competencies', learning_plan_competency_queryset()))
+
+
 # Create your views here.
 
 
@@ -68,7 +120,7 @@ class ProfileResponseViewSet(viewsets.ModelViewSet):
     """
     queryset = ProfileResponse.objects.filter(question__active=True)
     serializer_class = ProfileResponseSerializer
-    filter_backends = [DjangoFilterBackend, filters.ObjectPermissionsFilter,]
+    filter_backends = [DjangoFilterBackend, OwnerPermissionsFilter,]
 
     def initial(self, request, *args, **kwargs):
         """
@@ -90,19 +142,23 @@ class ProfileResponseViewSet(viewsets.ModelViewSet):
         return self.queryset.filter(submitted_by=user)
 
 
-class CandidateListViewSet(viewsets.ModelViewSet):
+class CandidateListViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     Retrieve Candidate List
     """
+    sparse_prefetches = {
+        "rankings": [
+            Prefetch(
+                "rankings",
+                queryset=CandidateRanking.objects.order_by("rank")),
+            "rankings__candidate"],
+    }
     queryset = CandidateList.objects.all().select_related(
         "ranker", "role", "competency"
     ).prefetch_related(
-        Prefetch(
-            "rankings",
-            queryset=CandidateRanking.objects.order_by("rank")),
-        "rankings__candidate").order_by("-modified")
+        *sparse_prefetches["rankings"]).order_by("-modified")
     serializer_class = CandidateListSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
 
     def initial(self, request, *args, **kwargs):
         """
@@ -115,6 +171,36 @@ class CandidateListViewSet(viewsets.ModelViewSet):
         request = super().initial(request, *args, **kwargs)
         return request
 
+    @action(detail=True, methods=['post'])
+    def rerank(self, request, pk=None):
+        """
+        Rank the candidates of the list in the order of the emails in
+        `candidates`, which must hold every candidate of the list
+        """
+        try:
+            candidate_list = CandidateList.objects.get(pk=pk)
+        except CandidateList.DoesNotExist:
+            return Response({'detail': 'Candidate list not found'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        if not has_object_perm(request, 'api.change_candidatelist',
+                               candidate_list):
+            return Response({'detail': 'You do not have permission'
+                             ' to perform this action'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        with transaction.atomic():
+            rankings = list(candidate_list.rankings.select_related(
+                'candidate').select_for_update(of=('self',)))
+            serializer = CandidateRerankSerializer(rankings,
+                                                   data=request.data)
+            serializer.is_valid(raise_exception=True)
+            rankings = serializer.save()
+
+        return Response(MiniCandidateRankingSerializer(rankings,
+                                                       many=True).data,
+                        status=status.HTTP_200_OK)
+
 
 class CandidateRankingViewSet(viewsets.ModelViewSet):
     """
@@ -122,12 +208,13 @@ class CandidateRankingViewSet(viewsets.ModelViewSet):
     """
     queryset = CandidateRanking.objects.all()
     serializer_class = CandidateRankingSerializer
-    filter_backends = [DjangoFilterBackend, filters.ObjectPermissionsFilter,]
+    filter_backends = [DjangoFilterBackend, OwnerPermissionsFilter,
+                       ModifiedSinceFilter,]
 
     def create(self, request, *args, **kwargs):
         candidate_list_pk = request.data.get('candidate_list')
         cl = CandidateList.objects.get(pk=candidate_list_pk)
-        if not request.user.has_perm('api.change_candidatelist', cl):
+        if not has_object_perm(request, 'api.change_candidatelist', cl):
             return Response({'detail': 'You do not have permission'
                              ' to perform this action'},
                             status=status.HTTP_403_FORBIDDEN)
@@ -144,6 +231,36 @@ class CandidateRankingViewSet(viewsets.ModelViewSet):
         ).select_related("candidate", "candidate_list")
 
 
+class CandidateRecommendationView(APIView):
+    """
+    The learners best matching the KSAs required by a `job`, or by the job
+    of a `vacancy`, scored from the precomputed user by KSA matrix. Up to
+    `limit` candidates are returned, leaving out the candidates already in
+    `candidate_list`.
+    """
+    queryset = CandidateList.objects.all()
+
+    def get(self, request):
+        """Get the recommended candidates"""
+        query = CandidateRecommendationFilterSerializer(
+            data=request.query_params, context={'request': request})
+        query.is_valid(raise_exception=True)
+        job = query.validated_data['job']
+        candidate_list = query.validated_data.get('candidate_list')
+
+        requirements = job.ksa_requirements.values_list(
+            'ksa', 'required_level', 'weight')
+        exclude = candidate_list.rankings.values_list(
+            'candidate', flat=True) if candidate_list else []
+        recommended = recommend_candidates(
+            list(requirements), query.validated_data['limit'], exclude)
+
+        serializer = CandidateRecommendationSerializer(
+            [{'user': user, 'score': score} for user, score in recommended],
+            many=True)
+        return Response(serializer.data, status.HTTP_200_OK)
+
+
 class TrainingPlanListViewSet(viewsets.ModelViewSet):
     """
     Retrieve Training Plans
@@ -151,7 +268,7 @@ class TrainingPlanListViewSet(viewsets.ModelViewSet):
     queryset = TrainingPlan.objects.all().select_related(
         "planner", "role", "trainee")
     serializer_class = TrainingPlanSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter,]
 
     def initial(self, request, *args, **kwargs):
         """
@@ -173,7 +290,7 @@ class GetCourseProgressView(APIView):
     def get(self, request):
         """Get course progress data"""
 
-        config = Configuration.objects.first()
+        config = get_configuration()
         if not config:
             return Response({'message': 'No configuration found.'},
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -274,14 +391,15 @@ class GetCourseProgressView(APIView):
 
 class LearningPlanGoalCourseViewSet(viewsets.ModelViewSet):
     """Viewset for Learning Plan Goal Courses."""
-    queryset = LearningPlanGoalCourse.objects.all()
+    queryset = LearningPlanGoalCourse.objects.all().select_related(
+        'xds_course__xds_metadata')
     serializer_class = LearningPlanGoalCourseSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
 
     def create(self, request, *args, **kwargs):
         lpg_pk = request.data.get('plan_goal')
         lpg = LearningPlanGoal.objects.get(pk=lpg_pk)
-        if not request.user.has_perm('api.change_learningplangoal', lpg):
+        if not has_object_perm(request, 'api.change_learningplangoal', lpg):
             return Response({'detail': 'You do not have permission'
                             ' to perform this action'},
                             status=status.HTTP_403_FORBIDDEN)
@@ -307,14 +425,14 @@ class LearningPlanGoalCourseViewSet(viewsets.ModelViewSet):
 
 class LearningPlanGoalKsaViewSet(viewsets.ModelViewSet):
     """Viewset for Learning Plan Goal KSAs."""
-    queryset = LearningPlanGoalKsa.objects.all()
+    queryset = LearningPlanGoalKsa.objects.all().select_related('eccr_ksa')
     serializer_class = LearningPlanGoalKsaSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
 
     def create(self, request, *args, **kwargs):
         lpg_pk = request.data.get('plan_goal')
         lpg = LearningPlanGoal.objects.get(pk=lpg_pk)
-        if not request.user.has_perm('api.change_learningplangoal', lpg):
+        if not has_object_perm(request, 'api.change_learningplangoal', lpg):
             return Response({'detail': 'You do not have permission'
                             ' to perform this action'},
                             status=status.HTTP_403_FORBIDDEN)
@@ -340,14 +458,15 @@ class LearningPlanGoalKsaViewSet(viewsets.ModelViewSet):
 
 class LearningPlanGoalViewSet(viewsets.ModelViewSet):
     """Viewset for Learning Plan Goals"""
-    queryset = LearningPlanGoal.objects.all()
+    queryset = learning_plan_goal_queryset()
     serializer_class = LearningPlanGoalSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
 
     def create(self, request, *args, **kwargs):
         lpc_pk = request.data.get('plan_competency')
         lpc = LearningPlanCompetency.objects.get(pk=lpc_pk)
-        if not request.user.has_perm('api.change_learningplancompetency', lpc):
+        if not has_object_perm(request, 'api.change_learningplancompetency',
+                               lpc):
             return Response({'detail': 'You do not have permission'
                             ' to perform this action'},
                             status=status.HTTP_403_FORBIDDEN)
@@ -369,37 +488,113 @@ class LearningPlanGoalViewSet(viewsets.ModelViewSet):
 
 class LearningPlanCompetencyViewSet(viewsets.ModelViewSet):
     """Viewset for Learning Plan Competencies"""
-    queryset = LearningPlanCompetency.objects.all()
+    queryset = learning_plan_competency_queryset()
     serializer_class = LearningPlanCompetencySerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
 
     def create(self, request, *args, **kwargs):
         lp_pk = request.data.get('learning_plan')
         lp = LearningPlan.objects.get(pk=lp_pk)
-        if not request.user.has_perm('api.change_learningplan', lp):
+        if not has_object_perm(request, 'api.change_learningplan', lp):
             return Response({'detail': 'You do not have permission'
                             ' to perform this action'},
                             status=status.HTTP_403_FORBIDDEN)
         return super().create(request, *args, **kwargs)
 
 
-class LearningPlanViewSet(viewsets.ModelViewSet):
+class LearningPlanViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Viewset for Learning Plans"""
-    queryset = LearningPlan.objects.all()
+    queryset = learning_plan_queryset()
     serializer_class = LearningPlanSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
+    sparse_prefetches = {
+        'competencies': [
+            Prefetch('competencies', learning_plan_competency_queryset())],
+    }
+
+    def serves_snapshots(self):
+        """Whether the request is answered from the cached snapshots, which
+        hold every field of the learning plans"""
+        return self.action in ['list', 'retrieve'] and \
+            self.get_sparse_fieldset() is None
+
+    def get_queryset(self):
+        if self.serves_snapshots():
+            # the tree is only loaded for plans without a cached snapshot
+            return LearningPlan.objects.select_related('learner')
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action in ['create_tree', 'replace_tree']:
+            return LearningPlanTreeSerializer
+        return super().get_serializer_class()
+
+    def get_snapshots(self, learning_plans):
+        """Return the cached serialized JSON of each learning plan"""
+        return get_snapshots(
+            learning_plans, LearningPlanSerializer,
+            [Prefetch('competencies', learning_plan_competency_queryset())],
+            self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        if not self.serves_snapshots():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                [json.loads(snapshot)
+                 for snapshot in self.get_snapshots(page)])
+
+        snapshots = self.get_snapshots(list(queryset))
+        return HttpResponse(b'[' + b','.join(snapshots) + b']',
+                            content_type='application/json')
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.serves_snapshots():
+            return super().retrieve(request, *args, **kwargs)
+
+        snapshot, = self.get_snapshots([self.get_object()])
+        return HttpResponse(snapshot, content_type='application/json')
+
+    def tree_response(self, learning_plan, status_code):
+        """Respond with the whole tree of the learning plan"""
+        learning_plan = learning_plan_queryset().get(pk=learning_plan.pk)
+        serializer = LearningPlanSerializer(
+            learning_plan, context=self.get_serializer_context())
+        return Response(serializer.data, status=status_code)
+
+    @action(detail=False, methods=['post'], url_path='tree')
+    def create_tree(self, request):
+        """Create a learning plan from a complete nested document"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        learning_plan = serializer.save()
+        return self.tree_response(learning_plan, status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['put'], url_path='tree')
+    def replace_tree(self, request, pk=None):
+        """Replace a learning plan and its whole tree with a complete nested
+        document"""
+        serializer = self.get_serializer(self.get_object(),
+                                         data=request.data)
+        serializer.is_valid(raise_exception=True)
+        learning_plan = serializer.save()
+        return self.tree_response(learning_plan, status.HTTP_200_OK)
 
 
 class ApplicationCourseViewSet(viewsets.ModelViewSet):
     """Viewset for Application Courses"""
     queryset = ApplicationCourse.objects.all()
     serializer_class = ApplicationCourseSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
 
     def create(self, request, *args, **kwargs):
         app_pk = request.data.get('application')
         app = Application.objects.get(pk=app_pk)
-        if not request.user.has_perm('api.change_application', app):
+        if not has_object_perm(request, 'api.change_application', app):
             return Response({'detail': 'You do not have permission'
                             ' to perform this action'},
                             status=status.HTTP_403_FORBIDDEN)
@@ -410,12 +605,12 @@ class ApplicationExperienceViewSet(viewsets.ModelViewSet):
     """Viewset for Application Experiences"""
     queryset = ApplicationExperience.objects.all()
     serializer_class = ApplicationExperienceSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
 
     def create(self, request, *args, **kwargs):
         app_pk = request.data.get('application')
         app = Application.objects.get(pk=app_pk)
-        if not request.user.has_perm('api.change_application', app):
+        if not has_object_perm(request, 'api.change_application', app):
             return Response({'detail': 'You do not have permission'
                             ' to perform this action'},
                             status=status.HTTP_403_FORBIDDEN)
@@ -426,58 +621,131 @@ class ApplicationCommentViewSet(viewsets.ModelViewSet):
     """Viewset for Application Comments"""
     queryset = ApplicationComment.objects.all()
     serializer_class = ApplicationCommentSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
     http_method_names = ['get', 'post', 'head', 'options']
 
 
-class ApplicationViewSet(viewsets.ModelViewSet):
+class ApplicationViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """Viewset for Applications"""
+    sparse_prefetches = {
+        'experiences': ['experiences'],
+        'courses': [
+            Prefetch('courses',
+                     ApplicationCourse.objects.select_related('xds_course'))],
+        'comments': ['comments'],
+    }
     queryset = Application.objects.all().select_related(
         'applicant'
     ).prefetch_related(
-        'experiences', 'courses', 'comments'
-    ).annotate(
-        total_advocacy_hours=Subquery(
-            ApplicationExperience.objects.filter(
-                application=OuterRef('pk')
-            ).values('application').annotate(
-                total_hours=Sum('advocacy_hours')
-            ).values('total_hours')[:1]
-        ),
-        total_marked_for_evaluation_hours=Subquery(
-            ApplicationExperience.objects.filter(
-                application=OuterRef('pk'),
-                marked_for_evaluation=True
-            ).values('application').annotate(
-                total_hours=Sum('advocacy_hours')
-            ).values('total_hours')[:1]
-        ),
-        total_marked_for_evaluation_count=Subquery(
-            ApplicationExperience.objects.filter(
-                application=OuterRef('pk'),
-                marked_for_evaluation=True
-            ).values('application').annotate(
-                total_count=Count('id')
-            ).values('total_count')[:1]
-        ),
-        total_course_clocked_hours=Subquery(
-            ApplicationCourse.objects.filter(
-                application=OuterRef('pk')
-            ).values('application').annotate(
-                total_hours=Sum('clocked_hours')
-            ).values('total_hours')[:1]
-        )
+        *[lookup for lookups in sparse_prefetches.values()
+          for lookup in lookups]
     )
     serializer_class = ApplicationSerializer
-    filter_backends = [filters.ObjectPermissionsFilter,]
+    filter_backends = [OwnerPermissionsFilter, ModifiedSinceFilter,]
     http_method_names = ['get', 'post', 'patch', 'head', 'options']
+    keyset_ordering = ('final_submission_stamp', 'id')
+
+    @action(detail=False, methods=['get'], url_path='review-queue',
+            serializer_class=ApplicationSummarySerializer,
+            filter_backends=[ModifiedSinceFilter,],
+            pagination_class=KeysetPagination)
+    def review_queue(self, request):
+        """
+        Applications in review whose experiences marked for evaluation are
+        supervised by the current user, oldest submission first
+        """
+        # scoped by supervisor email rather than object permissions, which
+        # reviewers only get once the application is saved again
+        if not request.user.email:
+            queryset = Application.objects.none()
+        else:
+            queryset = Application.objects.filter(
+                Exists(ApplicationExperience.objects.annotate(
+                    supervisor=Lower('supervisor_email')).filter(
+                    application=OuterRef('pk'),
+                    marked_for_evaluation=True,
+                    supervisor=request.user.email.lower())),
+                status__in=REVIEW_STATUSES,
+                final_submission_stamp__isnull=False,
+            ).select_related('applicant')
+        queryset = self.filter_queryset(queryset)
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Stream the applications the user can view as CSV, or as JSON lines
+        with ?export_format=jsonl
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'detail': 'Unsupported export format'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(
+            export_queryset(Application.objects.all()))
+        response = StreamingHttpResponse(
+            export_lines(queryset, export_format),
+            content_type=EXPORT_FORMATS[export_format])
+        filename = f'applications-{timezone.now():%Y%m%d}.{export_format}'
+        response.headers['Content-Disposition'] = \
+            f'attachment; filename="{filename}"'
+        return response
+
+    def bulk_replace_children(self, request, pk, related_name,
+                              serializer_class):
+        """
+        Replace all experiences or courses of the application with the
+        complete list in the request body
+        """
+        try:
+            application = Application.objects.select_related(
+                'applicant').get(pk=pk)
+        except Application.DoesNotExist:
+            return Response({'detail': 'Application not found'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        if not has_object_perm(request, 'api.change_application',
+                               application):
+            return Response({'detail': 'You do not have permission'
+                             ' to perform this action'},
+                            status=status.HTTP_403_FORBIDDEN)
+        if application.status not in EDITABLE_STATUSES:
+            return Response({'detail': f'Cannot add/update {related_name}'
+                             ' of a non editable application'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = serializer_class(
+            list(getattr(application, related_name).all()),
+            data=request.data, many=True,
+            context={**self.get_serializer_context(),
+                     'application': application})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], url_path='bulk-experiences')
+    def bulk_experiences(self, request, pk=None):
+        """Replace all experiences of the application in one request"""
+        return self.bulk_replace_children(
+            request, pk, 'experiences', ApplicationExperienceBulkSerializer)
+
+    @action(detail=True, methods=['post'], url_path='bulk-courses')
+    def bulk_courses(self, request, pk=None):
+        """Replace all courses of the application in one request"""
+        return self.bulk_replace_children(
+            request, pk, 'courses', ApplicationCourseBulkSerializer)
 
     @action(detail=True, methods=['post'],
             url_path='acknowledge-code-of-ethics')
     def acknowledge_code_of_ethics(self, request, pk=None):
         """Acknowledge the code of ethics for the application"""
         try:
-            application = self.get_queryset().get(pk=pk)
+            application = Application.objects.select_related(
+                'applicant').get(pk=pk)
         except Application.DoesNotExist:
             return Response({'detail': 'Application not found'},
                             status=status.HTTP_404_NOT_FOUND)
@@ -512,7 +780,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     def final_submit(self, request, pk=None):
         """Final submission of the application"""
         try:
-            application = self.get_queryset().get(pk=pk)
+            application = Application.objects.select_related(
+                'applicant').get(pk=pk)
         except Application.DoesNotExist:
             return Response({'detail': 'Application not found'},
                             status=status.HTTP_404_NOT_FOUND)
@@ -549,3 +818,156 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             {'detail': 'Application final submitted'},
             status=status.HTTP_200_OK
         )
+
+
+class ApplicationAnalyticsView(APIView):
+    """
+    Application counts by status, position and type with the average hours
+    and time to review, read from the precomputed status summary. Filtered
+    by `organization`, `position`, `application_type` and a `start_date` to
+    `end_date` range of creation days.
+    """
+    queryset = ApplicationStatusSummary.objects.all()
+    filter_lookups = {
+        'organization': 'organization',
+        'position': 'position',
+        'application_type': 'application_type',
+        'start_date': 'day__gte',
+        'end_date': 'day__lte',
+    }
+
+    def get(self, request):
+        """Get the application analytics"""
+        query = ApplicationAnalyticsFilterSerializer(
+            data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        summaries = self.queryset.filter(**{
+            self.filter_lookups[name]: value
+            for name, value in query.validated_data.items()})
+        serializer = ApplicationAnalyticsSerializer(
+            summarize_applications(summaries))
+        return Response(serializer.data, status.HTTP_200_OK)
+
+
+class TombstoneViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Deletions of the objects the requesting user could view, for
+    incremental sync with `modified_since` alongside the regular listings
+    """
+    queryset = Tombstone.objects.all()
+    serializer_class = TombstoneSerializer
+    permission_classes = [permissions.IsAuthenticated,]
+    filter_backends = [DjangoFilterBackend, ModifiedSinceFilter,]
+    filterset_fields = ['model',]
+    modified_since_field = 'deleted'
+
+    def get_queryset(self):
+        """
+        This view should return the tombstones of the objects the currently
+        authenticated user owned or could view.
+        """
+        user = self.request.user
+        return self.queryset.filter(viewers=user)
+
+
+class DocumentUploadViewSet(mixins.CreateModelMixin,
+                            mixins.RetrieveModelMixin,
+                            viewsets.GenericViewSet):
+    """
+    Chunked, resumable uploads of certification and proof documents.
+    POST declares the upload, PATCH appends the raw bytes of a chunk
+    starting at the `Upload-Offset` header and GET returns the offset to
+    resume from.
+    """
+    queryset = DocumentUpload.objects.all()
+    serializer_class = DocumentUploadSerializer
+    permission_classes = [permissions.IsAuthenticated,]
+
+    def get_queryset(self):
+        """
+        This view should return the uploads of the currently authenticated
+        user.
+        """
+        user = self.request.user
+        return self.queryset.filter(owner=user)
+
+    def partial_update(self, request, *args, **kwargs):
+        """
+        Append the request body to the upload, the request data is never
+        parsed so the chunk is streamed to disk
+        """
+        upload = self.get_object()
+        try:
+            offset = int(request.headers[UPLOAD_OFFSET_HEADER])
+            length = int(request.headers.get('Content-Length') or 0)
+        except (KeyError, ValueError):
+            return Response({'detail': f'{UPLOAD_OFFSET_HEADER} and'
+                             ' Content-Length headers are required'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+            return Response({'detail': 'Chunks cannot exceed '
+                             f'{settings.UPLOAD_CHUNK_MAX_SIZE} bytes'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        try:
+            upload = append_chunk(upload.pk, offset, request)
+        except UploadOffsetMismatch as e:
+            return Response({'detail': str(e)},
+                            status=status.HTTP_409_CONFLICT,
+                            headers={UPLOAD_OFFSET_HEADER: str(e.offset)})
+        except UploadChunkTooLarge as e:
+            return Response({'detail': str(e)},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        return Response(self.get_serializer(upload).data,
+                        status=status.HTTP_200_OK,
+                        headers={UPLOAD_OFFSET_HEADER: str(upload.offset)})
+
+    def can_view_attachments(self, request, upload):
+        """Check that the user can view an application or experience the
+        upload is attached to"""
+        applications = list(upload.certified_applications.all())
+        experiences = list(upload.proven_experiences.all())
+        prefetch_object_perms(request, applications)
+        prefetch_object_perms(request, experiences)
+        return any(
+            has_object_perm(request, 'api.view_application', application)
+            for application in applications
+        ) or any(
+            has_object_perm(request, 'api.view_applicationexperience',
+                            experience)
+            for experience in experiences)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Serve a completed document to its owner or to the users allowed to
+        view the application or experience it is attached to
+        """
+        try:
+            upload = DocumentUpload.objects.get(pk=pk,
+                                                completed__isnull=False)
+        except DocumentUpload.DoesNotExist:
+            return Response({'detail': 'Document not found'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        if upload.owner_id != request.user.pk and \
+                not self.can_view_attachments(request, upload):
+            return Response({'detail': 'Document not found'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        content_type = upload.content_type or 'application/octet-stream'
+        location = settings.UPLOAD_ACCEL_REDIRECT_LOCATION
+        if not location:
+            return FileResponse(open(upload_path(upload.pk), 'rb'),
+                                as_attachment=True,
+                                filename=upload.filename,
+                                content_type=content_type)
+
+        # nginx sends the file from its internal location
+        response = HttpResponse(content_type=content_type)
+        response.headers['X-Accel-Redirect'] = f'{location}{upload.pk}'
+        response.headers['Content-Disposition'] = \
+            content_disposition_header(True, upload.filename)
+        return response
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ConfigurationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'configuration'
+
+    def ready(self):
+        from configuration import signals  # noqa: F401
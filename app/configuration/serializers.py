@@ -4,6 +4,7 @@ from rest_framework import serializers
 
 from configuration.models import (AdminConfiguration, Configuration,
                                   UIConfiguration)
+from configuration.utils.cache_utils import get_user_roles
 
 logger = logging.getLogger(__name__)
 
@@ -31,16 +32,13 @@ class ConfigurationSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Allow restricting access to fields based on group membership"""
         d = super().to_representation(instance)
-        current_user = self.context['request'].user
-        user_groups = current_user.groups.all()
-        manager_groups = instance.manager_group.all()
-        org_admin_groups = instance.org_admin_group.all()
+        roles = get_user_roles(self.context['request'].user)
         # check if user is an org admin, if not remove xms and ldss
-        if not org_admin_groups.intersection(user_groups).exists():
+        if not roles['org_admin']:
             d.pop('target_xms_api', None)
             d.pop('target_ldss_api', None)
         # check if user is in manager groups, if yes add manager flag
-        if manager_groups.intersection(user_groups).exists():
+        if roles['manager']:
             d['manager'] = True
         return d
 
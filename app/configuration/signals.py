@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from guardian.models import GroupObjectPermission, UserObjectPermission
+
+from configuration.models import (AdminConfiguration, Configuration,
+                                  UIConfiguration)
+from configuration.utils.cache_utils import (invalidate_configuration,
+                                             invalidate_user_roles)
+
+M2M_CHANGE_ACTIONS = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver(post_save, sender=Configuration)
+@receiver(post_delete, sender=Configuration)
+@receiver(post_save, sender=AdminConfiguration)
+@receiver(post_delete, sender=AdminConfiguration)
+@receiver(post_save, sender=UIConfiguration)
+@receiver(post_delete, sender=UIConfiguration)
+def configuration_changed(sender, **kwargs):
+    """
+    Invalidate the cached Configuration and publish a new configuration
+    version when any configuration model is saved or deleted
+    """
+    invalidate_configuration()
+
+
+@receiver(m2m_changed, sender=Configuration.manager_group.through)
+@receiver(m2m_changed, sender=Configuration.org_admin_group.through)
+def configuration_groups_changed(sender, action, **kwargs):
+    """Invalidate the cached Configuration when its groups change"""
+    if action in M2M_CHANGE_ACTIONS:
+        invalidate_configuration()
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def user_groups_changed(sender, action, instance, reverse, pk_set,
+                        **kwargs):
+    """
+    Invalidate the cached roles of the users whose group membership
+    changed, every user's when a group is cleared
+    """
+    if action not in M2M_CHANGE_ACTIONS:
+        return
+    if not reverse:
+        invalidate_user_roles([instance.pk])
+    elif pk_set is not None:
+        invalidate_user_roles(pk_set)
+    else:
+        invalidate_user_roles()
+
+
+@receiver(post_save, sender=UserObjectPermission)
+@receiver(post_delete, sender=UserObjectPermission)
+@receiver(post_save, sender=GroupObjectPermission)
+@receiver(post_delete, sender=GroupObjectPermission)
+def object_permission_changed(sender, instance, **kwargs):
+    """
+    Invalidate the cached Configuration and publish a new configuration
+    version when a permission on a configuration model is granted or
+    revoked, the configuration responses only list the permitted objects
+    """
+    content_type = ContentType.objects.get_for_id(instance.content_type_id)
+    if content_type.model_class() in (Configuration, AdminConfiguration):
+        invalidate_configuration()
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, **kwargs):
+    """
+    Invalidate the cached Configuration and user roles when a group is
+    deleted, its memberships are removed without an m2m_changed signal
+    """
+    invalidate_configuration()
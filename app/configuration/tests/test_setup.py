@@ -1,5 +1,7 @@
 from django.test import override_settings
 from rest_framework.test import APITestCase
+
+from configuration.utils.cache_utils import clear_configuration_cache
 from users.models import User
 
 
@@ -13,6 +15,10 @@ class TestSetUp(APITestCase):
         settings_manager.enable()
         self.addCleanup(settings_manager.disable)
 
+        # start every test without a cached Configuration
+        clear_configuration_cache()
+        self.addCleanup(clear_configuration_cache)
+
         # Auth stuff
         self.auth_email = "test_auth@test.com"
         self.auth_password = "test_auth1234"
@@ -0,0 +1,176 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import override_settings, tag
+from django.utils import timezone
+
+from configuration.models import Configuration
+from configuration.utils.cache_utils import (CONFIGURATION_VERSION_KEY,
+                                             get_configuration,
+                                             get_configuration_version,
+                                             get_user_roles)
+
+from .test_setup import TestSetUp
+
+
+@tag('unit')
+class CacheUtilsTests(TestSetUp):
+
+    def test_get_configuration_cached(self):
+        """Test that the Configuration is only queried once per process"""
+        conf = Configuration.objects.create(target_xds_api="xds")
+
+        self.assertEqual(get_configuration(), conf)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_configuration().target_xds_api, "xds")
+            self.assertEqual(
+                list(get_configuration().manager_group.all()), [])
+
+    def test_get_configuration_missing(self):
+        """Test that a missing Configuration returns None"""
+        self.assertIsNone(get_configuration())
+
+    def test_get_configuration_invalidated_on_save(self):
+        """Test that saving the Configuration drops the cached copy"""
+        conf = Configuration.objects.create(target_xds_api="xds")
+        get_configuration()
+
+        conf.target_xds_api = "new_xds"
+        conf.save()
+
+        self.assertEqual(get_configuration().target_xds_api, "new_xds")
+
+    def test_get_configuration_invalidated_on_delete(self):
+        """Test that deleting the Configuration drops the cached copy"""
+        conf = Configuration.objects.create()
+        get_configuration()
+
+        conf.delete()
+
+        self.assertIsNone(get_configuration())
+
+    def test_get_configuration_invalidated_on_group_change(self):
+        """Test that changing the Configuration groups drops the cached
+        copy"""
+        conf = Configuration.objects.create()
+        group = Group.objects.create(name="managers")
+        get_configuration()
+
+        conf.manager_group.add(group)
+
+        self.assertEqual(
+            list(get_configuration().manager_group.all()), [group])
+
+    def test_invalidation_bumps_version_on_commit(self):
+        """Test that changes publish a new version for other processes
+        once committed"""
+        version = get_configuration_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Configuration.objects.create()
+
+        self.assertNotEqual(get_configuration_version(), version)
+
+    @override_settings(CONFIGURATION_CACHE_CHECK_SECONDS=0)
+    def test_get_configuration_other_process_change(self):
+        """Test that a version published by another process reloads the
+        Configuration"""
+        conf = Configuration.objects.create(target_xds_api="xds")
+        get_configuration()
+        conf_modified = timezone.now()
+
+        # simulate a change made by another process
+        with patch('configuration.signals.invalidate_configuration'):
+            conf.target_xds_api = "new_xds"
+            conf.save()
+        self.assertEqual(get_configuration().target_xds_api, "xds")
+
+        cache.set(CONFIGURATION_VERSION_KEY,
+                  {'version': "other", 'modified': conf_modified},
+                  timeout=None)
+
+        self.assertEqual(get_configuration().target_xds_api, "new_xds")
+
+    def test_get_user_roles(self):
+        """Test that user roles are computed from the Configuration groups
+        and cached"""
+        conf = Configuration.objects.create()
+        managers = Group.objects.create(name="managers")
+        admins = Group.objects.create(name="admins")
+        conf.manager_group.add(managers)
+        conf.org_admin_group.add(admins)
+        self.basic_user.groups.add(managers)
+
+        self.assertEqual(get_user_roles(self.basic_user),
+                         {'manager': True, 'org_admin': False})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_roles(self.basic_user),
+                             {'manager': True, 'org_admin': False})
+        self.assertEqual(get_user_roles(self.auth_user),
+                         {'manager': False, 'org_admin': False})
+
+    def test_get_user_roles_invalidated_on_membership_change(self):
+        """Test that changing a user's groups drops the cached roles"""
+        conf = Configuration.objects.create()
+        admins = Group.objects.create(name="admins")
+        conf.org_admin_group.add(admins)
+        get_user_roles(self.basic_user)
+
+        admins.user_set.add(self.basic_user)
+        self.assertTrue(get_user_roles(self.basic_user)['org_admin'])
+
+        self.basic_user.groups.clear()
+        self.assertFalse(get_user_roles(self.basic_user)['org_admin'])
+
+    def test_get_user_roles_membership_change_keeps_others(self):
+        """Test that changing a user's groups only drops that user's roles
+        and keeps the cached Configuration"""
+        conf = Configuration.objects.create()
+        admins = Group.objects.create(name="admins")
+        conf.org_admin_group.add(admins)
+        get_user_roles(self.basic_user)
+        get_user_roles(self.auth_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basic_user.groups.add(admins)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_configuration(), conf)
+            self.assertFalse(get_user_roles(self.auth_user)['org_admin'])
+        self.assertTrue(get_user_roles(self.basic_user)['org_admin'])
+
+    @override_settings(CONFIGURATION_ROLES_CACHE_SIZE=1)
+    def test_get_user_roles_bounded(self):
+        """Test that only the most recently used users' roles are kept"""
+        Configuration.objects.create()
+        get_user_roles(self.basic_user)
+        get_user_roles(self.auth_user)
+
+        with self.assertNumQueries(0):
+            get_user_roles(self.auth_user)
+        with self.assertNumQueries(1):
+            get_user_roles(self.basic_user)
+
+    def test_get_user_roles_expire(self):
+        """Test that cached roles are recomputed once they are older than
+        the configuration check interval"""
+        Configuration.objects.create()
+        get_user_roles(self.basic_user)
+
+        with override_settings(CONFIGURATION_CACHE_CHECK_SECONDS=0):
+            with self.assertNumQueries(2):
+                get_user_roles(self.basic_user)
+
+    def test_get_user_roles_invalidated_on_configuration_change(self):
+        """Test that changing the Configuration groups drops the cached
+        roles"""
+        conf = Configuration.objects.create()
+        managers = Group.objects.create(name="managers")
+        self.basic_user.groups.add(managers)
+        self.assertFalse(get_user_roles(self.basic_user)['manager'])
+
+        conf.manager_group.add(managers)
+        self.assertTrue(get_user_roles(self.basic_user)['manager'])
+
+        managers.delete()
+        self.assertFalse(get_user_roles(self.basic_user)['manager'])
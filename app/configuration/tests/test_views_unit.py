@@ -1,10 +1,15 @@
 import json
+from unittest.mock import patch
 
+from django.contrib.auth.models import Group
 from django.test import tag
 from django.urls import reverse
 from rest_framework import status
 
-from configuration.models import Configuration
+from guardian.shortcuts import assign_perm, remove_perm
+
+from configuration.models import (AdminConfiguration, Configuration,
+                                  UIConfiguration)
 
 from .test_setup import TestSetUp
 
@@ -32,3 +37,144 @@ class ViewTests(TestSetUp):
                          responseDict['target_elrr_api'])
         self.assertEqual(conf.target_eccr_api,
                          responseDict['target_eccr_api'])
+
+    def test_config_requests_roles(self):
+        """Test that the configuration is restricted by the user's groups"""
+        conf = Configuration(target_xms_api="xms")
+        conf.save()
+        managers = Group.objects.create(name="managers")
+        conf.manager_group.add(managers)
+        self.auth_user.groups.add(managers)
+
+        url = reverse('config:config-detail',
+                      kwargs={"pk": conf.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.get(url)
+        responseDict = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(responseDict['manager'])
+        self.assertNotIn('target_xms_api', responseDict)
+
+        # the roles are cached, so only the version stamp and the
+        # configuration itself are queried
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_config_requests_not_modified(self):
+        """Test that a matching If-None-Match returns a 304 until the
+        configuration changes"""
+        conf = Configuration(target_xds_api="xds")
+        conf.save()
+
+        url = reverse('config:config-detail',
+                      kwargs={"pk": conf.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response.headers)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            conf.target_xds_api = "new_xds"
+            conf.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['target_xds_api'],
+                         "new_xds")
+
+    def test_config_requests_etag_per_user(self):
+        """Test that the configuration ETag differs between users"""
+        conf = Configuration()
+        conf.save()
+
+        url = reverse('config:config-detail',
+                      kwargs={"pk": conf.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        etag = self.client.get(url).headers['ETag']
+        self.client.logout()
+        self.client.login(username=self.basic_email,
+                          password=self.basic_password)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_config_requests_etag_permissions(self):
+        """Test that granting or revoking a permission on an admin
+        configuration changes the configuration ETag"""
+        conf = Configuration()
+        conf.save()
+        admin = AdminConfiguration.objects.create(config=conf)
+
+        url = reverse('config:config-detail',
+                      kwargs={"pk": conf.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        etag = self.client.get(url).headers['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assign_perm('view_adminconfiguration', self.auth_user, admin)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            remove_perm('view_adminconfiguration', self.auth_user, admin)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_config_requests_etag_groups(self):
+        """Test that a change of the user's groups changes the
+        configuration ETag"""
+        conf = Configuration()
+        conf.save()
+
+        url = reverse('config:config-detail',
+                      kwargs={"pk": conf.pk})
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        etag = self.client.get(url).headers['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.auth_user.groups.add(Group.objects.create(name="group"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_ui_config_requests_not_modified(self):
+        """Test that the UI configuration answers If-None-Match with a
+        304 before serializing"""
+        UIConfiguration(portal_name="Portal").save()
+
+        url = reverse('config:uiconfig-list')
+        self.client.login(username=self.auth_email,
+                          password=self.auth_password)
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['portal_name'],
+                         "Portal")
+
+        with patch('configuration.views.UIConfigurationViewSet'
+                   '.get_serializer') as get_serializer:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        get_serializer.assert_not_called()
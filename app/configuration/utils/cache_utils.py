@@ -0,0 +1,189 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from configuration.models import Configuration
+
+CONFIGURATION_VERSION_KEY = 'configuration:version'
+
+_lock = threading.Lock()
+_cached = {
+    'loaded': False,
+    'configuration': None,
+    'version': None,
+    'checked': 0.0,
+    'generation': 0,
+    'roles': OrderedDict(),
+    'roles_generation': 0,
+}
+
+
+def new_configuration_stamp():
+    """Return a new version stamp for the configuration"""
+    return {'version': uuid.uuid4().hex, 'modified': timezone.now()}
+
+
+def get_configuration_stamp():
+    """
+    Return the version stamp of the configuration shared by every worker
+    process, a dict with a unique 'version' and the 'modified' datetime of
+    the last change, creating one if the cache does not hold it yet
+    """
+    stamp = cache.get(CONFIGURATION_VERSION_KEY)
+    if stamp is None:
+        stamp = new_configuration_stamp()
+        if not cache.add(CONFIGURATION_VERSION_KEY, stamp, timeout=None):
+            stamp = cache.get(CONFIGURATION_VERSION_KEY, stamp)
+    return stamp
+
+
+def get_configuration_version():
+    """Return the version of the configuration shared by every process"""
+    return get_configuration_stamp()['version']
+
+
+def get_configuration():
+    """
+    Return the Configuration singleton (or None) from the process cache.
+
+    The cached copy is shared by every thread of the process, so callers
+    must treat it as read only. Changes made in this process drop it
+    immediately, changes made in other processes are picked up the next
+    time the shared version stamp is checked, at most every
+    CONFIGURATION_CACHE_CHECK_SECONDS.
+    """
+    now = time.monotonic()
+    with _lock:
+        if _cached['loaded'] and now - _cached['checked'] < \
+                settings.CONFIGURATION_CACHE_CHECK_SECONDS:
+            return _cached['configuration']
+        generation = _cached['generation']
+
+    version = get_configuration_version()
+    with _lock:
+        if _cached['loaded'] and _cached['version'] == version:
+            _cached['checked'] = now
+            return _cached['configuration']
+
+    configuration = Configuration.objects.prefetch_related(
+        'manager_group', 'org_admin_group').first()
+    with _lock:
+        # only keep the copy if no invalidation happened while loading it
+        if _cached['generation'] == generation:
+            _cached.update(loaded=True, configuration=configuration,
+                           version=version, checked=now,
+                           roles=OrderedDict())
+    return configuration
+
+
+def _get_user_entry(user, configuration):
+    """Return the cached roles and group pks of the user, see
+    get_user_roles"""
+    now = time.monotonic()
+    with _lock:
+        entry = _cached['roles'].get(user.pk)
+        if entry is not None and now - entry[2] < \
+                settings.CONFIGURATION_CACHE_CHECK_SECONDS:
+            _cached['roles'].move_to_end(user.pk)
+            return entry
+        generation = _cached['roles_generation']
+
+    group_ids = frozenset(user.groups.values_list('pk', flat=True))
+    roles = {
+        'manager': any(group.pk in group_ids
+                       for group in configuration.manager_group.all()),
+        'org_admin': any(group.pk in group_ids
+                         for group in configuration.org_admin_group.all()),
+    }
+    entry = (roles, group_ids, now)
+    with _lock:
+        # only keep the roles if no invalidation happened while computing
+        if _cached['configuration'] is configuration and \
+                _cached['roles_generation'] == generation:
+            _cached['roles'][user.pk] = entry
+            _cached['roles'].move_to_end(user.pk)
+            while len(_cached['roles']) > \
+                    settings.CONFIGURATION_ROLES_CACHE_SIZE:
+                _cached['roles'].popitem(last=False)
+    return entry
+
+
+def get_user_roles(user):
+    """
+    Return the manager and org admin flags of the user.
+
+    The flags are computed once per user and kept with the cached
+    Configuration, so they are dropped whenever the Configuration or its
+    groups change and, for that user only, when their group membership
+    changes. At most CONFIGURATION_ROLES_CACHE_SIZE users are kept, least
+    recently used first out, and entries older than
+    CONFIGURATION_CACHE_CHECK_SECONDS are recomputed so membership changes
+    made in other processes are picked up.
+    """
+    configuration = get_configuration()
+    if configuration is None or not user.is_authenticated:
+        return {'manager': False, 'org_admin': False}
+    return _get_user_entry(user, configuration)[0]
+
+
+def get_user_group_ids(user):
+    """
+    Return a frozenset of the pks of the user's groups, cached with their
+    roles (see get_user_roles) while there is a Configuration
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    configuration = get_configuration()
+    if configuration is None:
+        return frozenset(user.groups.values_list('pk', flat=True))
+    return _get_user_entry(user, configuration)[1]
+
+
+def clear_user_roles(user_pks=None):
+    """Drop this process's cached roles of the users, or of every user"""
+    with _lock:
+        if user_pks is None:
+            _cached['roles'] = OrderedDict()
+        else:
+            for pk in user_pks:
+                _cached['roles'].pop(pk, None)
+        _cached['roles_generation'] += 1
+
+
+def invalidate_user_roles(user_pks=None):
+    """
+    Drop the cached roles of the users, or of every user, in this process
+    immediately and again once the current transaction commits
+    """
+    user_pks = None if user_pks is None else list(user_pks)
+    clear_user_roles(user_pks)
+    transaction.on_commit(lambda: clear_user_roles(user_pks))
+
+
+def clear_configuration_cache():
+    """Drop this process's copy of the Configuration"""
+    with _lock:
+        _cached.update(loaded=False, configuration=None, version=None,
+                       generation=_cached['generation'] + 1,
+                       roles=OrderedDict())
+
+
+def invalidate_configuration():
+    """
+    Drop the cached Configuration in this process immediately and in every
+    other process once the current transaction commits
+    """
+    clear_configuration_cache()
+
+    def bump_version():
+        cache.set(CONFIGURATION_VERSION_KEY, new_configuration_stamp(),
+                  timeout=None)
+        clear_configuration_cache()
+
+    transaction.on_commit(bump_version)
@@ -10,19 +10,38 @@ from configuration.models import (AdminConfiguration,
                                   UIConfiguration)
 from configuration.serializers import (ConfigurationSerializer,
                                        UIConfigurationSerializer)
+from configuration.utils.cache_utils import (get_configuration_stamp,
+                                             get_user_group_ids)
+from portal.mixins import ConditionalGetMixin
 
 logger = logging.getLogger(__name__)
 
 # Create your views here.
 
 
-class ConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
+class ConfigurationViewSet(ConditionalGetMixin,
+                           viewsets.ReadOnlyModelViewSet):
     """
     Retrieve configuration information
     """
     queryset = Configuration.objects.all()
     serializer_class = ConfigurationSerializer
     filter_backends = [filters.ObjectPermissionsFilter]
+    # fields and admins depend on the user's groups and permissions
+    vary_on_user = True
+
+    def get_version_stamp(self):
+        return get_configuration_stamp()
+
+    def get_etag(self, request, stamp):
+        """
+        Fold the user's groups into the ETag, their roles and group
+        permissions change with their membership without a new version
+        """
+        group_ids = ','.join(map(str, sorted(get_user_group_ids(
+            request.user))))
+        return super().get_etag(
+            request, dict(stamp, version=f"{stamp['version']}:{group_ids}"))
 
     def get_queryset(self):
         """Restrict access to Admin Configurations"""
@@ -34,13 +53,17 @@ class ConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
                          self)))
 
 
-class UIConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
+class UIConfigurationViewSet(ConditionalGetMixin,
+                             viewsets.ReadOnlyModelViewSet):
     """
     Retrieve UI configuration information
     """
     queryset = UIConfiguration.objects.all()
     serializer_class = UIConfigurationSerializer
 
+    def get_version_stamp(self):
+        return get_configuration_stamp()
+
     def list(self, request, *args, **kwargs):
         config = self.get_queryset().first()
         serializer = self.get_serializer(config)
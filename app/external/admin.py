@@ -1,16 +1,25 @@
 from django.contrib import admin
 
-from external.models import Course, Job, LearnerRecord
+from external.models import (Course, CourseMetadata, Job, JobKsa,
+                             LearnerRecord)
 
 # Register your models here.
 
 
+class JobKsaInline(admin.TabularInline):
+    model = JobKsa
+    extra = 0
+    raw_id_fields = ('ksa',)
+    fields = ('ksa', 'required_level', 'weight',)
+
+
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ('name', 'job_type', 'reference')
     list_filter = ("job_type",)
     readonly_fields = ('modified', 'created',)
     date_hierarchy = 'modified'
+    inlines = [JobKsaInline,]
 
     fieldsets = (
         (
@@ -44,11 +53,22 @@ class JobAdmin(admin.ModelAdmin):
     )
 
 
+class CourseMetadataInline(admin.StackedInline):
+    model = CourseMetadata
+    can_delete = False
+    readonly_fields = ('metadata', 'metadata_hash', 'modified',)
+    fields = ('metadata', 'metadata_hash', 'modified',)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     list_display = ('name', 'reference',)
     readonly_fields = ('modified', 'created',)
     date_hierarchy = 'modified'
+    inlines = [CourseMetadataInline]
 
     fieldsets = (
         (
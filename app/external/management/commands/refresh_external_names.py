@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from external.utils.refresh_utils import (REFRESH_LIMIT, REFRESH_TARGETS,
+                                          REFRESH_WORKERS,
+                                          SERVICE_RATE_LIMITS,
+                                          refresh_external_names)
+
+
+class Command(BaseCommand):
+    """
+    Re-validate the stalest external Course, Competency, Ksa and Job names
+    against XDS and ECCR
+    """
+    help = 'Refresh the stalest names of the external catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', action='append', choices=list(REFRESH_TARGETS),
+            dest='targets',
+            help='Model to refresh, may be repeated (defaults to all)')
+        parser.add_argument(
+            '--limit', type=int, default=REFRESH_LIMIT,
+            help='Number of rows to refresh per model')
+        parser.add_argument(
+            '--workers', type=int, default=REFRESH_WORKERS,
+            help='Number of concurrent requests per model')
+        parser.add_argument(
+            '--xds-rate', type=float, default=SERVICE_RATE_LIMITS['xds'],
+            help='Maximum XDS requests per second')
+        parser.add_argument(
+            '--eccr-rate', type=float, default=SERVICE_RATE_LIMITS['eccr'],
+            help='Maximum ECCR requests per second')
+
+    def handle(self, *args, **options):
+        if options['limit'] < 1 or options['workers'] < 1:
+            raise CommandError('--limit and --workers must be positive')
+
+        results = refresh_external_names(
+            targets=options['targets'],
+            limit=options['limit'],
+            max_workers=options['workers'],
+            rate_limits={'xds': options['xds_rate'],
+                         'eccr': options['eccr_rate']})
+
+        for target, count in results.items():
+            self.stdout.write(f'Refreshed {count} {target} names')
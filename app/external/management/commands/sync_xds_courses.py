@@ -0,0 +1,48 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from external.utils.xds_utils import (COURSE_BATCH_SIZE, import_xds_export,
+                                      sync_xds_courses)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Refresh the local Course catalog from the XDS experiences API or from
+    an XDS metadata export file
+    """
+    help = 'Page through XDS experiences and upsert the Course catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=COURSE_BATCH_SIZE,
+            help='Number of courses written per upsert statement')
+        parser.add_argument(
+            '--file', dest='export_file',
+            help='Import a JSON XDS metadata export instead of calling the '
+            'XDS API, the file is streamed so it can be arbitrarily large')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        def report(total):
+            self.stdout.write(f'Synced {total} courses')
+
+        try:
+            if options['export_file']:
+                with open(options['export_file'], encoding='utf-8') as fp:
+                    total = import_xds_export(fp, batch_size=batch_size,
+                                              progress=report)
+            else:
+                total = sync_xds_courses(batch_size=batch_size,
+                                         progress=report)
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.error(f'XDS course sync failed: {e}')
+            raise CommandError(f'XDS course sync failed: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Finished syncing {total} courses from XDS'))
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:07
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('external', '0006_competency_ksa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseMetadata',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='xds_metadata', serialize=False, to='external.course')),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('metadata_hash', models.CharField(help_text='SHA-256 digest of the stored metadata, used to skip rewriting unchanged records', max_length=64)),
+            ],
+            options={
+                'verbose_name_plural': 'course metadata',
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['metadata'], name='course_metadata_gin')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:57
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('external', '0007_coursemetadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobKsa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('required_level', models.PositiveSmallIntegerField(choices=[(1, 'Basic'), (2, 'Intermediate'), (3, 'Advanced'), (4, 'Expert')], default=2, help_text='Proficiency expected from a candidate')),
+                ('weight', models.PositiveSmallIntegerField(default=1, help_text='Importance of the KSA relative to the other KSAs of the job', validators=[django.core.validators.MinValueValidator(1)])),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ksa_requirements', to='external.job')),
+                ('ksa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_requirements', to='external.ksa')),
+            ],
+            options={
+                'verbose_name': 'job KSA',
+                'verbose_name_plural': 'job KSAs',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='jobksa',
+            constraint=models.UniqueConstraint(fields=('job', 'ksa'), name='unique_job_ksa'),
+        ),
+    ]
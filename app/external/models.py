@@ -1,4 +1,5 @@
-from django.core.validators import RegexValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
 from django.urls import reverse
 from model_utils.models import TimeStampedModel
@@ -26,6 +27,27 @@ class Course(TimeStampedModel):
         return reverse("courses-detail", kwargs={"pk": self.pk})
 
 
+class CourseMetadata(TimeStampedModel):
+    """Model to store the full P2881 metadata of an XDS course"""
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, primary_key=True,
+        related_name='xds_metadata')
+    metadata = models.JSONField(default=dict, blank=True)
+    metadata_hash = models.CharField(
+        max_length=64,
+        help_text='SHA-256 digest of the stored metadata, used to skip '
+        'rewriting unchanged records')
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['metadata'], name='course_metadata_gin'),
+        ]
+        verbose_name_plural = 'course metadata'
+
+    def __str__(self):
+        return f'{self.course_id}'
+
+
 class LearnerRecord(TimeStampedModel):
     name = models.CharField(max_length=255, blank=True, validators=[
         RegexValidator(regex=REGEX_CHECK, message=REGEX_ERROR_MESSAGE),
@@ -91,3 +113,35 @@ class Ksa(TimeStampedModel):
 
     def get_absolute_url(self):
         return reverse("ksas-detail", kwargs={"pk": self.pk})
+
+
+class JobKsa(TimeStampedModel):
+    """KSA required by a job, used to recommend candidates for it"""
+    LEVEL_CHOICES = [
+        (1, 'Basic'),
+        (2, 'Intermediate'),
+        (3, 'Advanced'),
+        (4, 'Expert'),
+    ]
+    job = models.ForeignKey(
+        Job, on_delete=models.CASCADE, related_name='ksa_requirements')
+    ksa = models.ForeignKey(
+        Ksa, on_delete=models.CASCADE, related_name='job_requirements')
+    required_level = models.PositiveSmallIntegerField(
+        choices=LEVEL_CHOICES, default=2,
+        help_text='Proficiency expected from a candidate')
+    weight = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)],
+        help_text='Importance of the KSA relative to the other KSAs of the '
+        'job')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'ksa'],
+                                    name='unique_job_ksa')
+        ]
+        verbose_name = 'job KSA'
+        verbose_name_plural = 'job KSAs'
+
+    def __str__(self):
+        return f'{self.ksa} for {self.job}'
@@ -23,6 +23,14 @@ class CourseSerializer(serializers.ModelSerializer):
         return super().validate(attrs)
 
 
+class CourseDetailSerializer(CourseSerializer):
+    metadata = serializers.JSONField(
+        source='xds_metadata.metadata', read_only=True, default=None)
+
+    class Meta(CourseSerializer.Meta):
+        fields = CourseSerializer.Meta.fields + ['metadata',]
+
+
 class JobSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import tag
+
+from external.models import Course
+
+from .test_setup import TestSetUp
+
+
+@tag('unit')
+class CommandTests(TestSetUp):
+
+    def test_sync_xds_courses(self):
+        """Test that the command syncs courses and reports progress"""
+        out = StringIO()
+        with patch('external.management.commands.sync_xds_courses.'
+                   'sync_xds_courses') as sync:
+            sync.side_effect = lambda batch_size, progress: progress(7) or 7
+            call_command('sync_xds_courses', '--batch-size', '50',
+                         stdout=out)
+
+            self.assertEqual(sync.call_args[1]['batch_size'], 50)
+        self.assertIn('Synced 7 courses', out.getvalue())
+        self.assertIn('Finished syncing 7 courses', out.getvalue())
+
+    def test_sync_xds_courses_error(self):
+        """Test that the command surfaces XDS errors"""
+        with patch('external.management.commands.sync_xds_courses.'
+                   'sync_xds_courses') as sync:
+            sync.side_effect = ConnectionError('down')
+
+            self.assertRaises(CommandError, call_command,
+                              'sync_xds_courses', stdout=StringIO())
+
+    def test_sync_xds_courses_bad_batch_size(self):
+        """Test that the command rejects invalid batch sizes"""
+        self.assertRaises(CommandError, call_command, 'sync_xds_courses',
+                          '--batch-size', '0', stdout=StringIO())
+
+    def test_sync_xds_courses_from_file(self):
+        """Test that the command imports an XDS export file"""
+        records = [{"metadata": {"Metadata_Ledger": {
+                    "p2881-core": {"Title": "title"}}},
+                    "unique_record_identifier": "id",
+                    "metadata_key_hash": "hash"}]
+        with tempfile.NamedTemporaryFile('w', suffix='.json',
+                                         delete=False) as fp:
+            json.dump(records, fp)
+        self.addCleanup(os.remove, fp.name)
+        out = StringIO()
+
+        call_command('sync_xds_courses', '--file', fp.name, stdout=out)
+
+        self.assertEqual(Course.objects.get(reference="hash").name, "title")
+        self.assertIn('Finished syncing 1 courses', out.getvalue())
+
+    def test_refresh_external_names(self):
+        """Test that the command refreshes names and reports counts"""
+        out = StringIO()
+        with patch('external.management.commands.refresh_external_names.'
+                   'refresh_external_names') as refresh:
+            refresh.return_value = {'course': 3, 'ksa': 1}
+            call_command('refresh_external_names', '--model', 'course',
+                         '--model', 'ksa', '--limit', '10', '--xds-rate',
+                         '2', stdout=out)
+
+            kwargs = refresh.call_args[1]
+            self.assertEqual(kwargs['targets'], ['course', 'ksa'])
+            self.assertEqual(kwargs['limit'], 10)
+            self.assertEqual(kwargs['rate_limits']['xds'], 2.0)
+        self.assertIn('Refreshed 3 course names', out.getvalue())
+        self.assertIn('Refreshed 1 ksa names', out.getvalue())
+
+    def test_refresh_external_names_bad_limit(self):
+        """Test that the command rejects invalid limits"""
+        self.assertRaises(CommandError, call_command,
+                          'refresh_external_names', '--limit', '0',
+                          stdout=StringIO())
@@ -1,6 +1,6 @@
 from django.test import tag
 
-from external.models import Course, Job, LearnerRecord
+from external.models import Course, CourseMetadata, Job, LearnerRecord
 
 from .test_setup import TestSetUp
 
@@ -42,6 +42,23 @@ class ModelTests(TestSetUp):
         self.assertEqual(course.reference, reference)
         self.assertEqual(Course.objects.all().count(), 1)
 
+    def test_course_metadata(self):
+        """Test that creating Course Metadata is successful"""
+        course = Course.objects.create(name="course_name",
+                                       reference="course_ref")
+        metadata = {"p2881-core": {"Title": "course_name"}}
+
+        course_metadata = CourseMetadata(course=course, metadata=metadata,
+                                         metadata_hash="abc")
+        course_metadata.full_clean()
+        course_metadata.save()
+
+        self.assertEqual(course.xds_metadata.metadata, metadata)
+        self.assertEqual(str(course_metadata), course.reference)
+        self.assertTrue(CourseMetadata.objects.filter(
+            metadata__contains={"p2881-core": {"Title": "course_name"}}
+        ).exists())
+
     def test_job(self):
         """Test that creating a Job is successful"""
         name = "job_name"
@@ -1,12 +1,13 @@
+import io
 import json
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from dateutil.relativedelta import relativedelta
 from django.test import tag
 from django.utils import timezone
 
 from configuration.models import Configuration
-from external.models import Course
+from external.models import Competency, Course, CourseMetadata, Ksa
 from external.utils.eccr_utils import (get_eccr_data_api_url, get_eccr_item,
                                        get_eccr_search_api_url,
                                        validate_eccr_item)
@@ -23,16 +24,28 @@ from external.utils.elrr_utils import (TokenAuth as ElrrTokenAuth,
                                        remove_course_from_elrr_goal,
                                        remove_goal_from_elrr,
                                        remove_ksa_from_elrr_goal,
+                                       store_goal_tree_to_elrr,
                                        update_elrr_goal,
                                        validate_elrr_competency,
                                        validate_elrr_goal,
                                        validate_elrr_learning_resource,
                                        validate_person)
+from external.utils.refresh_utils import (RateLimiter,
+                                          refresh_external_names,
+                                          refresh_stale_names)
 from external.utils.xds_utils import (TokenAuth, format_metadata,
                                       get_course_name, get_courses_api_url,
+                                      get_experiences_api_url,
+                                      get_record_course_name,
                                       get_xds_experience,
                                       handle_unauthenticated_user,
-                                      metadata_to_target, save_courses,
+                                      hash_metadata, import_xds_export,
+                                      iter_json_array, iter_json_page,
+                                      iter_metadata_to_target,
+                                      iter_xds_experiences,
+                                      metadata_to_target,
+                                      save_course_metadata, save_courses,
+                                      sync_xds_courses, upsert_courses,
                                       validate_xds_course)
 
 from .test_setup import TestSetUp
@@ -105,6 +118,100 @@ class UtilsTests(TestSetUp):
 
         self.assertDictEqual(ret[0], expected[0])
 
+    def test_xds_iter_json_array(self):
+        """Test that util parses arrays split across arbitrary chunks"""
+        data = [{"a": "b,]}"}, [1, 2], 12345, "x", True, None]
+        text = json.dumps(data)
+
+        for size in (1, 2, 7, len(text)):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertEqual(list(iter_json_array(chunks)), data)
+        self.assertEqual(list(iter_json_array([text.encode()])), data)
+        self.assertEqual(list(iter_json_array(['{"a": 1}'])), [{"a": 1}])
+        self.assertEqual(list(iter_json_array(['  '])), [])
+
+    def test_xds_iter_json_array_invalid(self):
+        """Test that util raises an error on truncated documents"""
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['[{"a": 1}, {"b"']))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['[{"a": 1}']))
+
+    def test_xds_iter_json_page(self):
+        """Test that util streams the results of paginated documents"""
+        text = json.dumps({"count": 2, "results": [{"a": 1}, {"b": 2}],
+                           "next": "p2"})
+
+        for size in (1, 5, len(text)):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            page = {}
+            self.assertEqual(list(iter_json_page(chunks, page)),
+                             [{"a": 1}, {"b": 2}])
+            self.assertEqual(page, {"count": 2, "next": "p2"})
+
+        page = {}
+        self.assertEqual(list(iter_json_page(['{"a": 1}'], page)),
+                         [{"a": 1}])
+        self.assertEqual(page, {})
+        self.assertEqual(list(iter_json_page(['[1, 2]'], {})), [1, 2])
+        with self.assertRaises(ValueError):
+            list(iter_json_page(['{"results": [1, 2'], {}))
+
+    def test_xds_iter_metadata_to_target(self):
+        """Test that util lazily reformats streamed metadata"""
+        expected = {"key": "my ledger",
+                    "Supplemental_Ledger": None,
+                    "meta": {"id": "abc123",
+                             "metadata_key_hash": "shashasha"}}
+        course = {"metadata": {"Metadata_Ledger": {"key": "my ledger"}},
+                  "unique_record_identifier": "abc123",
+                  "metadata_key_hash": "shashasha"}
+        stream = io.StringIO(json.dumps([course, course]))
+
+        ret = iter_metadata_to_target(stream, chunk_size=5)
+
+        self.assertNotIsInstance(ret, list)
+        self.assertEqual(list(ret), [expected, expected])
+
+    def test_xds_import_export(self):
+        """Test that util upserts courses from a streamed export"""
+        records = [{"metadata": {"Metadata_Ledger": {
+                    "p2881-core": {"Title": f"title{i}"}}},
+                    "unique_record_identifier": f"id{i}",
+                    "metadata_key_hash": f"hash{i}"} for i in range(3)]
+        stream = io.StringIO(json.dumps(records))
+
+        ret = import_xds_export(stream, batch_size=2)
+
+        self.assertEqual(ret, 3)
+        self.assertEqual(Course.objects.get(reference="hash2").name,
+                         "title2")
+        self.assertEqual(
+            CourseMetadata.objects.get(course_id="hash2").metadata,
+            format_metadata(records[2]))
+
+    def test_xds_hash_metadata(self):
+        """Test that util hashes metadata independent of key order"""
+        self.assertEqual(hash_metadata({"a": 1, "b": [1, 2]}),
+                         hash_metadata({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(hash_metadata({"a": 1}), hash_metadata({"a": 2}))
+
+    def test_xds_save_course_metadata(self):
+        """Test that util only rewrites new or changed metadata"""
+        Course.objects.bulk_create([Course(reference="a"),
+                                    Course(reference="b")])
+        save_course_metadata({"a": {"v": 1}, "b": {"v": 1}})
+        modified = CourseMetadata.objects.get(course_id="a").modified
+
+        with self.assertNumQueries(2):
+            ret = save_course_metadata({"a": {"v": 1}, "b": {"v": 2}})
+
+        self.assertEqual(ret, 1)
+        self.assertEqual(CourseMetadata.objects.get(course_id="a").modified,
+                         modified)
+        self.assertEqual(CourseMetadata.objects.get(course_id="b").metadata,
+                         {"v": 2})
+
     def test_xds_get_courses_api_url(self):
         """Test that util gets api url"""
         xds_api = "https://example.com"
@@ -129,6 +236,126 @@ class UtilsTests(TestSetUp):
 
         self.assertEqual(Course.objects.all().count(), 2)
 
+    def test_xds_save_courses_refreshes_stale(self):
+        """Test that util only refreshes names of stale courses"""
+        Course.objects.create(reference="stale", name="old")
+        Course.objects.create(reference="fresh", name="old")
+        Course.objects.filter(reference="stale").update(
+            modified=timezone.now() - relativedelta(days=2))
+
+        save_courses([("stale", "new"), ("fresh", "new")])
+
+        self.assertEqual(Course.objects.get(reference="stale").name, "new")
+        self.assertEqual(Course.objects.get(reference="fresh").name, "old")
+
+    def test_xds_upsert_courses(self):
+        """Test that util inserts and updates courses in batches"""
+        Course.objects.create(reference="shashasha", name="old")
+        courses = [
+            ("shashasha", "title0"),
+            ("shashasha2", "title2"),
+            ("shashasha", "title3")
+        ]
+
+        with self.assertNumQueries(2):
+            ret = upsert_courses(courses, batch_size=2)
+
+        self.assertEqual(ret, 3)
+        self.assertEqual(Course.objects.all().count(), 2)
+        self.assertEqual(Course.objects.get(reference="shashasha").name,
+                         "title3")
+
+    def test_xds_upsert_courses_keeps_names(self):
+        """Test that util does not blank names for nameless courses"""
+        Course.objects.create(reference="shashasha", name="old")
+        courses = [
+            ("shashasha", None),
+            ("shashasha2", None),
+            ("shashasha3", "title3"),
+            ("shashasha3", None)
+        ]
+
+        ret = upsert_courses(courses)
+
+        self.assertEqual(ret, 3)
+        self.assertEqual(Course.objects.get(reference="shashasha").name,
+                         "old")
+        self.assertEqual(Course.objects.get(reference="shashasha2").name,
+                         "")
+        self.assertEqual(Course.objects.get(reference="shashasha3").name,
+                         "title3")
+
+    def test_xds_get_record_course_name(self):
+        """Test that util extracts course name from formatted records"""
+        self.assertEqual(
+            get_record_course_name({"p2881-core": {"Title": "abc"}}), "abc")
+        self.assertEqual(
+            get_record_course_name({"Course": {"CourseTitle": "xyz"}}),
+            "xyz")
+        self.assertIsNone(get_record_course_name({"key": "value"}))
+
+    def test_xds_iter_experiences_pages(self):
+        """Test that util follows paginated XDS responses"""
+        conf = Configuration(target_xds_api="https://example.com")
+        conf.save()
+        record = {"metadata": {"Metadata_Ledger": {
+                  "p2881-core": {"Title": "title"}}},
+                  "unique_record_identifier": "abc123",
+                  "metadata_key_hash": "shashasha"}
+        first, second = (MagicMock(status_code=200),
+                         MagicMock(status_code=200))
+        first.iter_content.return_value = [json.dumps(
+            {"next": "https://example.com/api/p2",
+             "results": [record]}).encode()]
+        second.iter_content.return_value = [json.dumps(
+            {"next": None, "results": [record]}).encode()]
+
+        with patch('external.utils.xds_utils.requests') as req:
+            req.get.side_effect = [first, second]
+            ret = list(iter_xds_experiences())
+
+            self.assertEqual(len(ret), 2)
+            self.assertEqual(req.get.call_count, 2)
+            self.assertEqual(req.get.call_args_list[0][0][0],
+                             get_experiences_api_url())
+            self.assertEqual(req.get.call_args_list[1][0][0],
+                             "https://example.com/api/p2")
+            self.assertTrue(req.get.call_args_list[0][1]['stream'])
+            first.json.assert_not_called()
+
+    def test_xds_iter_experiences_error(self):
+        """Test that util raises an error when XDS does not return 200"""
+        conf = Configuration(target_xds_api="https://example.com")
+        conf.save()
+        with patch('external.utils.xds_utils.requests') as req:
+            req.get.return_value = MagicMock(status_code=500)
+
+            self.assertRaises(ConnectionError, list, iter_xds_experiences())
+
+    def test_xds_sync_courses(self):
+        """Test that util upserts courses from XDS and reports progress"""
+        conf = Configuration(target_xds_api="https://example.com")
+        conf.save()
+        records = [{"metadata": {"Metadata_Ledger": {
+                    "p2881-core": {"Title": f"title{i}"}}},
+                    "unique_record_identifier": f"id{i}",
+                    "metadata_key_hash": f"hash{i}"} for i in range(5)]
+        records.append({"metadata": {}})
+        text = json.dumps(records)
+        resp = MagicMock(status_code=200)
+        resp.iter_content.return_value = [text[i:i + 50]
+                                          for i in range(0, len(text), 50)]
+        progress = Mock()
+
+        with patch('external.utils.xds_utils.requests') as req:
+            req.get.return_value = resp
+            ret = sync_xds_courses(batch_size=2, progress=progress)
+
+        self.assertEqual(ret, 5)
+        self.assertEqual(progress.call_count, 3)
+        self.assertEqual(Course.objects.get(reference="hash4").name,
+                         "title4")
+
     def test_eccr_get_eccr_search_api_url(self):
         """Test that util gets eccr search api url"""
         eccr_api = "https://example.com"
@@ -756,3 +983,98 @@ class UtilsTests(TestSetUp):
                 self.assertNotIn(lr_id, goal_data['learningResourceIds'])
                 get_mock.assert_called_once_with(goal_id)
                 update_mock.assert_called_once_with(goal_data)
+
+    def test_rate_limiter(self):
+        """Test that the rate limiter spaces out calls"""
+        limiter = RateLimiter(10)
+        with patch('external.utils.refresh_utils.time') as mock_time:
+            mock_time.monotonic.return_value = limiter.next_call
+            limiter.wait()
+            limiter.wait()
+
+            mock_time.sleep.assert_called_once()
+            self.assertAlmostEqual(mock_time.sleep.call_args[0][0], 0.1)
+
+    def test_refresh_stale_names(self):
+        """Test that util refreshes the stalest rows in bulk"""
+        Ksa.objects.bulk_create([Ksa(reference=f"ksa/{i}", name="old")
+                                 for i in range(3)])
+        Ksa.objects.filter(reference="ksa/2").update(
+            modified=timezone.now() + relativedelta(days=1))
+        names = {"ksa/0": "new", "ksa/1": None}
+        validate = Mock(side_effect=lambda ref: names[ref])
+
+        ret = refresh_stale_names(Ksa, validate, RateLimiter(0), limit=2)
+
+        self.assertEqual(ret, 2)
+        self.assertEqual(validate.call_count, 2)
+        self.assertEqual(Ksa.objects.get(reference="ksa/0").name, "new")
+        self.assertEqual(Ksa.objects.get(reference="ksa/1").name, "old")
+        self.assertNotIn("ksa/2", [c[0][0] for c in validate.call_args_list])
+
+    def test_refresh_stale_names_errors(self):
+        """Test that util skips rows the service could not answer for"""
+        Competency.objects.bulk_create([
+            Competency(reference="missing", name="old"),
+            Competency(reference="down", name="old")])
+        errors = {"missing": ValueError("404"), "down": ConnectionError()}
+        validate = Mock(side_effect=lambda ref: (_ for _ in ()).throw(
+            errors[ref]))
+        before = Competency.objects.get(reference="down").modified
+
+        ret = refresh_stale_names(Competency, validate, RateLimiter(0))
+
+        self.assertEqual(ret, 1)
+        self.assertEqual(Competency.objects.get(reference="down").modified,
+                         before)
+        self.assertGreater(
+            Competency.objects.get(reference="missing").modified, before)
+
+    def test_refresh_external_names(self):
+        """Test that util refreshes the requested models"""
+        Course.objects.create(reference="course", name="old")
+        validate = Mock(return_value="new")
+        targets = {'course': (Course, 'xds', validate)}
+
+        with patch.dict('external.utils.refresh_utils.REFRESH_TARGETS',
+                        targets, clear=True):
+            ret = refresh_external_names(rate_limits={'xds': 0})
+
+        self.assertEqual(ret, {'course': 1})
+        self.assertEqual(Course.objects.get(reference="course").name, "new")
+
+    def test_store_goal_tree_to_elrr(self):
+        """Test that a goal tree is stored with one person lookup, one
+        lookup per distinct KSA and course and one create per goal"""
+        ksa = Ksa(reference="ksa/1", name="KSA")
+        course = Course(reference="course/1", name="Course")
+        goals = [Mock(id=i, goal_name=f"Goal {i}", created=timezone.now(),
+                      timeline=3) for i in range(2)]
+        goal_tree = [(goal, [Mock(eccr_ksa=ksa)], [Mock(xds_course=course)])
+                     for goal in goals]
+
+        with patch('external.utils.elrr_utils.'
+                   'get_or_create_elrr_person_by_email',
+                   return_value="person") as mock_person, \
+                patch('external.utils.elrr_utils.'
+                      'get_or_create_elrr_competency',
+                      return_value={'id': "competency"}) as mock_competency, \
+                patch('external.utils.elrr_utils.'
+                      'get_or_create_elrr_learning_resource',
+                      return_value={'id': "resource"}) as mock_resource, \
+                patch('external.utils.elrr_utils.create_elrr_goal',
+                      side_effect=[{'id': "goal0"}, {'id': "goal1"}]) \
+                as mock_create:
+            store_goal_tree_to_elrr(self.auth_user, goal_tree)
+
+        mock_person.assert_called_once_with(self.auth_user)
+        mock_competency.assert_called_once_with("ksa/1", "KSA")
+        mock_resource.assert_called_once_with("course/1", "Course")
+        goal_data = mock_create.call_args_list[0].args[0]
+        self.assertEqual(goal_data['personId'], "person")
+        self.assertEqual(goal_data['competencyIds'], ["competency"])
+        self.assertEqual(goal_data['learningResourceIds'], ["resource"])
+        self.assertEqual([goal.elrr_goal_id for goal in goals],
+                         ["goal0", "goal1"])
+        self.assertEqual(goal_tree[1][1][0].elrr_ksa_id, "competency")
+        self.assertEqual(goal_tree[1][2][0].elrr_course_id, "resource")
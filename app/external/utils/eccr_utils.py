@@ -1,13 +1,12 @@
 import requests
 from requests.auth import AuthBase
 
-from configuration.models import Configuration
+from configuration.utils.cache_utils import get_configuration
 
 
 def get_eccr_search_api_url():
     """This method gets the ECCR search api url to query for records"""
-    eccr_api = Configuration.objects.first()\
-        .target_eccr_api
+    eccr_api = get_configuration().target_eccr_api
     if eccr_api[-1] != '/':
         eccr_api += '/'
     if not eccr_api.endswith('api/'):
@@ -19,8 +18,7 @@ def get_eccr_search_api_url():
 
 def get_eccr_data_api_url():
     """This method gets the ECCR data api url to retrieve specific records"""
-    eccr_api = Configuration.objects.first()\
-        .target_eccr_api
+    eccr_api = get_configuration().target_eccr_api
     if eccr_api[-1] != '/':
         eccr_api += '/'
     if not eccr_api.endswith('api/'):
@@ -4,7 +4,7 @@ from dateutil.relativedelta import relativedelta
 from requests.auth import AuthBase
 from requests.exceptions import RequestException
 
-from configuration.models import Configuration
+from configuration.utils.cache_utils import get_configuration
 from external.utils.eccr_utils import get_eccr_data_api_url
 
 logger = logging.getLogger(__name__)
@@ -12,8 +12,7 @@ logger = logging.getLogger(__name__)
 
 def get_elrr_api_url():
     """This method gets the elrr root api url"""
-    elrr_api_url = Configuration.objects.first()\
-        .target_elrr_api
+    elrr_api_url = get_configuration().target_elrr_api
     if elrr_api_url[-1] != '/':
         elrr_api_url += '/'
     if not elrr_api_url.endswith('api/'):
@@ -27,7 +26,7 @@ class TokenAuth(AuthBase):
 
     def __init__(self, token=None):
         if token is None:
-            token = Configuration.objects.first().target_elrr_api_key
+            token = get_configuration().target_elrr_api_key
         super().__init__()
         self.token = token
 
@@ -649,3 +648,49 @@ def remove_course_from_elrr_goal(elrr_goal_id, elrr_learning_resource_id):
         learning_resource_ids.remove(elrr_learning_resource_id)
         goal_data['learningResourceIds'] = learning_resource_ids
         update_elrr_goal(goal_data)
+
+
+def store_goal_tree_to_elrr(learner, goal_tree):
+    """
+    Create ELRR goals for new learning plan goals with their KSAs and
+    courses already attached, looking up the ELRR person once and each
+    distinct KSA and course once
+
+    Args:
+        learner: Portal learner instance
+        goal_tree: list of (LearningPlanGoal, KSA list, Course list)
+            tuples, the KSAs and courses being LearningPlanGoalKsa and
+            LearningPlanGoalCourse instances
+
+    Sets elrr_goal_id, elrr_ksa_id and elrr_course_id on the instances
+    without saving them
+    """
+    if not goal_tree:
+        return
+
+    person_id = get_or_create_elrr_person_by_email(learner)
+    competency_ids = {}
+    learning_resource_ids = {}
+
+    for goal, ksas, courses in goal_tree:
+        for ksa in ksas:
+            reference = ksa.eccr_ksa.reference
+            if reference not in competency_ids:
+                competency_ids[reference] = get_or_create_elrr_competency(
+                    reference, ksa.eccr_ksa.name).get('id')
+            ksa.elrr_ksa_id = competency_ids[reference]
+
+        for course in courses:
+            reference = course.xds_course.reference
+            if reference not in learning_resource_ids:
+                learning_resource_ids[reference] = \
+                    get_or_create_elrr_learning_resource(
+                        reference, course.xds_course.name).get('id')
+            course.elrr_course_id = learning_resource_ids[reference]
+
+        goal_data = build_goal_data_for_elrr(goal, person_id)
+        goal_data['competencyIds'] = list(dict.fromkeys(
+            ksa.elrr_ksa_id for ksa in ksas))
+        goal_data['learningResourceIds'] = list(dict.fromkeys(
+            course.elrr_course_id for course in courses))
+        goal.elrr_goal_id = create_elrr_goal(goal_data)['id']
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.utils import timezone
+from requests.exceptions import RequestException
+
+from configuration.utils.cache_utils import get_configuration
+from external.models import Competency, Course, Job, Ksa
+from external.utils.eccr_utils import validate_eccr_item
+from external.utils.xds_utils import validate_xds_course
+
+logger = logging.getLogger(__name__)
+
+NAME_LENGTH = 255
+REFRESH_LIMIT = 100
+REFRESH_WORKERS = 4
+# default requests per second allowed against each service
+SERVICE_RATE_LIMITS = {
+    'xds': 5.0,
+    'eccr': 5.0,
+}
+# model, service and validation function used to refresh each model
+REFRESH_TARGETS = {
+    'course': (Course, 'xds', validate_xds_course),
+    'competency': (Competency, 'eccr', validate_eccr_item),
+    'ksa': (Ksa, 'eccr', validate_eccr_item),
+    'job': (Job, 'eccr', validate_eccr_item),
+}
+
+
+class RateLimiter:
+    """Thread safe limiter spacing calls to a service at a fixed rate"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_call = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next call is allowed"""
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _validate_reference(validate, reference, limiter):
+    """
+    Validate a reference from a worker thread, respecting the service rate
+    limit and releasing the thread's database connection afterwards
+    """
+    try:
+        limiter.wait()
+        return validate(reference)
+    finally:
+        connection.close()
+
+
+def refresh_stale_names(model, validate, limiter, limit=REFRESH_LIMIT,
+                        max_workers=REFRESH_WORKERS):
+    """
+    Re-validate the stalest rows of an external model concurrently and
+    store the refreshed names with a single bulk_update
+
+    Args:
+        model (Model): the external model to refresh
+        validate (callable): returns the current name for a reference
+        limiter (RateLimiter): the rate limiter of the backing service
+        limit (int): the number of rows to refresh
+        max_workers (int): the number of concurrent requests
+
+    Returns:
+        int: the number of rows refreshed
+    """
+    rows = list(model.objects.order_by('modified')[:limit])
+    if not rows:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [(row, pool.submit(_validate_reference, validate,
+                                     row.reference, limiter))
+                   for row in rows]
+
+        now = timezone.now()
+        refreshed = []
+        for row, future in futures:
+            try:
+                name = future.result()
+            except ValueError as e:
+                # the service answered, move the row to the back of the queue
+                logger.warning(
+                    f'Could not refresh {model.__name__} {row.reference}: {e}')
+                name = None
+            except (ConnectionError, RequestException) as e:
+                logger.error(
+                    f'Could not refresh {model.__name__} {row.reference}: {e}')
+                continue
+
+            if name:
+                row.name = name[:NAME_LENGTH]
+            row.modified = now
+            refreshed.append(row)
+
+    model.objects.bulk_update(refreshed, ['name', 'modified'])
+    return len(refreshed)
+
+
+def refresh_external_names(targets=None, limit=REFRESH_LIMIT,
+                           max_workers=REFRESH_WORKERS, rate_limits=None):
+    """
+    Refresh the stalest names of each external model
+
+    Args:
+        targets (list): keys of REFRESH_TARGETS to refresh, defaults to all
+        limit (int): the number of rows to refresh per model
+        max_workers (int): the number of concurrent requests per model
+        rate_limits (dict): requests per second allowed for each service
+
+    Returns:
+        dict: the number of rows refreshed for each target
+    """
+    rates = {**SERVICE_RATE_LIMITS, **(rate_limits or {})}
+    limiters = {service: RateLimiter(rate) for service, rate in rates.items()}
+
+    # load the Configuration once so the worker threads share the cached copy
+    get_configuration()
+
+    results = {}
+    for target in targets or REFRESH_TARGETS:
+        model, service, validate = REFRESH_TARGETS[target]
+        results[target] = refresh_stale_names(
+            model, validate, limiters[service], limit=limit,
+            max_workers=max_workers)
+    return results
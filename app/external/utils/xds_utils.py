@@ -1,5 +1,8 @@
+import codecs
+import hashlib
 import json
 from datetime import timedelta
+from itertools import batched
 
 import requests
 from django.utils import timezone
@@ -7,8 +10,13 @@ from requests.auth import AuthBase
 from rest_framework import status
 from rest_framework.response import Response
 
-from configuration.models import Configuration
-from external.models import Course
+from configuration.utils.cache_utils import get_configuration
+from external.models import Course, CourseMetadata
+
+COURSE_NAME_LENGTH = 255
+COURSE_BATCH_SIZE = 1000
+XDS_PAGE_TIMEOUT = 30.0
+METADATA_CHUNK_SIZE = 64 * 1024
 
 
 def get_course_name(response):
@@ -29,6 +37,24 @@ def get_course_name(response):
     return None
 
 
+def get_record_course_name(record):
+    """
+    This method retrieves the course name from a formatted metadata record
+    or None if unable to find the course name
+
+    Args:
+        record (dict): a record returned by format_metadata
+
+    Returns:
+        String: [course name]
+    """
+    if 'p2881-core' in record and 'Title' in record['p2881-core']:
+        return record['p2881-core']['Title']
+    if 'Course' in record and 'CourseTitle' in record['Course']:
+        return record['Course']['CourseTitle']
+    return None
+
+
 def format_metadata(exp_record):
     """This method takes in a record and converts it to an XSE format"""
     result = None
@@ -72,16 +98,200 @@ def metadata_to_target(metadata_JSON):
     return result
 
 
-def get_courses_api_url(course_id):
-    """This method gets the metadata api url to fetch single records"""
-    composite_api_url = Configuration.objects.first()\
-        .target_xds_api
+class _JsonStream:
+    """
+    A cursor over a JSON document arriving as text or byte chunks, reading
+    further chunks only when the value at the cursor is incomplete
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.final = False
+
+    def _read(self):
+        """Append the next chunk, returns False once the input is exhausted"""
+        if self.final:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.final = True
+            chunk = self._utf8.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        # drop everything already parsed so memory stays bounded
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace, returns the next character or '' at the end"""
+        while True:
+            while self.position < len(self.buffer) and \
+                    self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read():
+                return ''
+
+    def expect(self, char):
+        """Consume char, raising an error if it is not the next character"""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self.buffer,
+                                       self.position)
+        self.position += 1
+
+    def value(self):
+        """Decode the complete value at the cursor"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer,
+                                                      self.position)
+            except json.JSONDecodeError:
+                if self.final:
+                    raise
+                # the value is incomplete, wait for the next chunk
+                self._read()
+                continue
+            if end == len(self.buffer) and not self.final and \
+                    not isinstance(value, (dict, list, str)):
+                # a trailing number or literal may continue in the next chunk
+                self._read()
+                continue
+            self.position = end
+            return value
+
+    def items(self):
+        """Yield each element of the array whose '[' was just consumed"""
+        if self.peek() == ']':
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            if char == ']':
+                self.position += 1
+                return
+            if not char:
+                raise json.JSONDecodeError('Unterminated array', self.buffer,
+                                           self.position)
+            self.expect(',')
+
+
+def iter_json_array(chunks):
+    """
+    This method incrementally parses a JSON document from an iterable of
+    text or byte chunks, yielding each element of a top level array (or
+    the top level value itself) as soon as it has been read
+
+    Args:
+        chunks (iterable): str or bytes chunks of the JSON document
+
+    Yields:
+        the decoded elements of the array
+    """
+    stream = _JsonStream(chunks)
+    char = stream.peek()
+    if char == '[':
+        stream.expect('[')
+        yield from stream.items()
+    elif char:
+        yield stream.value()
+
+
+def iter_json_page(chunks, page, key='results'):
+    """
+    This method incrementally parses a paginated JSON response, yielding
+    each element of the key array as soon as it has been read and storing
+    the other top level members in page. Objects without the key are
+    yielded whole and other documents are read as by iter_json_array
+
+    Args:
+        chunks (iterable): str or bytes chunks of the JSON document
+        page (dict): receives the members other than key, complete once
+            the generator is exhausted
+        key (str): the member holding the records
+
+    Yields:
+        the decoded elements of the key array
+    """
+    stream = _JsonStream(chunks)
+    char = stream.peek()
+    if char != '{':
+        if char == '[':
+            stream.expect('[')
+            yield from stream.items()
+        elif char:
+            yield stream.value()
+        return
+
+    stream.expect('{')
+    paginated = False
+    while stream.peek() != '}':
+        if page or paginated:
+            stream.expect(',')
+        name = stream.value()
+        stream.expect(':')
+        if name == key and stream.peek() == '[':
+            paginated = True
+            stream.expect('[')
+            yield from stream.items()
+        elif name == key:
+            paginated = True
+            yield stream.value()
+        else:
+            page[name] = stream.value()
+    stream.expect('}')
+
+    if not paginated:
+        record = dict(page)
+        page.clear()
+        yield record
+
+
+def iter_metadata_to_target(metadata_stream, chunk_size=METADATA_CHUNK_SIZE):
+    """
+    Streaming variant of metadata_to_target, this method reads a JSON
+    representation of records element by element and lazily transforms each
+    into the search engine format
+
+    Args:
+        metadata_stream (file or iterable): a file like object opened for
+            reading or an iterable of str or bytes chunks
+        chunk_size (int): the number of characters read at a time from files
+
+    Yields:
+        dict: each record formatted by format_metadata
+    """
+    if hasattr(metadata_stream, 'read'):
+        chunks = iter(lambda: metadata_stream.read(chunk_size), '')
+    else:
+        chunks = metadata_stream
+
+    for record in iter_json_array(chunks):
+        yield format_metadata(record)
+
+
+def get_experiences_api_url():
+    """This method gets the metadata api url to fetch lists of records"""
+    composite_api_url = get_configuration().target_xds_api
     if composite_api_url[-1] != '/':
         composite_api_url += '/'
     if not composite_api_url.endswith('api/'):
         composite_api_url += 'api/'
     composite_api_url += 'experiences/'
-    full_api_url = composite_api_url + course_id
+
+    return composite_api_url
+
+
+def get_courses_api_url(course_id):
+    """This method gets the metadata api url to fetch single records"""
+    full_api_url = get_experiences_api_url() + course_id
 
     return full_api_url
 
@@ -94,13 +304,259 @@ def save_courses(course_list):
         course_list (list): a list of tuples (metadata_key_hash, course_name)
     """
     time_difference = timedelta(days=1)
-    course_name_length = 255
+    courses = {}
     for course_hash, course_name in course_list:
-        experience, new = \
-            Course.objects.get_or_create(reference=course_hash)
-        if new or experience.modified < timezone.now() - time_difference:
-            experience.name = course_name[:course_name_length]
-            experience.save()
+        courses.setdefault(course_hash, course_name[:COURSE_NAME_LENGTH])
+    existing = Course.objects.in_bulk(list(courses))
+    stale_before = timezone.now() - time_difference
+
+    new_courses = [Course(reference=course_hash, name=course_name)
+                   for course_hash, course_name in courses.items()
+                   if course_hash not in existing]
+    stale_courses = []
+    for course_hash, experience in existing.items():
+        if experience.modified < stale_before:
+            experience.name = courses[course_hash]
+            experience.modified = timezone.now()
+            stale_courses.append(experience)
+
+    Course.objects.bulk_create(new_courses, ignore_conflicts=True)
+    Course.objects.bulk_update(stale_courses, ['name', 'modified'])
+
+
+def upsert_courses(course_list, batch_size=COURSE_BATCH_SIZE):
+    """
+    This method inserts or updates the name of every course in the list
+    using one INSERT ... ON CONFLICT statement per batch. Courses without
+    a name are inserted blank but never overwrite an existing name.
+
+    Args:
+        course_list (iterable): tuples (metadata_key_hash, course_name),
+            where course_name may be None
+        batch_size (int): the number of courses written per statement
+
+    Returns:
+        int: the number of distinct courses written
+    """
+    total = 0
+    for batch in batched(course_list, batch_size):
+        # a reference can only appear once per ON CONFLICT statement
+        courses = {}
+        for course_hash, course_name in batch:
+            if course_name is not None:
+                courses[course_hash] = course_name[:COURSE_NAME_LENGTH]
+            else:
+                courses.setdefault(course_hash, None)
+        now = timezone.now()
+        named = [Course(reference=course_hash, name=course_name,
+                        created=now, modified=now)
+                 for course_hash, course_name in courses.items()
+                 if course_name is not None]
+        nameless = [Course(reference=course_hash, name='',
+                           created=now, modified=now)
+                    for course_hash, course_name in courses.items()
+                    if course_name is None]
+        if named:
+            Course.objects.bulk_create(
+                named,
+                update_conflicts=True,
+                unique_fields=['reference'],
+                update_fields=['name', 'modified'])
+        if nameless:
+            Course.objects.bulk_create(nameless, ignore_conflicts=True)
+        total += len(courses)
+    return total
+
+
+def keyed_records(records):
+    """
+    This method pairs formatted metadata records with their
+    metadata_key_hash, skipping records without one
+
+    Args:
+        records (iterable): records returned by format_metadata
+
+    Yields:
+        tuple: (metadata_key_hash, record)
+    """
+    for record in records:
+        if not record or 'meta' not in record:
+            continue
+        course_hash = record['meta'].get('metadata_key_hash')
+        if not course_hash:
+            continue
+        yield course_hash, record
+
+
+def hash_metadata(metadata):
+    """
+    This method returns a stable SHA-256 digest of a metadata record
+
+    Args:
+        metadata (dict): the metadata record
+
+    Returns:
+        string: the hex digest
+    """
+    canonical = json.dumps(metadata, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def save_course_metadata(metadata_by_reference):
+    """
+    This method stores the full metadata of each course, only writing rows
+    that are new or whose content changed since the last refresh. The
+    courses must already exist.
+
+    Args:
+        metadata_by_reference (dict): metadata records keyed by the
+            metadata_key_hash of their course
+
+    Returns:
+        int: the number of metadata rows written
+    """
+    digests = {reference: hash_metadata(metadata)
+               for reference, metadata in metadata_by_reference.items()}
+    existing = dict(CourseMetadata.objects.filter(
+        course_id__in=list(digests)).values_list('course_id',
+                                                 'metadata_hash'))
+    now = timezone.now()
+
+    new_metadata = []
+    changed_metadata = []
+    for reference, digest in digests.items():
+        if existing.get(reference) == digest:
+            continue
+        row = CourseMetadata(course_id=reference,
+                             metadata=metadata_by_reference[reference],
+                             metadata_hash=digest,
+                             created=now, modified=now)
+        if reference in existing:
+            changed_metadata.append(row)
+        else:
+            new_metadata.append(row)
+
+    CourseMetadata.objects.bulk_create(new_metadata)
+    CourseMetadata.objects.bulk_update(
+        changed_metadata, ['metadata', 'metadata_hash', 'modified'])
+    return len(new_metadata) + len(changed_metadata)
+
+
+def get_xds_experiences(url=None, auth=None, stream=False):
+    """
+    Get a page of experiences from XDS
+
+    Args:
+        url (string): the page to retrieve, defaults to the first page
+        auth (requests.auth.AuthBase): the auth that should be used by the
+            request object
+        stream (bool): defer downloading the body until it is iterated
+
+    Returns:
+        requests.Response: [dictionary]
+    """
+    if url is None:
+        url = get_experiences_api_url()
+    if auth is not None:
+        return requests.get(url, auth=auth, timeout=XDS_PAGE_TIMEOUT,
+                            stream=stream)
+    else:
+        return requests.get(url, timeout=XDS_PAGE_TIMEOUT, stream=stream)
+
+
+def iter_xds_experiences(auth=None):
+    """
+    Page through the XDS experiences API, following the "next" link of
+    paginated responses
+
+    Args:
+        auth (requests.auth.AuthBase): the auth that should be used by the
+            request object
+
+    Yields:
+        dict: each record formatted by format_metadata
+    """
+    url = None
+    while True:
+        resp = get_xds_experiences(url, auth=auth, stream=True)
+        with resp:
+            if resp.status_code != 200:
+                raise ConnectionError(
+                    "XDS API error, check for more details."
+                )
+
+            # read the page incrementally rather than buffering the body
+            page = {}
+            for record in iter_json_page(
+                    resp.iter_content(METADATA_CHUNK_SIZE), page):
+                yield format_metadata(record)
+            url = page.get('next')
+
+        if not url:
+            break
+
+
+def sync_xds_courses(auth=None, batch_size=COURSE_BATCH_SIZE,
+                     progress=None):
+    """
+    Refresh the local Course catalog from XDS
+
+    Args:
+        auth (requests.auth.AuthBase): the auth that should be used by the
+            request object
+        batch_size (int): the number of courses written per statement
+        progress (callable): called with the running total after each batch
+
+    Returns:
+        int: the number of courses written
+    """
+    return upsert_records(iter_xds_experiences(auth=auth),
+                          batch_size=batch_size, progress=progress)
+
+
+def import_xds_export(metadata_stream, batch_size=COURSE_BATCH_SIZE,
+                      progress=None):
+    """
+    Refresh the local Course catalog from an XDS metadata export, reading
+    the export incrementally so memory use does not grow with its size
+
+    Args:
+        metadata_stream (file or iterable): the export to read, see
+            iter_metadata_to_target
+        batch_size (int): the number of courses written per statement
+        progress (callable): called with the running total after each batch
+
+    Returns:
+        int: the number of courses written
+    """
+    return upsert_records(iter_metadata_to_target(metadata_stream),
+                          batch_size=batch_size, progress=progress)
+
+
+def upsert_records(records, batch_size=COURSE_BATCH_SIZE, progress=None):
+    """
+    This method upserts the courses and their full metadata for a stream
+    of formatted records
+
+    Args:
+        records (iterable): records returned by format_metadata
+        batch_size (int): the number of courses written per statement
+        progress (callable): called with the running total after each batch
+
+    Returns:
+        int: the number of courses written
+    """
+    total = 0
+    for batch in batched(keyed_records(records), batch_size):
+        records_by_reference = dict(batch)
+        total += upsert_courses(
+            [(course_hash, get_record_course_name(record))
+             for course_hash, record in records_by_reference.items()],
+            batch_size=batch_size)
+        save_course_metadata(records_by_reference)
+        if progress is not None:
+            progress(total)
+    return total
 
 
 def handle_unauthenticated_user():
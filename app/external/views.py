@@ -4,7 +4,8 @@ from rest_framework import filters as filter
 from rest_framework import viewsets
 
 from external.models import Competency, Course, Job, Ksa, LearnerRecord
-from external.serializers import (CompetencySerializer, CourseSerializer,
+from external.serializers import (CompetencySerializer,
+                                  CourseDetailSerializer, CourseSerializer,
                                   JobSerializer,  KsaSerializer,
                                   LearnerRecordSerializer)
 
@@ -20,6 +21,17 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [filter.SearchFilter,]
     search_fields = ['reference',]
 
+    def get_queryset(self):
+        """Include the locally stored XDS metadata on detail requests"""
+        if self.action == 'retrieve':
+            return super().get_queryset().select_related('xds_metadata')
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return CourseDetailSerializer
+        return super().get_serializer_class()
+
 
 class JobViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -0,0 +1,153 @@
+import hashlib
+
+from django.utils.cache import (get_conditional_response, patch_vary_headers,
+                                quote_etag)
+from django.utils.http import http_date
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+class NotModified(Exception):
+    """Raised to answer a conditional request before the handler runs"""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag and Last-Modified headers to GET responses of read-mostly
+    viewsets and answer matching If-None-Match and If-Modified-Since
+    requests with a 304 once authentication and permission checks pass,
+    without calling the handler.
+
+    Viewsets implement get_version_stamp() and set vary_on_user when the
+    response depends on the requesting user.
+    """
+    vary_on_user = False
+
+    def get_version_stamp(self):
+        """
+        Return a dict with the 'version' of the data served by the viewset
+        and the 'modified' datetime it was last changed
+        """
+        raise NotImplementedError(
+            'ConditionalGetMixin requires get_version_stamp()')
+
+    def get_etag(self, request, stamp):
+        """Return the quoted ETag of the response for this request"""
+        parts = [stamp['version'], request.get_full_path()]
+        if self.vary_on_user:
+            parts.append(str(request.user.pk))
+        digest = hashlib.md5(':'.join(parts).encode(),
+                             usedforsecurity=False).hexdigest()
+        return quote_etag(digest)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        self.last_modified = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        stamp = self.get_version_stamp()
+        self.etag = self.get_etag(request, stamp)
+        self.last_modified = int(stamp['modified'].timestamp())
+        response = get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args,
+                                             **kwargs)
+        if getattr(self, 'etag', None) and \
+                response.status_code in (200, 304):
+            response.headers['ETag'] = self.etag
+            response.headers['Last-Modified'] = http_date(self.last_modified)
+            if self.vary_on_user:
+                patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+
+def get_sparse_fieldset(request, field_names, expandable_fields):
+    """
+    Return the names of the fields to render for the ?fields= and ?expand=
+    parameters of a read request, or None when it renders every field.
+
+    ?fields= keeps only the listed fields. ?expand= names the nested
+    collections to embed, leaving the other ones out.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = request.query_params
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return None
+
+    def listed(param):
+        return {name.strip() for name in params.get(param, '').split(',')}
+
+    expanded = listed(EXPAND_PARAM) & set(expandable_fields)
+    if FIELDS_PARAM in params:
+        return (listed(FIELDS_PARAM) & set(field_names)) | expanded
+    return set(field_names).difference(expandable_fields) | expanded
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Render only the fields a read request asks for with ?fields= and
+    ?expand=, see get_sparse_fieldset(). Serializers list their nested
+    collections in expandable_fields.
+    """
+    expandable_fields = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            # nested serializers always render in full
+            return fields
+
+        fieldset = get_sparse_fieldset(self.context.get('request'), fields,
+                                       self.expandable_fields)
+        if fieldset is None:
+            return fields
+        return {name: field for name, field in fields.items()
+                if name in fieldset}
+
+
+class SparseFieldsetViewMixin:
+    """
+    Prefetch only the nested collections a read request renders with
+    ?fields= and ?expand=. Viewsets map each expandable field of their
+    serializer to its prefetch lookups in sparse_prefetches, which must
+    cover every prefetch of their queryset.
+    """
+    sparse_prefetches = {}
+
+    def get_sparse_fieldset(self):
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, SparseFieldsetSerializerMixin):
+            return None
+        return get_sparse_fieldset(self.request, serializer_class.Meta.fields,
+                                   serializer_class.expandable_fields)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is None:
+            return queryset
+        return queryset.prefetch_related(None).prefetch_related(
+            *[lookup for field, lookups in self.sparse_prefetches.items()
+              if field in fieldset for lookup in lookups])
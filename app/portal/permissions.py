@@ -1,9 +1,46 @@
+from django.http import Http404
+from guardian.core import ObjectPermissionChecker
 from rest_framework import permissions
 
 
+def get_permission_checker(request):
+    """
+    Return the guardian ObjectPermissionChecker of the user of request,
+    created once per request so that all the object permission checks of
+    the request share its cache. Permissions given later in the request are
+    not seen on objects already checked.
+    """
+    http_request = getattr(request, '_request', request)
+    user = request.user
+    cached = getattr(http_request, '_permission_checker', None)
+    if cached is None or cached[0] is not user:
+        cached = http_request._permission_checker = (
+            user, ObjectPermissionChecker(user))
+    return cached[1]
+
+
+def prefetch_object_perms(request, objects):
+    """
+    Load the permissions of the user of request on all of objects, which
+    must be of one model, with one query per object permission table
+    """
+    objects = list(objects)
+    user = request.user
+    # the checker answers for inactive users and superusers without them
+    if objects and user.is_active and not user.is_superuser:
+        get_permission_checker(request).prefetch_perms(objects)
+
+
+def has_object_perm(request, perm, obj):
+    """Check that the user of request has perm on obj, e.g.
+    'api.change_application'"""
+    return get_permission_checker(request).has_perm(perm, obj)
+
+
 class CustomObjectPermissions(permissions.DjangoObjectPermissions):
     """
     Similar to `DjangoObjectPermissions`, but adding 'view' permissions.
+    Object permissions are checked with the checker of the request.
     """
     VIEW_PERMS = '%(app_label)s.view_%(model_name)s'
 
@@ -16,3 +53,21 @@ class CustomObjectPermissions(permissions.DjangoObjectPermissions):
         'PATCH': ['%(app_label)s.change_%(model_name)s'],
         'DELETE': ['%(app_label)s.delete_%(model_name)s'],
     }
+
+    def has_object_perms(self, request, perms, obj):
+        return all(has_object_perm(request, perm, obj) for perm in perms)
+
+    def has_object_permission(self, request, view, obj):
+        model_cls = self._queryset(view).model
+        perms = self.get_required_object_permissions(request.method,
+                                                     model_cls)
+        if not self.has_object_perms(request, perms, obj):
+            # users who cannot read the object get a 404 rather than a 403
+            if request.method in permissions.SAFE_METHODS:
+                raise Http404
+            read_perms = self.get_required_object_permissions('GET',
+                                                              model_cls)
+            if not self.has_object_perms(request, read_perms, obj):
+                raise Http404
+            return False
+        return True
@@ -153,6 +153,31 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/ref/settings/#caches
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'portal_cache'),
+    }
+}
+
+# how often, in seconds, each process checks whether the cached
+# Configuration was changed by another process
+CONFIGURATION_CACHE_CHECK_SECONDS = float(
+    os.environ.get('CONFIGURATION_CACHE_CHECK_SECONDS', 30))
+
+# how many users' roles each process keeps cached, roles are also
+# recomputed once they are older than CONFIGURATION_CACHE_CHECK_SECONDS
+CONFIGURATION_ROLES_CACHE_SIZE = int(
+    os.environ.get('CONFIGURATION_ROLES_CACHE_SIZE', 10000))
+
+# how many days deletion tombstones are kept by the prune_tombstones command
+TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get('TOMBSTONE_RETENTION_DAYS', 90))
+
 AUTH_USER_MODEL = 'users.User'
 
 # Password validation
@@ -193,6 +218,17 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Documents uploaded in chunks through /api/document-uploads/
+UPLOAD_ROOT = os.path.join(MEDIA_ROOT, 'uploads')
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 50 * 1024 * 1024))
+UPLOAD_CHUNK_MAX_SIZE = int(
+    os.environ.get('UPLOAD_CHUNK_MAX_SIZE', 8 * 1024 * 1024))
+UPLOAD_ALLOWED_EXTENSIONS = ['.pdf', '.png', '.jpg', '.jpeg']
+# internal nginx location serving UPLOAD_ROOT, downloads are streamed by
+# Django instead when it is empty
+UPLOAD_ACCEL_REDIRECT_LOCATION = os.environ.get(
+    'UPLOAD_ACCEL_REDIRECT_LOCATION', '/media/uploads/')
+
 if os.environ.get('FORCE_SCRIPT_NAME') is not None:
     FORCE_SCRIPT_NAME = os.environ.get('FORCE_SCRIPT_NAME')
 
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.functions import Lower
 
 from portal.regex import REGEX_CHECK, REGEX_ERROR_MESSAGE
 
@@ -22,3 +23,8 @@ class User(AbstractUser):
     organization = models.ForeignKey(
         Organization, on_delete=models.SET_NULL, null=True, blank=True,
         related_name='members')
+
+    class Meta(AbstractUser.Meta):
+        # reviewers are matched to supervisor emails case insensitively
+        indexes = [models.Index(Lower('email'),
+                                name='users_user_email_lower_idx')]